@@ -2,17 +2,38 @@
 Handles the backend API for the Anomaly Detection application.
 """
 
+import io
+import json
 import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-import joblib
-import tensorflow as tf
 from flask_cors import CORS
-import matplotlib.pyplot as plt
-from flask import Flask, request, jsonify, send_file
-from tensorflow.keras.models import load_model
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from werkzeug.utils import secure_filename
 
+# Make the shared `src` package importable when running from the backend folder
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.columnar_io import read_timeseries
+from src.downsampling import downsample
+from src.instrumentation import Profiler, metrics, server_timing, stage, start_trace, stop_trace
+from src.lean_pipeline import LeanAnomalyPipeline
+from src.model_refresh import AutoencoderRefresh, ModelRefresher
+from src.model_registry import REGISTRY_ROOT, ModelRegistry
+from src.plot_renderer import PlotCache, render_anomaly_plot
+from src.quantile_sketch import TDigest
+from src.result_cache import ResultCache, content_key, stream_digest
+from src.stream_scoring import StreamScorer
+from src.streaming_ingestion import ChunkedAnomalyPipeline
+from src.windowing import create_windows
+
 app = Flask(__name__)
 
 CORS(app, supports_credentials=True, resources={
@@ -27,55 +48,192 @@ CORS(app, supports_credentials=True, resources={
     }
 })
 
-# Load Pretrained Models
-lstm_model = load_model("../notebooks/models/lstm_model.h5", compile=False)
-lstm_model.compile(optimizer="adam", loss="mse")
+# "numpy" serves the exported weights without importing TensorFlow at all
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "keras")
 
-autoencoder = load_model("../notebooks/models/autoencoder.h5", compile=False)
-autoencoder.compile(optimizer="adam", loss="mse")
+# Versioned model bundles, loaded lazily and hot-reloaded when a newer version is published.
+# Without any published versions the "default" model resolves to the legacy notebook artifacts.
+MODEL_REGISTRY_ROOT = os.environ.get("MODEL_REGISTRY_ROOT", REGISTRY_ROOT)
+DEFAULT_MODEL = "default"
+registry = ModelRegistry(
+    MODEL_REGISTRY_ROOT,
+    backend=INFERENCE_BACKEND,
+    memory_budget_mb=int(os.environ.get("MODEL_MEMORY_BUDGET_MB", 1024)),
+)
 
-# Load Scalers & Configs
-scaler = joblib.load("../notebooks/scaler_data/scaler.pkl")
-time_steps = joblib.load("../notebooks/models/time_steps.pkl")
+# With MODEL_REFRESH=1 uploads scored by the default model feed drift statistics, and the
+# autoencoder is retrained in a background process and published as a new version on drift
+refresher = ModelRefresher(AutoencoderRefresh(registry, DEFAULT_MODEL)) if os.environ.get("MODEL_REFRESH") == "1" else None
+refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-refresh") if refresher else None
+
+def log_refresh_failure(future):
+    """Done-callback of the background drift checks, whose exceptions nobody else would see."""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"❌ Drift check failed: {future.exception()!r}")
 
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# .npy and Arrow uploads are memory-mapped. POSIX keeps a mapping readable after
+# its file is unlinked, but Windows refuses to delete a mapped file, so there the
+# frame is copied off the mapping before the upload is removed
+COPY_MAPPED_UPLOADS = os.name == "nt"
+# Uploads that could not be deleted yet (still mapped on Windows), retried on every removal
+stale_uploads = set()
+stale_uploads_lock = threading.Lock()
+
+def remove_upload(path):
+    """Deletes a saved upload, along with any earlier ones that were still in use."""
+    with stale_uploads_lock:
+        stale_uploads.add(path)
+        for stale in list(stale_uploads):
+            try:
+                os.remove(stale)
+            except PermissionError:
+                continue
+            except FileNotFoundError:
+                pass
+            stale_uploads.discard(stale)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 
+# "lean" scores uploads on a float32 buffer with packed flags (see src/lean_pipeline.py);
+# overridable per request with ?pipeline=standard|lean
+PIPELINE_MODE = os.environ.get("PIPELINE_MODE", "standard")
+
+# ?threshold=: exact percentiles of the upload, t-digest estimates of them ("sketch"),
+# or the autoencoder threshold from the bundle's training error sketch ("baseline")
+THRESHOLD_MODES = ("exact", "sketch", "baseline")
+
+# Rows parsed and scored at a time by the streaming upload path
+STREAM_CHUNK_SIZE = 100_000
+
+# Rendered plots, keyed by upload content + model version + threshold mode
+PLOT_OUTPUT_DIR = "output/plots"
+plot_cache = PlotCache(PLOT_OUTPUT_DIR, disk_budget_mb=int(os.environ.get("PLOT_CACHE_DISK_MB", 512)))
+
+# Default point budget of the JSON/Arrow response
+DEFAULT_POINTS = 2000
+
+# Scored uploads, keyed like the plots so a repeated upload skips parsing and inference
+result_cache = ResultCache(
+    os.environ.get("RESULT_CACHE_DIR", "output/results"),
+    memory_budget_mb=int(os.environ.get("RESULT_CACHE_MEMORY_MB", 256)),
+    disk_budget_mb=int(os.environ.get("RESULT_CACHE_DISK_MB", 2048)),
+)
+
+# Per-stream scoring state, one store per loaded bundle (a new or reloaded version starts fresh state).
+# Streams idle for STREAM_IDLE_TTL seconds are dropped, and the least recently seen beyond STREAM_MAX_STREAMS.
+STREAM_BATCH_SIZE = 256
+STREAM_IDLE_TTL = float(os.environ.get("STREAM_IDLE_TTL", 3600))
+STREAM_MAX_STREAMS = int(os.environ.get("STREAM_MAX_STREAMS", 100_000))
+stream_scorers = {}
+stream_scorers_lock = threading.Lock()
+
+# Requests sent with an "X-Profile: 1" header are profiled into this folder
+PROFILE_HEADER = "X-Profile"
+PROFILE_DIR = "output/profiles"
+
+@app.before_request
+def begin_request_trace():
+    g.request_started = time.perf_counter()
+    g.stage_records, g.trace_token = start_trace()
+    g.profiler = Profiler().__enter__() if request.headers.get(PROFILE_HEADER) else None
+
+@app.after_request
+def end_request_trace(response):
+    """
+    Adds a Server-Timing header with the stage timings and saves the profile, if requested.
+    A streamed body runs after this hook, so for streamed responses the profile
+    and request timing are finished when the response is closed (the profile id
+    is still sent up front).
+    """
+    profiler, g.profiler = g.get("profiler"), None
+    profile_id = uuid.uuid4().hex if profiler is not None else None
+    endpoint, started = request.endpoint, g.request_started
+    if profile_id is not None:
+        response.headers["X-Profile-Id"] = profile_id
+    if g.get("stage_records"):
+        response.headers["Server-Timing"] = server_timing(g.stage_records)
+
+    def finish():
+        if profiler is not None:
+            profiler.__exit__(None, None, None)
+            profiler.save(PROFILE_DIR, profile_id)
+        if endpoint:
+            metrics.observe(f"request.{endpoint}", time.perf_counter() - started)
+
+    if response.is_streamed:
+        response.call_on_close(finish)
+    else:
+        finish()
+    return response
+
+@app.teardown_request
+def reset_request_trace(_):
+    if g.get("profiler") is not None:
+        g.profiler.__exit__(None, None, None)
+    if g.get("trace_token") is not None:
+        stop_trace(g.trace_token)
+        g.trace_token = None
+
 def create_sequences(data, time_steps):
-    """Helper function to create LSTM input sequences."""
-    X, y = [], []
-    for i in range(len(data) - time_steps):
-        X.append(data[i:i + time_steps])
-        y.append(data[i + time_steps])
-    return np.array(X), np.array(y)
-
-def detect_anomalies(data):
-    """Runs Autoencoder & LSTM on the data and flags anomalies."""
-    
+    """Helper function to create LSTM input sequences (zero-copy views)."""
+    return create_windows(data, time_steps)
+
+def resolve_bundle():
+    """Returns the model bundle selected by the ``model``/``version`` query arguments."""
+    return registry.get(request.args.get("model", DEFAULT_MODEL), request.args.get("version"))
+
+def threshold_percentile(values, percentile, threshold_mode):
+    """Exact ``np.percentile``, or a t-digest estimate with ``threshold_mode="sketch"``."""
+    if threshold_mode == "sketch":
+        return TDigest().update(values).percentile(percentile)
+    return np.percentile(values, percentile)
+
+def detect_anomalies(data, bundle=None, threshold_mode="exact"):
+    """
+    Runs Autoencoder & LSTM on the data and flags anomalies.
+    :param threshold_mode: "exact" percentiles of this data, "sketch" t-digest estimates of them,
+                           or "baseline": the autoencoder threshold comes from the persisted training sketch.
+    """
+    # Hold one bundle for the whole call so a hot reload cannot mix versions
+    bundle = bundle or registry.get(DEFAULT_MODEL)
+    scaler, time_steps = bundle.scaler, bundle.time_steps
+
+    rows = len(data)
+
     # Normalize Data
-    data["value_normalized"] = scaler.transform(data["value"].values.reshape(-1, 1))
+    with stage("scaler_transform", rows):
+        data["value_normalized"] = scaler.transform(data["value"].values.reshape(-1, 1))
 
     # LSTM Forecasting
-    X_test, _ = create_sequences(data["value_normalized"].values, time_steps)
-    X_test = X_test.reshape((-1, time_steps, 1))
-    y_pred = lstm_model.predict(X_test)
+    with stage("create_sequences", rows):
+        X_test, _ = create_sequences(data["value_normalized"].values, time_steps)
+        X_test = X_test.reshape((-1, time_steps, 1))
+    with stage("lstm_predict", len(X_test)):
+        y_pred = bundle.lstm.predict(X_test)
 
     # Restore original scale
     y_pred_rescaled = scaler.inverse_transform(y_pred.reshape(-1, 1))
     y_thresh = y_pred_rescaled.flatten()  # Convert to 1D for thresholding
 
     # Define Threshold for Predicted Failures (95th percentile)
-    threshold = np.percentile(y_thresh, 95)
+    with stage("lstm_threshold", len(y_thresh)):
+        threshold = threshold_percentile(y_thresh, 95, threshold_mode)
     data["predicted_failure"] = (data["value_normalized"] > threshold).astype(int)
 
     # Autoencoder Anomaly Detection
     X_auto = data["value_normalized"].values.reshape(-1, 1)
-    predictions = autoencoder.predict(X_auto)
+    with stage("autoencoder_predict", rows):
+        predictions = bundle.autoencoder.predict(X_auto)
     mse = np.mean(np.power(X_auto - predictions, 2), axis=1)
     
     # Set anomaly threshold (99.85 percentile)
-    autoencoder_threshold = np.percentile(mse, 99.85)
+    with stage("autoencoder_threshold", rows):
+        if threshold_mode == "baseline" and bundle.mse_baseline is not None:
+            autoencoder_threshold = bundle.mse_baseline.percentile(99.85)
+        else:
+            autoencoder_threshold = threshold_percentile(mse, 99.85, threshold_mode)
     data["autoencoder_anomaly"] = (mse > autoencoder_threshold).astype(int)
 
     # Final Maintenance Alert Column (Combining Both Models)
@@ -83,30 +241,57 @@ def detect_anomalies(data):
 
     return data
 
+def detect_anomalies_lean(data, bundle=None, threshold_mode="exact"):
+    """
+    Same columns and rules as ``detect_anomalies``, computed by ``LeanAnomalyPipeline``:
+    ``value_normalized`` is float32 and the flags are uint8.
+    """
+    bundle = bundle or registry.get(DEFAULT_MODEL)
+    pipeline = LeanAnomalyPipeline(
+        bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps,
+        exact_thresholds=threshold_mode != "sketch",
+        mse_baseline=bundle.mse_baseline if threshold_mode == "baseline" else None,
+    )
+    return pipeline.run(data["value"].to_numpy()).to_frame(data)
+
 def plot_results(data, filename):
     """Plots the results with detected anomalies."""
-    plt.figure(figsize=(12, 5))
-    plt.plot(data.index, data["value"], label="Sensor Readings", color="blue")
-    
-    # Highlight Maintenance Alerts
-    plt.scatter(
-        data.index[data["maintenance_alert"] == 1],
-        data["value"][data["maintenance_alert"] == 1],
-        color="red",
-        label="Maintenance Alert (Autoencoder & LSTM)",
-        marker="x",
-    )
-    
-    plt.legend()
-    plt.title("Anomaly Detection with Autoencoder & LSTM")
-    plt.xlabel("Timestamp")
-    plt.ylabel("Sensor Readings")
-    plt.savefig(filename)
-    plt.close()
+    render_anomaly_plot(data, filename)
+
+def series_payload(data, points, method):
+    """Timestamps, values and alert flags downsampled to ``points``; alert rows are always kept."""
+    timestamps = data.index.values.astype("datetime64[ms]").astype("int64")
+    values = data["value"].to_numpy(dtype="float64")
+    alerts = data["maintenance_alert"].to_numpy()
+    keep = downsample(timestamps, values, points, method, keep=alerts == 1)
+    return {
+        "timestamp": timestamps[keep],
+        "value": values[keep],
+        "maintenance_alert": alerts[keep].astype("int8"),
+    }
+
+def arrow_response(columns):
+    """Serializes the columns as an Arrow IPC stream (pyarrow is optional)."""
+    import pyarrow as pa
+
+    table = pa.table({
+        "timestamp": pa.array(columns["timestamp"], type=pa.timestamp("ms")),
+        "value": columns["value"],
+        "maintenance_alert": columns["maintenance_alert"],
+    })
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue(), mimetype="application/vnd.apache.arrow.stream")
 
 @app.route("/upload", methods=["POST"])
 def upload_file():
-    """Handles CSV file upload, processes data, and returns the anomaly visualization."""
+    """
+    Handles file upload (CSV, Parquet, Arrow IPC or structured .npy) and processes data.
+    Returns the anomaly visualization as PNG by default; with ``?format=json`` (or
+    ``arrow``) it returns the downsampled series instead and renders the PNG in
+    the background only when ``?plot=1`` is given.
+    """
     if "file" not in request.files:
         return jsonify({"error": "No file part"}), 400
     
@@ -115,23 +300,251 @@ def upload_file():
     if file.filename == "":
         return jsonify({"error": "No selected file"}), 400
 
+    response_format = request.args.get("format", "png")
+    method = request.args.get("downsample", "lttb")
+    points = request.args.get("points", default=DEFAULT_POINTS, type=int)
+    if response_format not in ("png", "json", "arrow"):
+        return jsonify({"error": f"Unknown format {response_format!r}"}), 400
+    if method not in ("lttb", "minmax") or points <= 0:
+        return jsonify({"error": "downsample must be lttb or minmax and points positive"}), 400
+    pipeline_mode = request.args.get("pipeline", PIPELINE_MODE)
+    if pipeline_mode not in ("standard", "lean"):
+        return jsonify({"error": "pipeline must be standard or lean"}), 400
+    threshold_mode = request.args.get("threshold", "exact")
+    if threshold_mode not in THRESHOLD_MODES:
+        return jsonify({"error": "threshold must be exact, sketch or baseline"}), 400
+
+    try:
+        bundle = resolve_bundle()
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
     if file:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file.save(filepath)
+        # Everything that determines the result goes into the key: upload content,
+        # model version, artifact fingerprint (scaler included), threshold mode and pipeline mode
+        with stage("upload_hash"):
+            result_key = content_key(stream_digest(file.stream), bundle.name, bundle.version, bundle.fingerprint, threshold_mode,
+                                     pipeline_mode)
+        if response_format == "png" and plot_cache.status(result_key) == "ready":
+            return send_file(plot_cache.path(result_key), mimetype="image/png")
 
-        # Load CSV & Preprocess Data
-        data = pd.read_csv(filepath, parse_dates=["timestamp"])
-        data.set_index("timestamp", inplace=True)
+        with stage("result_cache_get"):
+            processed_data = result_cache.get(result_key)
+        if processed_data is None:
+            # A unique file per upload: .npy and Arrow files are memory-mapped, and
+            # truncating a shared path under a live mapping would crash the worker
+            handle, filepath = tempfile.mkstemp(suffix=os.path.splitext(secure_filename(file.filename))[1],
+                                                dir=app.config["UPLOAD_FOLDER"])
+            os.close(handle)
+            try:
+                with stage("upload_save"):
+                    file.save(filepath)
 
-        # Run Anomaly Detection
-        processed_data = detect_anomalies(data)
+                # Load CSV, Parquet, Arrow or .npy (detected from magic bytes) & Preprocess Data
+                with stage("parse"):
+                    data = read_timeseries(filepath, content_type=file.mimetype)
+                    if COPY_MAPPED_UPLOADS:
+                        data = data.copy()
+                    if "value" not in data:
+                        raise ValueError("missing the value column")
+                    data.set_index("timestamp", inplace=True)
+            except ImportError:
+                return jsonify({"error": "Parquet and Arrow uploads require pyarrow"}), 501
+            except (KeyError, ValueError) as e:
+                return jsonify({"error": f"Could not read upload: {e}"}), 400
+            finally:
+                remove_upload(filepath)
+
+            # Run Anomaly Detection
+            detect = detect_anomalies_lean if pipeline_mode == "lean" else detect_anomalies
+            with stage("detect_anomalies", len(data)):
+                processed_data = detect(data, bundle, threshold_mode)
+            if refresher is not None and bundle.name == DEFAULT_MODEL and request.args.get("version") is None:
+                # Drift statistics are computed off the request thread
+                observed = refresh_executor.submit(refresher.observe, processed_data["value"].to_numpy(copy=True))
+                observed.add_done_callback(log_refresh_failure)
+            with stage("result_cache_put", len(processed_data)):
+                result_cache.put(result_key, processed_data)
 
         # Generate Visualization
-        output_image = "output/anomaly_detection.png"
-        plot_results(processed_data, output_image)
+        if response_format == "png":
+            with stage("plot_wait", len(processed_data)):
+                plot_path = plot_cache.submit(result_key, processed_data).result()
+            return send_file(plot_path, mimetype="image/png")
+
+        with stage("downsample", len(processed_data)):
+            columns = series_payload(processed_data, points, method)
+        if response_format == "arrow":
+            try:
+                return arrow_response(columns)
+            except ImportError:
+                return jsonify({"error": "Arrow responses require pyarrow"}), 501
+
+        payload = {key: column.tolist() for key, column in columns.items()}
+        payload.update({
+            "rows": len(processed_data),
+            "points": len(columns["value"]),
+            "alerts": int(processed_data["maintenance_alert"].sum()),
+            "downsample": method,
+            "model": {"name": bundle.name, "version": bundle.version},
+        })
+        if request.args.get("plot", type=int):
+            plot_cache.submit(result_key, processed_data)
+            payload["plot"] = {"key": result_key, "url": f"/plots/{result_key}.png", "status": plot_cache.status(result_key)}
+        return jsonify(payload)
+
+@app.route("/plots/<key>.png", methods=["GET"])
+def plot(key):
+    """Serves a background-rendered plot; 202 while it is still rendering."""
+    if not re.fullmatch(r"[0-9a-f]{32}", key):
+        return jsonify({"error": "Invalid plot key"}), 400
+    status = plot_cache.status(key)
+    if status == "ready":
+        return send_file(plot_cache.path(key), mimetype="image/png")
+    if status == "pending":
+        return jsonify({"status": status}), 202
+    if status == "failed":
+        return jsonify({"status": status}), 500
+    return jsonify({"error": "Unknown plot"}), 404
+
+@app.route("/upload/stream", methods=["POST"])
+def upload_stream():
+    """Scores a large CSV upload chunk by chunk and streams the flagged rows back as CSV."""
+    # Accept either a multipart upload or a raw text/csv request body
+    source = request.files["file"].stream if "file" in request.files else request.stream
+    chunk_size = request.args.get("chunk_size", default=STREAM_CHUNK_SIZE, type=int)
+    if chunk_size <= 0:
+        return jsonify({"error": "chunk_size must be positive"}), 400
+
+    try:
+        bundle = resolve_bundle()
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    threshold_mode = request.args.get("threshold", default="exact")
+    if threshold_mode not in THRESHOLD_MODES:
+        return jsonify({"error": "threshold must be exact, sketch or baseline"}), 400
+    pipeline = ChunkedAnomalyPipeline(
+        bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps, chunk_size=chunk_size,
+        exact_thresholds=threshold_mode != "sketch",
+        mse_baseline=bundle.mse_baseline if threshold_mode == "baseline" else None,
+    )
+    try:
+        results = pipeline.run(source)
+    except (KeyError, ValueError, pd.errors.ParserError) as e:
+        return jsonify({"error": f"Could not process upload: {e}"}), 400
+
+    def generate():
+        # Runs after the view returns; the stage makes the scoring show up in the metrics and profile
+        with stage("upload_stream_body"):
+            header = True
+            for chunk in results:
+                yield chunk.to_csv(header=header)
+                header = False
+
+    return Response(stream_with_context(generate()), mimetype="text/csv")
+
+def stream_scorer(bundle):
+    """
+    Returns the per-stream state store of ``bundle``, creating it on first use.
+    Stores of bundles that were evicted or reloaded in place are dropped, since
+    they hold the old models and scaler.
+    """
+    loaded = {(b.name, b.version, b.fingerprint) for b in registry.loaded()}
+    with stream_scorers_lock:
+        for stale in [key for key in stream_scorers if key not in loaded]:
+            del stream_scorers[stale]
+        key = (bundle.name, bundle.version, bundle.fingerprint)
+        if key not in stream_scorers:
+            stream_scorers[key] = StreamScorer(bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps,
+                                               mse_baseline=bundle.mse_baseline, idle_ttl=STREAM_IDLE_TTL,
+                                               max_streams=STREAM_MAX_STREAMS)
+        return stream_scorers[key]
+
+@app.route("/stream/score", methods=["POST"])
+def stream_score():
+    """
+    Scores readings pushed as NDJSON lines ``{"stream_id": ..., "value": ..., "timestamp": ...}``
+    and streams one NDJSON decision per reading back as it is scored.
+    Lines are scored in groups of ``?batch=`` (default 256); a long-lived agent
+    connection that wants a decision per line should use ``batch=1``.
+    """
+    batch_size = request.args.get("batch", default=STREAM_BATCH_SIZE, type=int)
+    if batch_size <= 0:
+        return jsonify({"error": "batch must be positive"}), 400
+
+    try:
+        scorer = stream_scorer(resolve_bundle())
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    def score(readings):
+        decisions = scorer.score([r["stream_id"] for r in readings], [r["value"] for r in readings],
+                                 [r.get("timestamp") for r in readings])
+        # to_json writes NaN (e.g. rolling_std of a first point) as null
+        return decisions.to_json(orient="records", lines=True) + "\n"
+
+    def generate():
+        with stage("stream_score_body"):
+            readings = []
+            for line in request.stream:
+                if not line.strip():
+                    continue
+                try:
+                    reading = json.loads(line)
+                    if not isinstance(reading, dict) or "stream_id" not in reading or "value" not in reading:
+                        raise ValueError("expected an object with stream_id and value")
+                    reading["value"] = float(reading["value"])
+                    hash(reading["stream_id"])
+                except (TypeError, ValueError) as e:
+                    yield json.dumps({"error": f"Invalid reading: {e}"}) + "\n"
+                    continue
+                readings.append(reading)
+                if len(readings) >= batch_size:
+                    yield score(readings)
+                    readings = []
+            if readings:
+                yield score(readings)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route("/stream/stats", methods=["GET"])
+def stream_stats():
+    """Number of tracked streams and state memory per model version."""
+    with stream_scorers_lock:
+        return jsonify([{"name": name, "version": version, "streams": len(scorer), "state_bytes": scorer.nbytes(),
+                         "evicted": scorer.evictions}
+                        for (name, version, _), scorer in stream_scorers.items()])
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Per-stage latency/memory histograms and row counters in Prometheus text format."""
+    return Response(metrics.prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/profiles/<profile_id>", methods=["GET"])
+def profile(profile_id):
+    """Text summary of a request profiled with the X-Profile header (the .prof dump sits next to it)."""
+    if not re.fullmatch(r"[0-9a-f]{32}", profile_id):
+        return jsonify({"error": "Invalid profile id"}), 400
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.txt")
+    if not os.path.exists(path):
+        return jsonify({"error": "Unknown profile"}), 404
+    return send_file(path, mimetype="text/plain")
+
+@app.route("/inference/stats", methods=["GET"])
+def inference_stats():
+    """Returns queue depth and micro-batch size histograms for each loaded model."""
+    return jsonify([scheduler.stats() for bundle in registry.loaded() for scheduler in (bundle.lstm, bundle.autoencoder)])
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss counters of the result and plot caches."""
+    return jsonify({"results": result_cache.stats(), "plots": plot_cache.stats()})
 
-        return send_file(output_image, mimetype="image/png")
+@app.route("/models", methods=["GET"])
+def models():
+    """Lists the model bundles currently held in the registry cache."""
+    return jsonify(registry.stats())
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=4000,debug=True)
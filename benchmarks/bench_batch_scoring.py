@@ -0,0 +1,71 @@
+"""
+Compares batched multi-series scoring with the existing per-series path.
+
+The baseline calls the backend's detect_anomalies once per series (scaler,
+LSTM forecast and autoencoder, each with its own predict calls), as one
+/upload per series does. The Numenta EC2 series are replicated with noise to
+simulate a larger fleet.
+
+Run from the project root after training:
+    python -m benchmarks.bench_batch_scoring --replicas 50 --backend numpy
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import time
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_lean_pipeline import import_backend
+from src.batch_scoring import BatchScorer, load_series
+from src.model_registry import REGISTRY_ROOT, ModelRegistry
+
+def fleet(paths, replicas, seed=7):
+    """Long-format frame with ``replicas`` noisy copies of every series."""
+    base = load_series(paths)
+    rng = np.random.default_rng(seed)
+    copies = []
+    for replica in range(replicas):
+        copy = base.copy()
+        copy["series_id"] = copy["series_id"] + f"_{replica}"
+        copy["value"] = copy["value"] * rng.normal(1, 0.05, len(copy))
+        copies.append(copy)
+    return copies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pattern", default="data/raw/numenta_ec2_cpu_utilization_*.csv")
+    parser.add_argument("--replicas", type=int, default=20)
+    parser.add_argument("--registry-root", default=REGISTRY_ROOT)
+    parser.add_argument("--backend", choices=["keras", "numpy"], default="keras")
+    args = parser.parse_args()
+
+    bundle = ModelRegistry(args.registry_root, backend=args.backend).get()
+    with contextlib.redirect_stdout(io.StringIO()):
+        backend = import_backend(args.registry_root)
+    scorer = BatchScorer(bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps)
+    copies = fleet(sorted(glob.glob(args.pattern)), args.replicas)
+    frame = pd.concat(copies, ignore_index=True)
+    n_series = frame["series_id"].nunique()
+
+    start = time.perf_counter()
+    looped = pd.concat([backend.detect_anomalies(copy[copy["series_id"] == sid].copy(), bundle)
+                        for copy in copies for sid in copy["series_id"].unique()], ignore_index=True)
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = scorer.score(frame)
+    batch_s = time.perf_counter() - start
+
+    mismatches = int((looped.sort_values(["series_id", "timestamp"])["maintenance_alert"].values
+                      != batched.sort_values(["series_id", "timestamp"])["maintenance_alert"].values).sum())
+    print(f"{n_series} series, {len(frame)} rows, {mismatches} alert mismatches")
+    print(f"{'mode':>8} {'seconds':>9} {'series/s':>10} {'rows/s':>12}")
+    for mode, seconds in [("loop", loop_s), ("batched", batch_s)]:
+        print(f"{mode:>8} {seconds:>9.2f} {n_series / seconds:>10.1f} {len(frame) / seconds:>12.0f}")
+    bundle.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compares load times of the same series stored as CSV, Parquet, Arrow IPC and memory-mapped .npy.
+
+The largest data/raw file is tiled --repeat times and written in each format
+to a temporary directory. "load" is read_timeseries alone; "to scaler" also
+runs MinMaxScaler.transform on the value column, as detect_anomalies does.
+Parquet and Arrow are skipped when pyarrow is not installed.
+
+Run from the project root:
+    python -m benchmarks.bench_columnar_io --repeat 100
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+from sklearn.preprocessing import MinMaxScaler
+import pandas as pd
+
+from src.columnar_io import EXTENSIONS, read_timeseries, write_timeseries
+
+def best_of(func, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default="data/raw")
+    parser.add_argument("--repeat", type=int, default=50, help="Tile the series to this many copies")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    path = max(glob.glob(os.path.join(args.data_dir, "*.csv")), key=os.path.getsize)
+    base = read_timeseries(path, "csv")[["timestamp", "value"]]
+    frame = pd.concat([base] * args.repeat, ignore_index=True)
+    scaler = MinMaxScaler().fit(frame[["value"]])
+    directory = tempfile.mkdtemp(prefix="columnar-io-")
+    print(f"{os.path.basename(path)} x{args.repeat}: {len(frame)} rows")
+
+    print(f"{'format':>8} {'size MB':>8} {'load ms':>9} {'to scaler ms':>13} {'rows/s':>12}")
+    for fmt, extension in EXTENSIONS.items():
+        target = os.path.join(directory, "series" + extension)
+        try:
+            write_timeseries(frame, target, fmt)
+        except ImportError:
+            print(f"{fmt:>8} skipped (pyarrow not installed)")
+            continue
+
+        load_s = best_of(lambda: read_timeseries(target, fmt), args.runs)
+        scale_s = best_of(lambda: scaler.transform(read_timeseries(target, fmt)["value"].values.reshape(-1, 1)), args.runs)
+        print(f"{fmt:>8} {os.path.getsize(target) / 1e6:>8.1f} {load_s * 1e3:>9.1f} {scale_s * 1e3:>13.1f} "
+              f"{len(frame) / load_s:>12.0f}")
+
+if __name__ == "__main__":
+    main()
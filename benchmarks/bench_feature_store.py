@@ -0,0 +1,69 @@
+"""
+Compares appending new readings to the FeatureStore with recomputing apply_all_features over the full history.
+
+A synthetic series of --rows readings is stored first; each of --appends
+rounds then adds --append-rows new readings (12 = one hour of 5-minute data)
+and is timed against FeatureEngineering.apply_all_features on the whole
+history, as the pipeline does today. Both feature modes are measured: with
+the whole-series FFT (its two columns must be rewritten on every append)
+and with the causal STFT band energies (pure tail recompute).
+
+Run from the project root:
+    python -m benchmarks.bench_feature_store --rows 1000000 --append-rows 12
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import FeatureEngineering
+from src.feature_store import FeatureStore
+
+def synthetic_series(rows, start="2024-01-01", seed=7):
+    rng = np.random.default_rng(seed)
+    values = 50 + 10 * np.sin(np.arange(rows) * 2 * np.pi / 288) + rng.normal(0, 2, rows)
+    return pd.DataFrame({"timestamp": pd.date_range(start, periods=rows, freq="5min"), "value": values})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--append-rows", type=int, default=12)
+    parser.add_argument("--appends", type=int, default=5)
+    args = parser.parse_args()
+
+    total = args.rows + args.append_rows * args.appends
+    data = synthetic_series(total)
+    history = data.iloc[:args.rows]
+    print(f"{args.rows} stored rows, {args.appends} appends of {args.append_rows} rows")
+    print(f"{'mode':<10} {'append ms':>10} {'full recompute ms':>18} {'speedup':>8} {'read 1 day ms':>14}")
+
+    for spectral in (False, True):
+        store = FeatureStore(tempfile.mkdtemp(prefix="feature-store-"), spectral=spectral)
+        store.append("bench", history)
+
+        append_s, full_s = [], []
+        for i in range(args.appends):
+            new = data.iloc[args.rows + i * args.append_rows:args.rows + (i + 1) * args.append_rows]
+            start = time.perf_counter()
+            store.append("bench", new)
+            append_s.append(time.perf_counter() - start)
+
+            current = data.iloc[:args.rows + (i + 1) * args.append_rows].copy()
+            start = time.perf_counter()
+            FeatureEngineering(current).apply_all_features("value", "timestamp", spectral=spectral)
+            full_s.append(time.perf_counter() - start)
+
+        day = data["timestamp"].iloc[args.rows // 2]
+        start = time.perf_counter()
+        store.read("bench", day, day + pd.Timedelta(days=1)).to_numpy()
+        read_s = time.perf_counter() - start
+
+        append_ms, full_ms = statistics.median(append_s) * 1e3, statistics.median(full_s) * 1e3
+        mode = "stft" if spectral else "fft"
+        print(f"{mode:<10} {append_ms:>10.1f} {full_ms:>18.1f} {full_ms / append_ms:>7.0f}x {read_s * 1e3:>14.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compares peak memory per stage of detect_anomalies and the lean float32 pipeline, and checks the lean bound.
+
+Both modes score the same synthetic series with untrained copies of the models
+served by the NumPy backend, so every allocation is a NumPy one that
+tracemalloc sees (TensorFlow allocates outside of it). Peaks are the
+instrumentation stage peaks of one run each, after a warm-up run; the lean run
+includes building its output columns. Input size is the raw float64 value
+column. Part of the lean peak is fixed per-block work (mostly the LSTM
+activations of one block, ~20 MB at the default block size), so the bound is
+--max-ratio times the input plus that overhead, measured as the lean peak on a
+single block. The exit status is 1 when the lean peak exceeds it; see also
+tests/test_lean_pipeline.py.
+
+Run from the project root:
+    python -m benchmarks.bench_lean_pipeline --rows 2000000 --max-ratio 3
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from benchmarks.suite import build_artifacts, synthetic_series
+from src.instrumentation import metrics, stage
+from src.lean_pipeline import LeanAnomalyPipeline
+from src.model_registry import ModelBundle
+
+def import_backend(registry_root):
+    """Imports backend/app.py (its relative paths resolve from the backend folder)."""
+    os.environ.update(MODEL_REGISTRY_ROOT=registry_root, INFERENCE_BACKEND="numpy")
+    project_root = os.getcwd()
+    os.chdir(os.path.join(project_root, "backend"))
+    sys.path.insert(0, os.getcwd())
+    try:
+        import app as backend
+    finally:
+        os.chdir(project_root)
+    return backend
+
+def stage_peaks():
+    return {name: histogram.total for name, histogram in metrics.memory.items()}
+
+def measure(name, func, data):
+    """
+    Runs ``func(data)`` under tracemalloc; returns (overall peak bytes, per-stage peaks, seconds, result).
+    The overall peak is that of an enclosing ``bench.<name>`` stage, which folds in the peaks of the nested stages.
+    """
+    before = stage_peaks()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with stage(f"bench.{name}"):
+        result = func(data)
+    seconds = time.perf_counter() - start
+    tracemalloc.stop()
+    stages = {stage_name: total - before.get(stage_name, 0) for stage_name, total in stage_peaks().items()
+              if total != before.get(stage_name, 0)}
+    return stages.pop(f"bench.{name}"), stages, seconds, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--block-size", type=int, default=65_536)
+    parser.add_argument("--max-ratio", type=float, default=3.0, help="Allowed lean peak as a multiple of the input size")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="lean-pipeline-")
+    frame = synthetic_series(args.rows).set_index("timestamp")
+    paths = build_artifacts(os.path.join(workdir, "artifacts"), frame.reset_index())
+    bundle = ModelBundle("bench", "1", paths, backend="numpy")
+    with contextlib.redirect_stdout(io.StringIO()):
+        backend = import_backend(os.path.join(workdir, "registry"))
+    input_bytes = frame["value"].to_numpy().nbytes
+
+    def standard(data):
+        return backend.detect_anomalies(data, bundle)
+
+    def lean(data):
+        pipeline = LeanAnomalyPipeline(bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps, args.block_size)
+        return pipeline.run(data["value"].to_numpy()).to_frame(data)
+
+    one_block = frame.iloc[:args.block_size]
+    lean(one_block.copy())  # warm-up
+    overhead = measure("lean_block", lean, one_block.copy())[0]
+
+    print(f"{args.rows} rows, input {input_bytes / 1e6:.1f} MB (float64 values)")
+    results = {}
+    for name, func in (("standard", standard), ("lean", lean)):
+        func(frame.copy())  # warm-up
+        # The frame handed to each mode is input, so it is copied before tracing starts
+        results[name] = measure(name, func, frame.copy())
+
+    print(f"\n{'stage':<24} {'standard MB':>12} {'lean MB':>10}")
+    for stage_name in sorted(set(results["standard"][1]) | set(results["lean"][1])):
+        cells = [f"{results[mode][1][stage_name] / 1e6:.1f}" if stage_name in results[mode][1] else "-" for mode in ("standard", "lean")]
+        print(f"{stage_name:<24} {cells[0]:>12} {cells[1]:>10}")
+    for mode, (peak, _, seconds, _) in results.items():
+        print(f"{mode:<10} peak {peak / 1e6:8.1f} MB = {peak / input_bytes:5.2f}x input, {seconds:.2f}s")
+
+    standard_alerts = results["standard"][3]["maintenance_alert"].to_numpy()
+    lean_alerts = results["lean"][3]["maintenance_alert"].to_numpy()
+    print(f"Alerts: standard {standard_alerts.sum()}, lean {lean_alerts.sum()}, "
+          f"differing rows {int(np.count_nonzero(standard_alerts != lean_alerts))}")
+
+    bound = args.max_ratio * input_bytes + overhead
+    print(f"One-block overhead {overhead / 1e6:.1f} MB, bound {args.max_ratio}x input + overhead = {bound / 1e6:.1f} MB")
+    if results["lean"][0] > bound:
+        print(f"❌ Lean peak {results['lean'][0] / 1e6:.1f} MB is above the bound")
+        sys.exit(1)
+    print("✅ Lean peak within the bound")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Replays the data/raw series through ModelRefresher and reports how often drift retraining fires and what it costs.
+
+Each series starts from a model trained on its first --train-rows readings;
+the rest arrive in batches of --batch-rows (12 = one hour of 5-minute data)
+and drift is checked every --window rows. The replay runs faster than real
+time, so by default it waits for each retrain to be installed before
+continuing, as the next window would in production (--no-wait lets checks
+proceed while the worker trains). CPU seconds are measured inside the worker
+process across all its threads; "monitor" is the time observe() spends in the
+serving process (histograms plus scoring the batch).
+
+The autoencoder target publishes into a temporary registry seeded with
+untrained benchmark artifacts and scores with the NumPy backend.
+
+Run from the project root:
+    python -m benchmarks.bench_model_refresh --target isolation_forest
+    python -m benchmarks.bench_model_refresh --target autoencoder --epochs 5
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+
+from benchmarks.suite import build_artifacts
+from src.anomaly_detection import AnomalyDetector
+from src.model_refresh import AutoencoderRefresh, IsolationForestRefresh, ModelRefresher
+from src.model_registry import ModelRegistry
+
+def make_target(args, workdir, series, train):
+    if args.target == "isolation_forest":
+        detector = AnomalyDetector(os.path.join(workdir, f"{series}.pkl"))
+        return IsolationForestRefresh(detector, max_samples=args.max_samples, n_jobs=args.n_jobs)
+    root = os.path.join(workdir, series)
+    with contextlib.redirect_stdout(io.StringIO()):
+        paths = build_artifacts(os.path.join(root, "artifacts"), train)
+        registry = ModelRegistry(os.path.join(root, "registry"), backend="numpy")
+        registry.publish("default", "1", os.path.dirname(paths["scaler"]))
+    return AutoencoderRefresh(registry, "default", epochs=args.epochs, patience=args.patience)
+
+def replay(args, workdir, path):
+    series = os.path.splitext(os.path.basename(path))[0]
+    data = pd.read_csv(path, usecols=["timestamp", "value"])
+    values = data["value"].to_numpy(dtype="float64")
+    train, stream = values[:args.train_rows], values[args.train_rows:]
+
+    target = make_target(args, workdir, series, data.iloc[:args.train_rows])
+    refresher = ModelRefresher(target, window=args.window, sample_size=args.sample_size, bins=args.bins,
+                               psi_threshold=args.psi_threshold, ks_threshold=args.ks_threshold, cooldown=args.cooldown,
+                               history=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        refresher.start(train, retrain=True)
+
+        monitor_seconds = 0.0
+        for start in range(0, len(stream), args.batch_rows):
+            began = time.perf_counter()
+            fired = refresher.observe(stream[start:start + args.batch_rows])
+            monitor_seconds += time.perf_counter() - began
+            if fired and not args.no_wait:
+                refresher.poll(wait=True)
+        refresher.close()
+
+    drift = [r for r in refresher.retrains if r["reason"] == "drift"]
+    checks = pd.DataFrame(refresher.checks)
+    return {
+        "series": series,
+        "rows": len(stream),
+        "checks": len(checks),
+        "retrains": len(drift),
+        "fire_rate": len(drift) / max(len(checks), 1),
+        "max_psi": float(checks[["input_psi", "error_psi"]].max().max()) if len(checks) else 0.0,
+        "initial_cpu_s": refresher.retrains[0]["cpu_seconds"],
+        "retrain_cpu_s": sum(r["cpu_seconds"] for r in drift),
+        "retrain_wall_s": sum(r["wall_seconds"] for r in drift),
+        "monitor_ms_per_batch": monitor_seconds / max(-(-len(stream) // args.batch_rows), 1) * 1e3,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data", default="data/raw/*.csv")
+    parser.add_argument("--target", choices=["isolation_forest", "autoencoder"], default="isolation_forest")
+    parser.add_argument("--train-rows", type=int, default=1000)
+    parser.add_argument("--batch-rows", type=int, default=12)
+    parser.add_argument("--window", type=int, default=288, help="Rows per drift check (288 = one day)")
+    parser.add_argument("--sample-size", type=int, default=2016, help="Sliding retraining window (2016 = one week)")
+    parser.add_argument("--bins", type=int, default=10)
+    parser.add_argument("--psi-threshold", type=float, default=0.25)
+    parser.add_argument("--ks-threshold", type=float, default=None)
+    parser.add_argument("--cooldown", type=int, default=0, help="Minimum rows between two retrains")
+    parser.add_argument("--max-samples", type=int, default=256, help="Isolation Forest rows per tree")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Isolation Forest fitting threads")
+    parser.add_argument("--epochs", type=int, default=5, help="Autoencoder epochs per retrain")
+    parser.add_argument("--patience", type=int, default=2)
+    parser.add_argument("--no-wait", action="store_true")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="model-refresh-")
+    try:
+        rows = [replay(args, workdir, path) for path in sorted(glob.glob(args.data))]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    results = pd.DataFrame(rows).set_index("series")
+
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.3f}".format):
+        print(results)
+    total_checks = results["checks"].sum()
+    print(f"\n{args.target}: {results['retrains'].sum()} retrains in {total_checks} checks "
+          f"({results['retrains'].sum() / max(total_checks, 1):.1%}), "
+          f"{results['retrain_cpu_s'].sum():.1f}s retraining CPU "
+          f"({results['retrain_cpu_s'].sum() / max(results['retrains'].sum(), 1):.2f}s per retrain), "
+          f"{results['monitor_ms_per_batch'].mean():.2f} ms monitoring per {args.batch_rows}-row batch")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compares the cost per multi-horizon forecast of the direct multi-output model, the
+batched recursive rollout and looping the one-step model window by window.
+
+A "forecast" is all --horizons for one window. The models use the LSTMTrainer /
+MultiHorizonTrainer architectures, fitted for --fit-epochs on the data (a
+recursive rollout of untrained weights decays into subnormal floats, which
+would skew the timings). The window-by-window loop is what calling the existing one-step
+LSTMForecaster model recursively amounts to; it is timed on --loop-windows
+windows and reported per window.
+
+Run from the project root:
+    python -m benchmarks.bench_multi_horizon --rows 2000 --backend numpy
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from src.numpy_inference import NumpyModel, export_keras_model
+from src.time_series_forecasting import MultiHorizonForecaster
+from src.train_model import HORIZONS, LSTMTrainer, MultiHorizonTrainer
+from src.windowing import create_horizon_windows
+
+def build_models(directory, time_steps, horizons, data, epochs):
+    paths = {
+        "lstm_model": os.path.join(directory, "lstm_model.h5"),
+        "multi_horizon": os.path.join(directory, "multi_horizon_lstm.h5"),
+        "scaler": os.path.join(directory, "scaler.pkl"),
+        "time_steps": os.path.join(directory, "time_steps.pkl"),
+        "config": os.path.join(directory, "multi_horizon.pkl"),
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        for trainer, path, export_dir in ((LSTMTrainer(time_steps), paths["lstm_model"], "lstm_numpy"),
+                                          (MultiHorizonTrainer(time_steps, horizons), paths["multi_horizon"], "multi_horizon_numpy")):
+            model = trainer.build_model()
+            X, y = trainer.create_sequences(data["value_normalized"].values)
+            model.fit(X[..., None], y, epochs=epochs, batch_size=64, verbose=0)
+            model.save(path)
+            export_keras_model(model, os.path.join(directory, export_dir))
+    joblib.dump(MinMaxScaler().fit(data[["value"]]), paths["scaler"])
+    joblib.dump(time_steps, paths["time_steps"])
+    joblib.dump({"time_steps": time_steps, "horizons": tuple(horizons)}, paths["config"])
+    return paths
+
+def timed(func):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data", default="data/processed/ec2_request_latency_system_failure_preprocessed_test.csv")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--time-steps", type=int, default=10)
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(HORIZONS))
+    parser.add_argument("--loop-windows", type=int, default=3, help="Windows timed in the window-by-window loop")
+    parser.add_argument("--fit-epochs", type=int, default=1)
+    parser.add_argument("--backend", choices=["keras", "numpy"], default="keras")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data).iloc[:args.rows]
+    directory = tempfile.mkdtemp(prefix="multi-horizon-")
+    paths = build_models(directory, args.time_steps, args.horizons, data, args.fit_epochs)
+
+    direct = MultiHorizonForecaster("direct", args.horizons, paths["multi_horizon"], paths["scaler"], paths["config"])
+    recursive = MultiHorizonForecaster("recursive", args.horizons, paths["lstm_model"], paths["scaler"],
+                                       time_steps_path=paths["time_steps"])
+    if args.backend == "numpy":
+        direct.model = NumpyModel.load(os.path.join(directory, "multi_horizon_numpy"))
+        recursive.model = NumpyModel.load(os.path.join(directory, "lstm_numpy"))
+
+    X, _ = create_horizon_windows(data["value_normalized"].values, args.time_steps, args.horizons)
+    X = X.reshape((-1, args.time_steps, 1))
+    steps = max(args.horizons)
+    print(f"{len(X)} windows, horizons {args.horizons}, {args.backend} backend")
+
+    def loop():
+        # One predict call per window and step, feeding each prediction back
+        for window in X[:args.loop_windows]:
+            window = window[None].astype(np.float32)
+            for _ in range(steps):
+                y_step = np.asarray(recursive.model.predict(window, verbose=0)).reshape(1, 1, 1)
+                window = np.concatenate([window[:, 1:], y_step], axis=1)
+
+    direct.forecast(data)  # warm up graph tracing
+    (_, _, y_direct), direct_s = timed(lambda: direct.forecast(data))
+    (_, _, y_recursive), recursive_s = timed(lambda: recursive.forecast(data))
+    _, loop_s = timed(loop)
+
+    print(f"{'method':<26} {'predict calls':>14} {'total s':>9} {'ms/forecast':>12}")
+    print(f"{'direct (one pass)':<26} {1:>14} {direct_s:>9.2f} {direct_s / len(X) * 1e3:>12.3f}")
+    print(f"{'recursive, batched':<26} {steps:>14} {recursive_s:>9.2f} {recursive_s / len(X) * 1e3:>12.3f}")
+    print(f"{'recursive, per window':<26} {steps * len(X):>14} {loop_s / args.loop_windows * len(X):>9.2f} "
+          f"{loop_s / args.loop_windows * 1e3:>12.3f}  (extrapolated from {args.loop_windows} windows)")
+    print(f"Output shapes: direct {y_direct.shape}, recursive {y_recursive.shape}")
+
+if __name__ == "__main__":
+    main()
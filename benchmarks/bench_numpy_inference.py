@@ -0,0 +1,109 @@
+"""
+Compares the Keras and NumPy serving paths: output parity, cold start and RSS.
+
+Each cold start runs in a fresh interpreter that imports the runtime, loads both
+models and predicts once, so the import cost of TensorFlow is included.
+
+Run from the project root after training (so both .h5 files and the NumPy
+exports exist):
+    python -m benchmarks.bench_numpy_inference
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+import joblib
+
+from src.numpy_inference import NumpyModel
+from src.windowing import create_windows
+
+COLD_START = {
+    "keras": """
+import numpy as np
+from tensorflow.keras.models import load_model
+lstm = load_model({lstm_h5!r}, compile=False)
+autoencoder = load_model({autoencoder_h5!r}, compile=False)
+lstm.predict(np.zeros((1, {time_steps}, 1)), verbose=0)
+autoencoder.predict(np.zeros((1, 1)), verbose=0)
+""",
+    "numpy": """
+import sys
+import numpy as np
+sys.path.append('.')
+from src.numpy_inference import NumpyModel
+lstm = NumpyModel.load({lstm_numpy!r})
+autoencoder = NumpyModel.load({autoencoder_numpy!r})
+lstm.predict(np.zeros((1, {time_steps}, 1)))
+autoencoder.predict(np.zeros((1, 1)))
+""",
+}
+
+# Peak resident set size in kB (VmHWM is reset by exec, unlike ru_maxrss)
+RSS_PROBE = """
+with open("/proc/self/status") as f:
+    print(next(line.split()[1] for line in f if line.startswith("VmHWM")))
+"""
+
+def cold_start(backend, paths, repeats):
+    """Returns (best wall seconds, max RSS in MB) over ``repeats`` fresh interpreters."""
+    code = COLD_START[backend].format(**paths) + RSS_PROBE
+    best, rss = float("inf"), 0.0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        best = min(best, time.perf_counter() - start)
+        rss = max(rss, int(output.strip().splitlines()[-1]) / 1024)
+    return best, rss
+
+def parity(paths, data_path, scaler_path):
+    """Returns max absolute differences between Keras and NumPy predictions."""
+    from tensorflow.keras.models import load_model
+
+    scaler = joblib.load(scaler_path)
+    values = pd.read_csv(data_path)["value"].values.reshape(-1, 1)
+    normalized = scaler.transform(values)
+    X, _ = create_windows(normalized.flatten(), paths["time_steps"])
+    X = X.reshape((-1, paths["time_steps"], 1))
+
+    diffs = {}
+    for name, h5, exported, inputs in [("lstm", paths["lstm_h5"], paths["lstm_numpy"], X),
+                                       ("autoencoder", paths["autoencoder_h5"], paths["autoencoder_numpy"], normalized)]:
+        expected = load_model(h5, compile=False).predict(inputs, verbose=0)
+        actual = NumpyModel.load(exported).predict(inputs)
+        diffs[name] = float(np.max(np.abs(expected - actual)))
+    return diffs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--models-dir", default="notebooks/models")
+    parser.add_argument("--scaler", default="notebooks/scaler_data/scaler.pkl")
+    parser.add_argument("--data", default="data/raw/ec2_request_latency_system_failure.csv")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    paths = {
+        "lstm_h5": f"{args.models_dir}/lstm_model.h5",
+        "autoencoder_h5": f"{args.models_dir}/autoencoder.h5",
+        "lstm_numpy": f"{args.models_dir}/lstm_numpy",
+        "autoencoder_numpy": f"{args.models_dir}/autoencoder_numpy",
+        "time_steps": joblib.load(f"{args.models_dir}/time_steps.pkl"),
+    }
+
+    print(f"{'backend':>8} {'cold start s':>13} {'max RSS MB':>11}")
+    for backend in COLD_START:
+        seconds, rss = cold_start(backend, paths, args.repeats)
+        print(f"{backend:>8} {seconds:>13.2f} {rss:>11.1f}")
+
+    diffs = parity(paths, args.data, args.scaler)
+    for name, diff in diffs.items():
+        print(f"{name}: max |keras - numpy| = {diff:.2e}")
+
+    if max(diffs.values()) > args.tolerance:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Checks TDigest rank error against exact np.percentile on the Numenta EC2 series.
+
+Each series is split into chunks that are sketched separately (forcing
+compression with a small buffer) and merged, the way per-worker results would
+be. Exits with status 1 if any rank error exceeds --max-rank-error.
+
+Run from the project root:
+    python -m benchmarks.bench_quantile_sketch
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from src.quantile_sketch import TDigest
+
+PERCENTILES = [1, 50, 95, 99, 99.85]
+
+def rank_error(sorted_values, estimate, percentile):
+    """Distance between the estimate's rank and the requested rank, as a fraction of n."""
+    lo = np.searchsorted(sorted_values, estimate, side="left")
+    hi = np.searchsorted(sorted_values, estimate, side="right")
+    target = percentile / 100 * len(sorted_values)
+    return max(0, lo - target, target - hi) / len(sorted_values)
+
+def sketch_series(values, chunks, compression, buffer_size):
+    """Sketches each chunk independently and merges the partial digests."""
+    parts = [TDigest(compression, buffer_size).update(chunk) for chunk in np.array_split(values, chunks)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    return merged
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default="data/raw")
+    parser.add_argument("--compression", type=float, default=200)
+    parser.add_argument("--buffer-size", type=int, default=256)
+    parser.add_argument("--chunks", type=int, default=8)
+    parser.add_argument("--max-rank-error", type=float, default=0.01)
+    args = parser.parse_args()
+
+    worst = 0.0
+    print(f"{'series':<40} " + " ".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f" {'sketch ms':>10} {'exact ms':>9}")
+    for path in sorted(glob.glob(os.path.join(args.data_dir, "numenta_ec2_cpu_utilization_*.csv"))):
+        values = pd.read_csv(path)["value"].to_numpy(dtype="float64")
+
+        start = time.perf_counter()
+        digest = sketch_series(values, args.chunks, args.compression, args.buffer_size)
+        estimates = [digest.percentile(p) for p in PERCENTILES]
+        sketch_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        np.percentile(values, PERCENTILES)
+        exact_ms = (time.perf_counter() - start) * 1e3
+
+        sorted_values = np.sort(values)
+        errors = [rank_error(sorted_values, e, p) for e, p in zip(estimates, PERCENTILES)]
+        worst = max(worst, *errors)
+        print(f"{os.path.basename(path):<40} " + " ".join(f"{e:>9.5f}" for e in errors)
+              + f" {sketch_ms:>10.2f} {exact_ms:>9.2f}")
+
+    print(f"Worst rank error: {worst:.5f} (bound {args.max_rank_error})")
+    if worst > args.max_rank_error:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
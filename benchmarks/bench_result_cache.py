@@ -0,0 +1,61 @@
+"""
+Compares /upload latency for a cold request, a disk cache hit and a memory cache hit.
+
+Drives the Flask app in-process through its test client with the result cache
+in a temporary directory, so no server is needed. Each cold request uses a
+fresh cache; a disk hit uses a fresh in-memory LRU over the same directory.
+
+Run from the project root after training:
+    python -m benchmarks.bench_result_cache --repeats 5
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data", default="data/raw/ec2_request_latency_system_failure.csv")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = open(args.data, "rb").read()
+    cache_root = tempfile.mkdtemp(prefix="result-cache-")
+    os.environ["RESULT_CACHE_DIR"] = os.path.join(cache_root, "0")
+
+    # The backend resolves its paths relative to its own folder
+    os.chdir("backend")
+    sys.path.insert(0, os.getcwd())
+    import app as backend
+    from src.result_cache import ResultCache
+
+    client = backend.app.test_client()
+
+    def upload():
+        start = time.perf_counter()
+        response = client.post("/upload?format=json", data={"file": (io.BytesIO(payload), os.path.basename(args.data))},
+                               content_type="multipart/form-data")
+        assert response.status_code == 200, response.json
+        return time.perf_counter() - start
+
+    upload()  # load the models outside the measurements
+    timings = {"cold": [], "disk hit": [], "memory hit": []}
+    for repeat in range(args.repeats):
+        backend.result_cache = ResultCache(os.path.join(cache_root, f"cold-{repeat}"))
+        timings["cold"].append(upload())
+        backend.result_cache = ResultCache(backend.result_cache.directory)
+        timings["disk hit"].append(upload())
+        timings["memory hit"].append(upload())
+
+    print(f"{os.path.basename(args.data)}: {len(payload) / 1e6:.2f} MB")
+    print(f"{'request':>11} {'median ms':>10} {'min ms':>8}")
+    for name, samples in timings.items():
+        print(f"{name:>11} {statistics.median(samples) * 1e3:>10.1f} {min(samples) * 1e3:>8.1f}")
+    print(backend.result_cache.stats())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmarks the fused rolling-feature engine against the pandas rolling passes.
+
+Uses the largest data/raw file, tiled --repeat times, and also reports the
+per-sample cost of the streaming push() mode. Every data/raw series is then
+replayed through push() and checked against the batch transform (exit status 1
+on a mismatch beyond --rtol); rows where pandas' add/remove updates disagree
+with both by more than 1e-3 are counted for reference.
+
+Run from the project root:
+    python -m benchmarks.bench_rolling_features --repeat 100
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import FeatureEngineering
+from src.rolling_features import RollingFeatureEngine
+
+def best_of(func, repeats=3):
+    """Best wall time of ``repeats`` calls."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def check_streaming(path, rtol):
+    """Replays one series through push(); returns (columns off beyond rtol, rows where pandas is off by > 1e-3)."""
+    data = pd.read_csv(path)[["value"]]
+    batch = RollingFeatureEngine("value").transform(data.copy())
+    engine = RollingFeatureEngine("value")
+    streamed = pd.DataFrame([engine.push(value) for value in data["value"].to_numpy()])
+
+    fe = FeatureEngineering(data.copy())
+    fe.add_statistical_features("value")
+    fe.add_rolling_features("value")
+    mismatched = [c for c in streamed.columns
+                  if not np.allclose(streamed[c], batch[c], rtol=rtol, atol=1e-9, equal_nan=True)]
+    pandas_off = int((np.abs(fe.data[streamed.columns] - batch[streamed.columns]) > 1e-3).any(axis=1).sum())
+    return mismatched, pandas_off
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default="data/raw")
+    parser.add_argument("--repeat", type=int, default=25, help="Tile the series to this many copies")
+    parser.add_argument("--stream-samples", type=int, default=20_000)
+    parser.add_argument("--rtol", type=float, default=1e-6, help="Allowed relative push() vs batch difference")
+    args = parser.parse_args()
+
+    path = max(glob.glob(os.path.join(args.data_dir, "*.csv")), key=os.path.getsize)
+    base = pd.read_csv(path)[["timestamp", "value"]]
+    data = pd.concat([base] * args.repeat, ignore_index=True)
+    print(f"{os.path.basename(path)} x{args.repeat}: {len(data)} rows")
+
+    def pandas_rolling():
+        fe = FeatureEngineering(data[["value"]].copy())
+        fe.add_statistical_features("value")
+        fe.add_rolling_features("value")
+        return fe.data
+
+    def fused_rolling():
+        return RollingFeatureEngine("value").transform(data[["value"]].copy())
+
+    expected, actual = pandas_rolling(), fused_rolling()
+    worst = max(np.nanmax(np.abs(expected[c] - actual[c])) for c in expected.columns if c != "value")
+
+    timings = {
+        "pandas rolling (7 passes)": best_of(pandas_rolling),
+        "fused rolling": best_of(fused_rolling),
+        "apply_all_features (pandas)": best_of(lambda: FeatureEngineering(data.copy()).apply_all_features("value", fused_rolling=False)),
+        "apply_all_features (fused)": best_of(lambda: FeatureEngineering(data.copy()).apply_all_features("value", fused_rolling=True)),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:<30} {seconds * 1e3:>9.1f} ms {seconds / len(data) * 1e9:>9.0f} ns/row")
+    print(f"max |pandas - fused| = {worst:.2e}")
+
+    engine = RollingFeatureEngine("value")
+    samples = data["value"].to_numpy()[:args.stream_samples]
+    start = time.perf_counter()
+    for value in samples:
+        engine.push(value)
+    per_sample = (time.perf_counter() - start) / len(samples)
+    print(f"{'streaming push()':<30} {per_sample * 1e6:>9.1f} us/sample")
+
+    failed = False
+    for path in sorted(glob.glob(os.path.join(args.data_dir, "*.csv"))):
+        mismatched, pandas_off = check_streaming(path, args.rtol)
+        failed |= bool(mismatched)
+        status = f"❌ push() differs in {', '.join(mismatched)}" if mismatched else "✅ push() matches batch"
+        print(f"{os.path.basename(path):<55} {status}; pandas off on {pandas_off} rows")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmarks the per-row cost of the whole-series FFT and the windowed spectral features.
+
+Uses the largest data/raw file, tiled --repeat times. The sliding DFT is also
+checked against the batched STFT on the first --stream-samples rows.
+
+Run from the project root:
+    python -m benchmarks.bench_spectral_features --repeat 100 --window 64
+"""
+
+import argparse
+import glob
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import FeatureEngineering
+from src.spectral_features import SlidingDFT, stft_band_energies
+
+def best_of(func, repeats=3):
+    """Best wall time of ``repeats`` calls."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data-dir", default="data/raw")
+    parser.add_argument("--repeat", type=int, default=25, help="Tile the series to this many copies")
+    parser.add_argument("--window", type=int, default=64)
+    parser.add_argument("--bands", type=int, default=4)
+    parser.add_argument("--stream-samples", type=int, default=20_000)
+    args = parser.parse_args()
+
+    path = max(glob.glob(os.path.join(args.data_dir, "*.csv")), key=os.path.getsize)
+    base = pd.read_csv(path)[["value"]]
+    data = pd.concat([base] * args.repeat, ignore_index=True)
+    values = data["value"].to_numpy(dtype="float64")
+    print(f"{os.path.basename(path)} x{args.repeat}: {len(data)} rows, window {args.window}, {args.bands} bands")
+
+    timings = {
+        "whole-series FFT": best_of(lambda: FeatureEngineering(data.copy()).add_fourier_features("value")),
+        "STFT hop=1": best_of(lambda: stft_band_energies(values, args.window, 1, args.bands)),
+        f"STFT hop={args.window // 4}": best_of(lambda: stft_band_energies(values, args.window, args.window // 4, args.bands)),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:<20} {seconds * 1e3:>9.1f} ms {seconds / len(data) * 1e9:>9.0f} ns/row")
+
+    samples = values[:args.stream_samples]
+    sliding = SlidingDFT(args.window, n_bands=args.bands)
+    start = time.perf_counter()
+    streamed = np.array([sliding.push(value) for value in samples])
+    per_sample = (time.perf_counter() - start) / len(samples)
+    print(f"{'sliding DFT push()':<20} {per_sample * 1e6:>9.1f} us/sample")
+
+    batched = stft_band_energies(samples, args.window, 1, args.bands)
+    print(f"max |batched - streamed| = {np.nanmax(np.abs(batched - streamed)):.2e}")
+
+if __name__ == "__main__":
+    main()
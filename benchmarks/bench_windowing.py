@@ -0,0 +1,59 @@
+"""
+Benchmarks zero-copy windowing against the old list-based create_sequences.
+
+Run from the project root:
+    python -m benchmarks.bench_windowing
+"""
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+
+from src.windowing import create_windows, iter_window_batches
+
+def create_sequences_list(data, time_steps):
+    """The original list-of-slices implementation, kept for comparison."""
+    X, y = [], []
+    for i in range(len(data) - time_steps):
+        X.append(data[i:i + time_steps])
+        y.append(data[i + time_steps])
+    return np.array(X), np.array(y)
+
+def measure(func, *args):
+    """Returns (seconds, peak traced bytes) for a single call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+def consume_batches(data, time_steps, batch_size):
+    """Materializes each batch once, the way a chunked predict loop would."""
+    total = 0.0
+    for _, X_batch, _ in iter_window_batches(data, time_steps, batch_size):
+        total += np.ascontiguousarray(X_batch)[:, -1].sum()
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--time-steps", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    print(f"{'rows':>10} {'list s':>10} {'view s':>10} {'speedup':>9} {'list MB':>9} {'view MB':>9} {'batched MB':>11}")
+    for n in args.sizes:
+        data = rng.random(n)
+        list_s, list_mem = measure(create_sequences_list, data, args.time_steps)
+        view_s, view_mem = measure(create_windows, data, args.time_steps)
+        _, batch_mem = measure(consume_batches, data, args.time_steps, args.batch_size)
+        print(f"{n:>10} {list_s:>10.4f} {view_s:>10.6f} {list_s / max(view_s, 1e-9):>8.0f}x "
+              f"{list_mem / 1e6:>9.2f} {view_mem / 1e6:>9.4f} {batch_mem / 1e6:>11.2f}")
+
+if __name__ == "__main__":
+    main()
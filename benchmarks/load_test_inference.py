@@ -0,0 +1,57 @@
+"""
+Load-tests the /upload endpoint with concurrent clients posting the bundled uploads.
+
+Start the backend first (cd backend && flask run --port=4000 --with-threads), then
+run from the project root:
+    python -m benchmarks.load_test_inference --url http://localhost:4000
+"""
+
+import argparse
+import glob
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+def post_upload(url, path):
+    """Posts one CSV and returns its latency in seconds."""
+    with open(path, "rb") as f:
+        start = time.perf_counter()
+        response = requests.post(f"{url}/upload", files={"file": (path.rsplit("/", 1)[-1], f, "text/csv")})
+        elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    return elapsed
+
+def run_level(url, files, clients, requests_per_client):
+    """Runs ``clients`` concurrent clients and returns (requests/sec, p50 s, p95 s)."""
+    jobs = [files[i % len(files)] for i in range(clients * requests_per_client)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(lambda path: post_upload(url, path), jobs))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return len(jobs) / wall, statistics.median(latencies), latencies[int(0.95 * (len(latencies) - 1))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:4000")
+    parser.add_argument("--uploads", default="backend/uploads/*.csv")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests-per-client", type=int, default=4)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(args.uploads))
+    if not files:
+        parser.error(f"No files match {args.uploads}")
+
+    print(f"{'clients':>8} {'req/s':>8} {'p50 s':>8} {'p95 s':>8}")
+    for clients in args.clients:
+        throughput, p50, p95 = run_level(args.url, files, clients, args.requests_per_client)
+        print(f"{clients:>8} {throughput:>8.2f} {p50:>8.3f} {p95:>8.3f}")
+
+    for stats in requests.get(f"{args.url}/inference/stats").json():
+        print(f"{stats['name']}: {stats['requests']} requests in {stats['batches']} batches, "
+              f"mean wait {stats['mean_wait_ms']:.1f} ms, batch rows {stats['batch_size_rows']['buckets']}")
+
+if __name__ == "__main__":
+    main()
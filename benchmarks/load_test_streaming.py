@@ -0,0 +1,68 @@
+"""
+Replays the data/raw series against /stream/score and reports points/sec and decision latency.
+
+Every file becomes --streams-per-file stream ids. Each agent thread owns a
+subset of the streams and pushes their readings in time order, --batch readings
+per request. A reading's latency runs from the moment its request starts to the
+moment its decision line arrives.
+
+Start the backend first (cd backend && flask run --port=4000 --with-threads), then
+run from the project root:
+    python -m benchmarks.load_test_streaming --agents 8 --streams-per-file 50
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import requests
+
+def agent(url, streams, batch, points):
+    """Pushes up to ``points`` readings per stream, round-robin across streams; returns latencies."""
+    session = requests.Session()
+    latencies = []
+    readings = [{"stream_id": stream_id, "value": float(value)}
+                for step in range(points) for stream_id, values in streams if step < len(values)
+                for value in [values[step]]]
+    for start in range(0, len(readings), batch):
+        body = "".join(json.dumps(r) + "\n" for r in readings[start:start + batch])
+        sent = time.perf_counter()
+        with session.post(f"{url}/stream/score", params={"batch": batch}, data=body, stream=True,
+                          headers={"Content-Type": "application/x-ndjson"}) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    latencies.append(time.perf_counter() - sent)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:4000")
+    parser.add_argument("--pattern", default="data/raw/*.csv")
+    parser.add_argument("--streams-per-file", type=int, default=10)
+    parser.add_argument("--points", type=int, default=200, help="Readings replayed per stream")
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=64)
+    args = parser.parse_args()
+
+    series = {os.path.splitext(os.path.basename(p))[0]: pd.read_csv(p)["value"].to_numpy() for p in sorted(glob.glob(args.pattern))}
+    streams = [(f"{name}-{copy}", values) for name, values in series.items() for copy in range(args.streams_per_file)]
+    shards = [streams[i::args.agents] for i in range(args.agents)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.agents) as pool:
+        latencies = np.concatenate([np.asarray(l) for l in pool.map(lambda s: agent(args.url, s, args.batch, args.points), shards)])
+    wall = time.perf_counter() - start
+
+    print(f"{len(streams)} streams, {len(latencies)} points, {args.agents} agents, batch {args.batch}")
+    print(f"{len(latencies) / wall:.0f} points/s, latency p50 {np.percentile(latencies, 50) * 1e3:.1f} ms, "
+          f"p99 {np.percentile(latencies, 99) * 1e3:.1f} ms")
+    for stats in requests.get(f"{args.url}/stream/stats").json():
+        print(f"{stats['name']}:{stats['version']}: {stats['streams']} streams, {stats['state_bytes'] / 1e6:.1f} MB of state")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Times each pipeline component on synthetic and bundled series and flags regressions against a baseline.
+
+Synthetic series (a noisy daily cycle with injected spikes) are generated at
+every --sizes row count, and the data/raw CSVs are concatenated into one more
+"data/raw" dataset. Each component runs --repeats times per dataset on a fresh
+copy of the frame; the median and best wall times go to --output as JSON.
+
+The models are untrained copies of the LSTMTrainer / AutoencoderAnomalyDetector
+architectures written to a temporary directory, so the suite needs no training
+run and inference cost matches the real models. Components that are slow per
+row (Keras inference, Isolation Forest, /upload) skip datasets above their row
+cap unless --no-caps is given.
+
+Run from the project root:
+    python -m benchmarks.suite --output bench/current.json
+    python -m benchmarks.suite --output bench/new.json --baseline bench/current.json
+    python -m benchmarks.suite --results bench/new.json --baseline bench/current.json   # compare only
+
+With --baseline the exit status is 1 when any component got slower than
+--threshold (relative) and --min-delta-ms (absolute) on the same dataset.
+"""
+
+import argparse
+import contextlib
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+TIME_STEPS = 10
+
+def synthetic_series(rows, seed=7):
+    """Five-minute readings of a noisy daily cycle with injected spikes."""
+    rng = np.random.default_rng(seed)
+    values = 50 + 10 * np.sin(np.arange(rows) * 2 * np.pi / 288) + rng.normal(0, 2, rows)
+    spikes = rng.choice(rows, size=max(rows // 10_000, 1), replace=False)
+    values[spikes] += rng.normal(40, 10, len(spikes))
+    timestamps = pd.date_range("2024-01-01", periods=rows, freq="5min")
+    return pd.DataFrame({"timestamp": timestamps, "value": values})
+
+def raw_series(pattern="data/raw/*.csv"):
+    frames = [pd.read_csv(path, parse_dates=["timestamp"])[["timestamp", "value"]] for path in sorted(glob.glob(pattern))]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+def build_artifacts(directory, frame):
+    """Writes untrained models, the scaler and time_steps in the registry version layout."""
+    import joblib
+    from sklearn.preprocessing import MinMaxScaler
+    from src.autoencoder import AutoencoderAnomalyDetector
+    from src.model_registry import ARTIFACTS
+    from src.numpy_inference import export_keras_model
+    from src.train_model import LSTMTrainer
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {artifact: os.path.join(directory, file_name) for artifact, file_name in ARTIFACTS.items()}
+    lstm = LSTMTrainer(TIME_STEPS).build_model()
+    autoencoder = AutoencoderAnomalyDetector().build_autoencoder(1)
+    autoencoder.compile(optimizer="adam", loss="mse")
+    with contextlib.redirect_stdout(io.StringIO()):
+        lstm.save(paths["lstm_model"])
+        autoencoder.save(paths["autoencoder"])
+        export_keras_model(lstm, paths["lstm_numpy"])
+        export_keras_model(autoencoder, paths["autoencoder_numpy"])
+    joblib.dump(MinMaxScaler().fit(frame[["value"]]), paths["scaler"])
+    joblib.dump(TIME_STEPS, paths["time_steps"])
+    return paths
+
+class Components:
+    """The benchmarked calls. Each takes a fresh frame copy; ``prepare`` adds the columns it expects."""
+
+    # Largest dataset each component runs on by default (None: every size)
+    CAPS = {
+        "normalization": None,
+        "feature_engineering": None,
+        "sequences": None,
+        "lstm_forecast": 100_000,
+        "autoencoder_detect": 100_000,
+        "isolation_forest": 1_000_000,
+        "upload": 1_000_000,
+    }
+
+    def __init__(self, workdir, paths, backend):
+        self.workdir = workdir
+        self.paths = paths
+        self.backend = backend
+        self._forecaster = None
+        self._autoencoder = None
+        self._client = None
+
+    def prepare(self, name, frame):
+        if name in ("lstm_forecast", "autoencoder_detect"):
+            import joblib
+
+            frame["value_normalized"] = joblib.load(self.paths["scaler"]).transform(frame[["value"]]).ravel()
+        if name == "upload":
+            return frame.to_csv(index=False).encode()
+        return frame
+
+    def normalization(self, frame):
+        from src.data_preprocessing import DataPreprocessor, MinMaxNormalization
+
+        DataPreprocessor(MinMaxNormalization(), os.path.join(self.workdir, "scaler.pkl")).apply_normalization(frame, "value")
+
+    def feature_engineering(self, frame):
+        from src.feature_engineering import FeatureEngineering
+
+        FeatureEngineering(frame).apply_all_features("value", "timestamp")
+
+    def sequences(self, frame):
+        from src.windowing import create_windows
+
+        X, y = create_windows(frame["value"].to_numpy(), TIME_STEPS)
+        # Materialize the batch the way model.predict receives it
+        np.ascontiguousarray(X.reshape((-1, TIME_STEPS, 1)), dtype=np.float32)
+
+    def lstm_forecast(self, frame):
+        if self._forecaster is None:
+            from src.time_series_forecasting import LSTMForecaster
+
+            self._forecaster = LSTMForecaster(self.paths["lstm_model"], self.paths["scaler"], self.paths["time_steps"])
+        self._forecaster.forecast(frame)
+
+    def autoencoder_detect(self, frame):
+        if self._autoencoder is None:
+            from tensorflow.keras.models import load_model
+            from src.autoencoder import AutoencoderAnomalyDetector
+
+            self._autoencoder = AutoencoderAnomalyDetector()
+            self._autoencoder.autoencoder = load_model(self.paths["autoencoder"], compile=False)
+        self._autoencoder.detect_anomalies(frame)
+
+    def isolation_forest(self, frame):
+        from src.anomaly_detection import AnomalyDetector
+
+        AnomalyDetector(os.path.join(self.workdir, "isolation_forest.pkl")).fit_predict(frame, "value")
+
+    def upload(self, payload):
+        backend = self._backend()
+        from src.result_cache import ResultCache
+
+        # A fresh result cache per request, so every upload is scored
+        backend.result_cache = ResultCache(tempfile.mkdtemp(dir=self.workdir, prefix="results-"))
+        response = self._client.post("/upload?format=json", data={"file": (io.BytesIO(payload), "bench.csv")},
+                                     content_type="multipart/form-data")
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    def _backend(self):
+        """Imports the Flask app against a registry holding only the benchmark artifacts."""
+        if self._client is None:
+            from src.model_registry import ModelRegistry
+
+            registry_root = os.path.join(self.workdir, "registry")
+            ModelRegistry(registry_root).publish("default", "1", os.path.dirname(self.paths["scaler"]))
+            os.environ.update(MODEL_REGISTRY_ROOT=registry_root, INFERENCE_BACKEND=self.backend)
+            project_root = os.getcwd()
+            os.chdir(os.path.join(project_root, "backend"))
+            sys.path.insert(0, os.getcwd())
+            try:
+                import app as backend
+            finally:
+                os.chdir(project_root)
+            backend.app.config["UPLOAD_FOLDER"] = os.path.join(self.workdir, "uploads")
+            os.makedirs(backend.app.config["UPLOAD_FOLDER"], exist_ok=True)
+            self._client = backend.app.test_client()
+            self._module = backend
+        return self._module
+
+def run_component(components, name, frame, repeats):
+    """Wall times of ``repeats`` calls, each on a fresh copy; the first call also warms up lazy loads."""
+    func = getattr(components, name)
+    timings = []
+    for run in range(repeats + 1):
+        arg = components.prepare(name, frame.copy())
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(arg)
+        if run:
+            timings.append(time.perf_counter() - start)
+    return timings
+
+def environment():
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+def run_suite(args):
+    from src.instrumentation import peak_resident_memory
+
+    datasets = [(f"synthetic-{rows}", rows) for rows in args.sizes]
+    if not args.no_raw:
+        datasets.append(("data/raw", None))
+    workdir = tempfile.mkdtemp(prefix="bench-suite-")
+    raw = raw_series() if not args.no_raw else None
+    paths = build_artifacts(os.path.join(workdir, "artifacts"), raw if raw is not None else synthetic_series(10_000))
+    components = Components(workdir, paths, args.backend)
+
+    results = []
+    for dataset, rows in datasets:
+        frame = synthetic_series(rows, args.seed) if rows else raw
+        if frame is None:
+            continue
+        for name in args.components:
+            cap = Components.CAPS[name]
+            if cap is not None and len(frame) > cap and not args.no_caps:
+                print(f"{name:<20} {dataset:<22} skipped (> {cap} rows, use --no-caps)")
+                continue
+            timings = run_component(components, name, frame, args.repeats)
+            result = {
+                "component": name,
+                "dataset": dataset,
+                "rows": len(frame),
+                "median_s": statistics.median(timings),
+                "min_s": min(timings),
+                "runs_s": timings,
+                "rows_per_s": len(frame) / statistics.median(timings),
+                "peak_rss_bytes": peak_resident_memory(),
+            }
+            results.append(result)
+            print(f"{name:<20} {dataset:<22} {result['median_s'] * 1e3:>10.1f} ms {result['rows_per_s']:>14,.0f} rows/s")
+
+    return {"environment": environment(), "settings": {"backend": args.backend, "repeats": args.repeats, "seed": args.seed},
+            "results": results}
+
+def compare(baseline, current, threshold=0.10, min_delta_ms=5.0):
+    """
+    Matches results by (component, dataset) and classifies each by its median time.
+    :return: list of (component, dataset, baseline_s, current_s, ratio, status)
+    """
+    previous = {(r["component"], r["dataset"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = (result["component"], result["dataset"])
+        if key not in previous:
+            rows.append(key + (None, result["median_s"], None, "new"))
+            continue
+        before, after = previous[key]["median_s"], result["median_s"]
+        ratio = after / before if before else float("inf")
+        significant = abs(after - before) * 1e3 >= min_delta_ms
+        status = "regression" if significant and ratio > 1 + threshold else \
+                 "improvement" if significant and ratio < 1 / (1 + threshold) else "ok"
+        rows.append(key + (before, after, ratio, status))
+    return rows
+
+def print_comparison(rows):
+    print(f"{'component':<20} {'dataset':<22} {'baseline ms':>12} {'current ms':>11} {'ratio':>7}  status")
+    for component, dataset, before, after, ratio, status in rows:
+        before_ms = f"{before * 1e3:.1f}" if before is not None else "-"
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else "-"
+        print(f"{component:<20} {dataset:<22} {before_ms:>12} {after * 1e3:>11.1f} {ratio_text:>7}  {status}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Synthetic series lengths")
+    parser.add_argument("--no-raw", action="store_true", help="Skip the data/raw dataset")
+    parser.add_argument("--components", nargs="+", default=list(Components.CAPS), choices=list(Components.CAPS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--backend", choices=["keras", "numpy"], default="keras", help="Inference backend for /upload")
+    parser.add_argument("--no-caps", action="store_true", help="Run every component on every size")
+    parser.add_argument("--output", default=None, help="Write the results JSON here")
+    parser.add_argument("--results", default=None, help="Compare an existing results file instead of running")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore differences below this many ms")
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args)
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+            print(f"✅ Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, current, args.threshold, args.min_delta_ms)
+        print_comparison(rows)
+        regressions = [row for row in rows if row[-1] == "regression"]
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+if __name__ == "__main__":
+    main()
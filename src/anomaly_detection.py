@@ -2,35 +2,81 @@
 Handles anomaly detection using Isolation Forest.
 """
 
+import os
 import joblib
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.ensemble import IsolationForest
 
 class AnomalyDetector:
     """Detects anomalies in time-series data using Isolation Forest."""
-    def __init__(self, model_path="../notebooks/models/isolation_forest.pkl", contamination=0.0015, random_state=7):
+    def __init__(self, model_path="../notebooks/models/isolation_forest.pkl", contamination=0.0015, random_state=7,
+                 n_jobs=1, chunk_size=250_000, max_samples="auto"):
         self.model_path = model_path
         self.contamination = contamination
         self.random_state = random_state
-        self.model = IsolationForest(n_estimators=100, contamination=self.contamination, random_state=self.random_state)
-    
-    def fit_predict(self, data: pd.DataFrame, feature_column: str):
-        """Fits the model and predicts anomalies."""
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.model = IsolationForest(n_estimators=100, contamination=self.contamination, random_state=self.random_state,
+                                     max_samples=max_samples)
+
+    def fit(self, data: pd.DataFrame, feature_column: str, n_jobs=None):
+        """
+        Fits the model, building the trees on ``n_jobs`` threads, and saves it.
+        The file is replaced atomically, so readers never load a half-written model.
+        """
+        self.model.set_params(n_jobs=n_jobs)
         self.model.fit(data[[feature_column]])
-        data["anomaly_score"] = self.model.predict(data[[feature_column]])
-        data["anomaly"] = data["anomaly_score"].apply(lambda x: 1 if x == -1 else 0)
-        
+        # Scoring parallelism stays with ``self.n_jobs`` (see ``score``)
+        self.model.set_params(n_jobs=None)
+
         # Save the trained model
-        joblib.dump(self.model, self.model_path)
+        joblib.dump(self.model, self.model_path + ".tmp")
+        os.replace(self.model_path + ".tmp", self.model_path)
         print(f"Model saved to {self.model_path}")
-        
-        return data
+        return self
+
+    def fit_predict(self, data: pd.DataFrame, feature_column: str):
+        """Fits the model and predicts anomalies."""
+        self.fit(data, feature_column)
+        return self.predict(data, feature_column)
     
     def load_model(self):
         """Loads the trained model."""
         self.model = joblib.load(self.model_path)
         print(f"Model loaded from {self.model_path}")
+        return self
+
+    def score(self, data: pd.DataFrame, feature_column: str):
+        """
+        Continuous anomaly scores from ``IsolationForest.score_samples`` (lower is more anomalous).
+        Large frames are scored in ``chunk_size`` row chunks on ``n_jobs`` threads;
+        the tree traversal releases the GIL, so threads avoid copying the model.
+        """
+        features = data[[feature_column]]
+        chunks = [features.iloc[start:start + self.chunk_size] for start in range(0, len(features), self.chunk_size)]
+        if len(chunks) <= 1 or self.n_jobs == 1:
+            scores = [self.model.score_samples(chunk) for chunk in chunks]
+        else:
+            scores = Parallel(n_jobs=self.n_jobs, prefer="threads")(delayed(self.model.score_samples)(chunk) for chunk in chunks)
+        return np.concatenate(scores) if scores else np.empty(0)
+
+    def predict(self, data: pd.DataFrame, feature_column: str, continuous=False):
+        """
+        Labels anomalies with a fitted or loaded model.
+        Adds ``anomaly_score`` (IsolationForest's 1 / -1) and ``anomaly`` (0 / 1) columns,
+        plus the raw ``score_samples`` value as ``anomaly_score_continuous`` when ``continuous``.
+        """
+        scores = self.score(data, feature_column)
+        # Same rule as IsolationForest.predict: outlier when decision_function < 0
+        outlier = scores < self.model.offset_
+        data["anomaly_score"] = np.where(outlier, -1, 1)
+        data["anomaly"] = outlier.astype(int)
+        if continuous:
+            data["anomaly_score_continuous"] = scores
+        return data
     
     def plot_anomalies(self, data: pd.DataFrame, feature_column: str):
         """Plots anomalies detected by the model."""
@@ -9,6 +9,11 @@ from tensorflow.keras.layers import Input, Dense
 import joblib
 import matplotlib.pyplot as plt
 
+from src.instrumentation import stage
+from src.numpy_inference import export_keras_model
+from src.quantile_sketch import TDigest
+from src.training_callbacks import early_stopping
+
 class AutoencoderAnomalyDetector:
     """Autoencoder for anomaly detection using Strategy Pattern"""
 
@@ -24,7 +29,9 @@ class AutoencoderAnomalyDetector:
         autoencoder = Model(inputs=input_layer, outputs=decoder)
         return autoencoder
 
-    def train(self, data_train, save_model_path="../notebooks/models/autoencoder.h5"):
+    def train(self, data_train, save_model_path="../notebooks/models/autoencoder.h5",
+              sketch_path="../notebooks/scaler_data/autoencoder_mse_sketch.pkl",
+              export_dir="../notebooks/models/autoencoder_numpy", epochs=50, batch_size=32, patience=None):
         """Trains Autoencoder model for anomaly detection"""
         X = data_train['value_normalized'].values.reshape(-1, 1)  # Reshape to (samples, features)
         input_dim = X.shape[1]
@@ -32,24 +39,45 @@ class AutoencoderAnomalyDetector:
         self.autoencoder = self.build_autoencoder(input_dim)
         self.autoencoder.compile(optimizer='adam', loss='mse')
 
-        self.autoencoder.fit(X, X, epochs=50, batch_size=32, validation_split=0.2)
-
-        # Save trained model
-        self.autoencoder.save(save_model_path)
-        print(f"Autoencoder model saved at {save_model_path}")
+        with stage("autoencoder_fit", len(X), log=True):
+            self.autoencoder.fit(X, X, epochs=epochs, batch_size=batch_size, validation_split=0.2,
+                                 callbacks=early_stopping(patience))
 
+        self.save_model(X, save_model_path, sketch_path, export_dir)
         return self.autoencoder
 
-    def detect_anomalies(self, data_test, threshold_percentile=99.85):
-        """Detects anomalies using the trained autoencoder"""
+    def save_model(self, X, save_model_path="../notebooks/models/autoencoder.h5",
+                   sketch_path="../notebooks/scaler_data/autoencoder_mse_sketch.pkl",
+                   export_dir="../notebooks/models/autoencoder_numpy"):
+        """Saves the model, the NumPy serving export and the MSE sketch of the training data ``X``"""
+        # Save trained model
+        with stage("autoencoder_save", log=True):
+            self.autoencoder.save(save_model_path)
+            print(f"Autoencoder model saved at {save_model_path}")
+
+            # Export weights for the TensorFlow-free NumPy serving path
+            export_keras_model(self.autoencoder, export_dir)
+
+        # Persist the training reconstruction error so live scoring can reuse its threshold
+        with stage("autoencoder_baseline", len(X), log=True):
+            train_mse = np.mean(np.power(X - self.autoencoder.predict(X), 2), axis=1)
+            TDigest().update(train_mse).save(sketch_path)
+
+    def detect_anomalies(self, data_test, threshold_percentile=99.85, baseline=None):
+        """
+        Detects anomalies using the trained autoencoder.
+        :param baseline: Optional persisted TDigest of training MSE; when given its
+                         threshold is reused instead of summarizing this batch.
+        """
         z = data_test['value_normalized'].values.reshape(-1, 1)
-        predictions = self.autoencoder.predict(z)
+        with stage("autoencoder_predict", len(z)):
+            predictions = self.autoencoder.predict(z)
 
         # Compute reconstruction error (MSE)
         mse = np.mean(np.power(z - predictions, 2), axis=1)
 
         # Set threshold based on percentile
-        threshold = np.percentile(mse, threshold_percentile)
+        threshold = baseline.percentile(threshold_percentile) if baseline is not None else np.percentile(mse, threshold_percentile)
         data_test['autoencoder_anomaly'] = (mse > threshold).astype(int)
 
         return data_test, mse, threshold
@@ -0,0 +1,143 @@
+"""
+Handles vectorized anomaly scoring of many series with one predict call per model.
+
+Usage (from the project root):
+    python -m src.batch_scoring data/raw --output backend/output/batch --processes 4
+"""
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from src.columnar_io import read_timeseries
+from src.model_registry import REGISTRY_ROOT, ModelRegistry
+from src.windowing import create_windows
+
+def read_series(path, scaler=None):
+    """
+    Reads one ``timestamp,value`` series (CSV, Parquet, Arrow or .npy) as a long-format
+    frame keyed by its file name.
+    When a scaler is given the normalized values are computed here as well, so
+    the work runs inside the worker process.
+    """
+    frame = read_timeseries(path)[["timestamp", "value"]]
+    frame.insert(0, "series_id", os.path.splitext(os.path.basename(path))[0])
+    if scaler is not None:
+        frame["value_normalized"] = scaler.transform(frame["value"].values.reshape(-1, 1)).flatten()
+    return frame
+
+def load_series(paths, scaler=None, processes=None):
+    """Reads many series into one long-format frame, optionally in a process pool."""
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            frames = list(pool.map(read_series, paths, [scaler] * len(paths)))
+    else:
+        frames = [read_series(path, scaler) for path in paths]
+    return pd.concat(frames, ignore_index=True)
+
+class BatchScorer:
+    """
+    Scores a long-format frame of many series with one LSTM and one autoencoder call.
+
+    All series are normalized together, windowed over the concatenated values and
+    filtered down to the windows that do not cross a series boundary, so a single
+    tensor feeds each model. Thresholds stay per series, as in ``detect_anomalies``.
+    """
+
+    def __init__(self, lstm_model, autoencoder, scaler, time_steps, lstm_percentile=95, autoencoder_percentile=99.85):
+        self.lstm_model = lstm_model
+        self.autoencoder = autoencoder
+        self.scaler = scaler
+        self.time_steps = time_steps
+        self.lstm_percentile = lstm_percentile
+        self.autoencoder_percentile = autoencoder_percentile
+
+    def score(self, frame):
+        """
+        Flags anomalies in every series of ``frame``.
+        :param frame: Long-format DataFrame with ``series_id``, ``timestamp`` and ``value`` columns.
+        :return: Copy of the frame, grouped by series, with the detection columns added.
+        """
+        frame = frame.sort_values("series_id", kind="stable").reset_index(drop=True)
+        series_ids = frame["series_id"].to_numpy()
+        boundaries = np.flatnonzero(series_ids[1:] != series_ids[:-1]) + 1
+        starts = np.r_[0, boundaries]
+        lengths = np.diff(np.r_[starts, len(frame)])
+
+        if "value_normalized" not in frame:
+            frame["value_normalized"] = self.scaler.transform(frame["value"].values.reshape(-1, 1)).flatten()
+        normalized = frame["value_normalized"].to_numpy()
+
+        # LSTM Forecasting: keep only windows whose target lies in the same series
+        X, _ = create_windows(normalized, self.time_steps)
+        codes = np.repeat(np.arange(len(starts)), lengths)
+        valid = codes[:len(X)] == codes[self.time_steps:]
+        y_pred = self.lstm_model.predict(X[valid].reshape((-1, self.time_steps, 1)))
+        y_rescaled = self.scaler.inverse_transform(y_pred.reshape(-1, 1)).flatten()
+
+        # Autoencoder reconstruction error for every row of every series
+        X_auto = normalized.reshape(-1, 1)
+        predictions = self.autoencoder.predict(X_auto)
+        mse = np.mean(np.power(X_auto - predictions, 2), axis=1)
+
+        window_counts = np.maximum(lengths - self.time_steps, 0)
+        lstm_thresholds = self._thresholds(y_rescaled, window_counts, self.lstm_percentile)
+        autoencoder_thresholds = self._thresholds(mse, lengths, self.autoencoder_percentile)
+
+        frame["predicted_failure"] = (normalized > np.repeat(lstm_thresholds, lengths)).astype(int)
+        frame["autoencoder_anomaly"] = (mse > np.repeat(autoencoder_thresholds, lengths)).astype(int)
+        frame["maintenance_alert"] = frame["autoencoder_anomaly"] | frame["predicted_failure"]
+        return frame
+
+    @staticmethod
+    def _thresholds(values, counts, percentile):
+        """Per-series percentile of consecutive segments; NaN (never exceeded) for empty ones."""
+        segments = np.split(values, np.cumsum(counts)[:-1])
+        return np.array([np.percentile(s, percentile) if len(s) else np.nan for s in segments])
+
+def write_alerts(scored, output_dir):
+    """Writes ``<series_id>_alerts.csv`` per series with alerts, plus ``summary.csv``."""
+    os.makedirs(output_dir, exist_ok=True)
+    summary = scored.groupby("series_id", sort=False).agg(rows=("value", "size"), alerts=("maintenance_alert", "sum"))
+    alerts = scored[scored["maintenance_alert"] == 1]
+    for series_id, rows in alerts.groupby("series_id", sort=False):
+        rows.to_csv(os.path.join(output_dir, f"{series_id}_alerts.csv"), index=False)
+    summary.to_csv(os.path.join(output_dir, "summary.csv"))
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Scores every series in a directory and writes per-series alerts.")
+    parser.add_argument("input_dir")
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--output", default="backend/output/batch")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes for CSV parsing and normalization")
+    parser.add_argument("--registry-root", default=REGISTRY_ROOT)
+    parser.add_argument("--model", default="default")
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--backend", choices=["keras", "numpy"], default="keras")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry_root, backend=args.backend)
+    bundle = registry.get(args.model, args.version)
+    paths = sorted(glob.glob(os.path.join(args.input_dir, args.pattern)))
+
+    start = time.perf_counter()
+    frame = load_series(paths, bundle.scaler, args.processes)
+    loaded = time.perf_counter()
+    scored = BatchScorer(bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps).score(frame)
+    scored_at = time.perf_counter()
+    summary = write_alerts(scored, args.output)
+
+    elapsed = scored_at - start
+    print(summary.to_string())
+    print(f"{len(paths)} series, {len(scored)} rows in {elapsed:.2f}s "
+          f"(load {loaded - start:.2f}s, score {scored_at - loaded:.2f}s): "
+          f"{len(paths) / elapsed:.1f} series/s, {len(scored) / elapsed:.0f} rows/s")
+    bundle.close()
+
+if __name__ == "__main__":
+    main()
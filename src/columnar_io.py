@@ -0,0 +1,138 @@
+"""
+Handles reading and writing time series as CSV, Parquet, Arrow IPC or memory-mapped .npy.
+
+Usage (from the project root):
+    python -m src.columnar_io data/raw data/processed --to npy
+"""
+
+import argparse
+import glob
+import os
+import time
+import numpy as np
+import pandas as pd
+
+FORMATS = ("csv", "parquet", "arrow", "npy")
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow", "npy": ".npy"}
+
+# Leading bytes of each binary format; anything else is treated as CSV
+MAGIC = [
+    (b"PAR1", "parquet"),
+    (b"ARROW1", "arrow"),
+    (b"\xff\xff\xff\xff", "arrow"),  # IPC stream continuation marker
+    (b"\x93NUMPY", "npy"),
+]
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+    "application/vnd.apache.arrow.file": "arrow",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/x-npy": "npy",
+}
+
+def sniff_format(head, content_type=None):
+    """Detects the format from the first bytes, falling back to the content type, then CSV."""
+    for magic, fmt in MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return CONTENT_TYPES.get((content_type or "").split(";")[0].strip(), "csv")
+
+def detect_format(path, content_type=None):
+    with open(path, "rb") as f:
+        return sniff_format(f.read(8), content_type)
+
+def read_timeseries(path, fmt=None, content_type=None):
+    """
+    Reads a ``timestamp,value[,...]`` series in any supported format.
+
+    Arrow IPC and .npy files are memory-mapped: numeric columns are views of the
+    mapped file, so the value column reaches ``scaler.transform`` without a copy
+    and only the pages actually touched are read. Parquet and Arrow need pyarrow.
+    :return: DataFrame with a datetime ``timestamp`` column, like ``pd.read_csv(..., parse_dates=["timestamp"])``.
+    """
+    fmt = fmt or detect_format(path, content_type)
+    if fmt == "csv":
+        return pd.read_csv(path, parse_dates=["timestamp"])
+
+    if fmt == "npy":
+        records = np.load(path, mmap_mode="r")
+        if records.dtype.names is None:
+            raise ValueError(f"{path}: expected a structured array with named fields (timestamp, value, ...)")
+        frame = pd.DataFrame({name: records[name] for name in records.dtype.names}, copy=False)
+    elif fmt == "arrow":
+        import pyarrow as pa
+
+        source = pa.memory_map(path, "r")
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            source.seek(0)
+            table = pa.ipc.open_stream(source).read_all()
+        frame = table.to_pandas(split_blocks=True)
+    elif fmt == "parquet":
+        frame = pd.read_parquet(path)
+    else:
+        raise ValueError(f"Unknown format {fmt!r}")
+
+    if "timestamp" not in frame:
+        raise ValueError(f"{path}: missing the timestamp column")
+    if not pd.api.types.is_datetime64_any_dtype(frame["timestamp"]):
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+    return frame
+
+def write_timeseries(frame, path, fmt=None):
+    """Writes ``frame`` (index dropped) in the format given or implied by the extension."""
+    fmt = fmt or next((f for f, ext in EXTENSIONS.items() if path.endswith(ext)), "csv")
+    if fmt == "csv":
+        frame.to_csv(path, index=False)
+    elif fmt == "npy":
+        columns = {name: frame[name].to_numpy() for name in frame.columns}
+        unsupported = [name for name, column in columns.items() if column.dtype.kind not in "biufM"]
+        if unsupported:
+            raise ValueError(f"Columns {unsupported} cannot be stored in .npy (numeric and datetime only)")
+        records = np.empty(len(frame), dtype=[(name, column.dtype) for name, column in columns.items()])
+        for name, column in columns.items():
+            records[name] = column
+        np.save(path, records)
+    elif fmt == "arrow":
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif fmt == "parquet":
+        frame.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Unknown format {fmt!r}")
+    return path
+
+def convert(paths, fmt, output_dir=None):
+    """Converts CSV files to ``fmt``, next to each source unless ``output_dir`` is given."""
+    written = []
+    for path in paths:
+        start = time.perf_counter()
+        frame = read_timeseries(path, "csv")
+        target_dir = output_dir or os.path.dirname(path)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, os.path.splitext(os.path.basename(path))[0] + EXTENSIONS[fmt])
+        write_timeseries(frame, target, fmt)
+        print(f"✅ {path} -> {target} ({len(frame)} rows, {time.perf_counter() - start:.2f}s)")
+        written.append(target)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Converts CSV time series to a columnar binary format.")
+    parser.add_argument("inputs", nargs="+", help="CSV files or directories of CSV files")
+    parser.add_argument("--to", choices=[f for f in FORMATS if f != "csv"], default="npy")
+    parser.add_argument("--output", default=None, help="Output directory (default: next to each input)")
+    args = parser.parse_args()
+
+    paths = []
+    for source in args.inputs:
+        paths.extend(sorted(glob.glob(os.path.join(source, "*.csv"))) if os.path.isdir(source) else [source])
+    convert(paths, args.to, args.output)
+
+if __name__ == "__main__":
+    main()
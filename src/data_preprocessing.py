@@ -2,20 +2,41 @@
 Handles data preprocessing and normalization.
 """
 
+import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
 import joblib
+import numpy as np
+import pandas as pd
 from sklearn.preprocessing import MinMaxScaler, StandardScaler
 
 class NormalizationStrategy:
     """Base class for normalization strategies."""
     def normalize(self, data):
         raise NotImplementedError("Subclasses must implement normalize method")
-    
+
+    def partial_fit(self, data):
+        """Updates the scaler statistics with another chunk of data."""
+        self.scaler.partial_fit(data)
+        return self
+
+    def transform(self, data):
+        return self.scaler.transform(data)
+
+    def merge(self, other):
+        """Folds the statistics of another partially fitted strategy into this one."""
+        raise NotImplementedError("Subclasses must implement merge method")
+
     def save_scaler(self, file_path):
         """Saves the fitted scaler to a file."""
         joblib.dump(self.scaler, file_path)
         print(f"✅ Scaler saved to {file_path}")
 
+    def load_scaler(self, file_path):
+        """Loads a previously saved scaler, e.g. to keep updating it with new data."""
+        self.scaler = joblib.load(file_path)
+        return self
+
 class MinMaxNormalization(NormalizationStrategy):
     """MinMax Scaling Normalization."""
     def __init__(self):
@@ -24,6 +45,18 @@ class MinMaxNormalization(NormalizationStrategy):
     def normalize(self, data):
         return self.scaler.fit_transform(data)
 
+    def merge(self, other):
+        if not hasattr(other.scaler, "n_samples_seen_"):
+            return self
+        if not hasattr(self.scaler, "n_samples_seen_"):
+            self.scaler = other.scaler
+            return self
+        # A two-row partial_fit recomputes range, scale_ and min_ exactly as sklearn does
+        n_samples_seen = self.scaler.n_samples_seen_ + other.scaler.n_samples_seen_
+        self.scaler.partial_fit(_like_fitted(np.vstack([other.scaler.data_min_, other.scaler.data_max_]), self.scaler))
+        self.scaler.n_samples_seen_ = n_samples_seen
+        return self
+
 class StandardNormalization(NormalizationStrategy):
     """Standard Scaling Normalization (Z-score)."""
     def __init__(self):
@@ -32,18 +65,109 @@ class StandardNormalization(NormalizationStrategy):
     def normalize(self, data):
         return self.scaler.fit_transform(data)
 
+    def merge(self, other):
+        if not hasattr(other.scaler, "n_samples_seen_"):
+            return self
+        if not hasattr(self.scaler, "n_samples_seen_"):
+            self.scaler = other.scaler
+            return self
+        # Chan et al. pairwise update of count, mean and variance
+        a, b = self.scaler, other.scaler
+        n = a.n_samples_seen_ + b.n_samples_seen_
+        delta = b.mean_ - a.mean_
+        mean = a.mean_ + delta * b.n_samples_seen_ / n
+        m2 = a.var_ * a.n_samples_seen_ + b.var_ * b.n_samples_seen_ + delta ** 2 * a.n_samples_seen_ * b.n_samples_seen_ / n
+        a.n_samples_seen_, a.mean_, a.var_ = n, mean, m2 / n
+        a.scale_ = np.where(a.var_ > 0, np.sqrt(a.var_), 1.0)
+        return self
+
+def _like_fitted(values, scaler):
+    """Wraps raw rows with the feature names the scaler was fitted with, if any."""
+    names = getattr(scaler, "feature_names_in_", None)
+    return pd.DataFrame(values, columns=names) if names is not None else values
+
+def iter_column_chunks(source, column="value", chunk_size=100_000):
+    """
+    Yields ``source[[column]]`` in DataFrame chunks without loading it whole.
+
+    ``source`` may be a CSV path, a glob or list of CSV paths, a Parquet / Arrow /
+    .npy file (read through ``columnar_io``, memory-mapped where possible), a
+    plain or memory-mapped NumPy array, or any iterable of DataFrame chunks.
+    """
+    if isinstance(source, str) and not os.path.exists(source):
+        source = sorted(glob.glob(source))
+    if isinstance(source, str):
+        if source.endswith(".csv"):
+            yield from pd.read_csv(source, usecols=[column], chunksize=chunk_size)
+            return
+        from src.columnar_io import read_timeseries
+
+        source = read_timeseries(source)[column].to_numpy()
+    if isinstance(source, np.ndarray):
+        values = source.reshape(-1)
+        for start in range(0, len(values), chunk_size):
+            yield pd.DataFrame({column: values[start:start + chunk_size]})
+        return
+    for chunk in source:
+        if isinstance(chunk, str):
+            yield from iter_column_chunks(chunk, column, chunk_size)
+        else:
+            yield chunk[[column]]
+
+def _fit_source(strategy_class, source, column, chunk_size):
+    """Partial statistics of one file; runs in a worker process."""
+    strategy = strategy_class()
+    for chunk in iter_column_chunks(source, column, chunk_size):
+        strategy.partial_fit(chunk)
+    return strategy
+
 class DataPreprocessor:
     """Applies a chosen normalization strategy to the dataset."""
     def __init__(self, strategy: NormalizationStrategy, save_path="../notebooks/scaler_data/scaler.pkl"):
         self.strategy = strategy
         self.save_path = save_path
-        
+
         # Ensure the directory exists
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
-    def apply_normalization(self, data, column):
-        data[column + '_normalized'] = self.strategy.normalize(data[[column]])
-        
+    def apply_normalization(self, data, column, incremental=False):
+        """
+        Adds ``<column>_normalized`` and saves the scaler.
+        :param incremental: Update the current scaler statistics with ``data`` (``partial_fit``)
+                            instead of refitting from scratch, e.g. for newly appended readings.
+        """
+        if incremental:
+            self.strategy.partial_fit(data[[column]])
+            data[column + '_normalized'] = self.strategy.transform(data[[column]])
+        else:
+            data[column + '_normalized'] = self.strategy.normalize(data[[column]])
+
         # ✅ Save the fitted scaler
         self.strategy.save_scaler(self.save_path)
-        return data
\ No newline at end of file
+        return data
+
+    def fit_incremental(self, source, column="value", chunk_size=100_000, n_jobs=1):
+        """
+        Fits the scaler in one pass over a chunked source and saves it.
+
+        Memory stays at one chunk, and the saved scaler matches a
+        ``fit_transform`` over the concatenated data, so ``backend/app.py`` and
+        ``LSTMForecaster`` use it unchanged. With ``n_jobs > 1`` and several
+        files, each file is fitted in a worker process and the partial
+        statistics are merged. Statistics already in the strategy are kept, so
+        calling this again with new files updates them.
+        :param source: See ``iter_column_chunks``.
+        """
+        sources = sorted(glob.glob(source)) if isinstance(source, str) and not os.path.exists(source) else source
+        if n_jobs > 1 and isinstance(sources, (list, tuple)) and len(sources) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                partials = pool.map(_fit_source, [type(self.strategy)] * len(sources), sources,
+                                    [column] * len(sources), [chunk_size] * len(sources))
+                for partial in partials:
+                    self.strategy.merge(partial)
+        else:
+            for chunk in iter_column_chunks(sources, column, chunk_size):
+                self.strategy.partial_fit(chunk)
+
+        self.strategy.save_scaler(self.save_path)
+        return self.strategy.scaler
@@ -0,0 +1,67 @@
+"""
+Handles downsampling of long series to a point budget for plotting.
+"""
+
+import numpy as np
+
+def lttb_indices(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets: picks ``points`` indices that preserve the visual
+    shape of the line. The first and last points are always kept.
+    """
+    n = len(y)
+    if points >= n:
+        return np.arange(n)
+    if points < 3:
+        return np.array([0, n - 1])[:points]
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # Interior points split into points - 2 buckets
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    selected = np.empty(points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        # The third vertex is the average of the next bucket (or the last point)
+        if bucket + 2 < len(edges):
+            next_lo, next_hi = edges[bucket + 1], edges[bucket + 2]
+            avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[previous] - avg_x) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (avg_y - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+def minmax_indices(y, points):
+    """Keeps the minimum and maximum of ``points // 2`` equal buckets, in time order."""
+    n = len(y)
+    buckets = max(points // 2, 1)
+    if points >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    # Sort by (bucket, value): each bucket's first entry is its min, its last entry its max
+    bucket_ids = np.repeat(np.arange(buckets), np.diff(edges))
+    order = np.lexsort((y, bucket_ids))
+    return np.unique(np.concatenate([order[edges[:-1]], order[edges[1:] - 1]]))
+
+def downsample(x, y, points, method="lttb", keep=None):
+    """
+    Indices of the rows to plot under a ``points`` budget.
+    :param method: "lttb" or "minmax".
+    :param keep: Optional boolean mask of rows that are always kept (e.g. alerts), on top of the budget.
+    """
+    if method == "lttb":
+        indices = lttb_indices(x, y, points)
+    elif method == "minmax":
+        indices = minmax_indices(y, points)
+    else:
+        raise ValueError(f"Unknown downsampling method {method!r}")
+    if keep is not None:
+        indices = np.union1d(indices, np.flatnonzero(keep))
+    return indices
@@ -0,0 +1,266 @@
+"""
+Handles evaluation of anomaly detectors against the NAB labels in data/raw/combined_labels.json.
+
+Usage (from the project root):
+    python -m src.evaluation_harness --detectors isolation_forest autoencoder backend --workers 2
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# NAB standard profile: weights of a detected window, a false positive and a missed window
+A_TP, A_FP, A_FN = 1.0, -0.11, -1.0
+# NAB windows span 10% of the series, split evenly between its labels
+WINDOW_FRACTION = 0.1
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def scaled_sigmoid(position):
+    """NAB weight of a detection at ``position`` window lengths relative to a window end."""
+    return np.where(position > 3, -1.0, 2 / (1 + np.exp(5 * np.minimum(position, 3))) - 1)
+
+class LabelIndex:
+    """
+    Label timestamps of every series, loaded once, with NAB windows as IntervalIndexes.
+
+    Series are matched by file name, so ``data/raw/numenta_ec2_cpu_utilization_24ae8d.csv``
+    resolves to ``realAWSCloudwatch/ec2_cpu_utilization_24ae8d.csv``.
+    """
+
+    def __init__(self, labels_path=os.path.join(PROJECT_ROOT, "data", "raw", "combined_labels.json")):
+        with open(labels_path) as f:
+            labels = json.load(f)
+        self.labels = {key: pd.to_datetime(pd.Series(points, dtype="object")).to_numpy(dtype="datetime64[ns]")
+                       for key, points in labels.items()}
+        self._by_name = {os.path.basename(key): key for key in labels}
+
+    def key(self, path):
+        """Label key of a data file, or None when the series is not labeled."""
+        name = os.path.basename(path)
+        for candidate in (name, name.removeprefix("numenta_")):
+            if candidate in self._by_name:
+                return self._by_name[candidate]
+        return None
+
+    def windows(self, key, timestamps):
+        """
+        NAB windows of a series: ``WINDOW_FRACTION`` of its rows, divided between the
+        labels and centred on each.
+        :return: ``(IntervalIndex of timestamps, start rows, end rows)`` (ends inclusive).
+        """
+        points = np.sort(self.labels[key])
+        n = len(timestamps)
+        if len(points) == 0 or n == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return pd.IntervalIndex.from_arrays(timestamps[:0], timestamps[:0], closed="both"), empty, empty
+        half = int(n * WINDOW_FRACTION / len(points)) // 2
+        centres = np.searchsorted(timestamps, points)
+        starts = np.clip(centres - half, 0, n - 1)
+        ends = np.clip(centres + half, 0, n - 1)
+        return pd.IntervalIndex.from_arrays(timestamps[starts], timestamps[ends], closed="both"), starts, ends
+
+def pointwise_metrics(y_true, y_pred):
+    """Precision, recall and F1 from vectorized counts (0 where undefined, like sklearn)."""
+    y_true, y_pred = np.asarray(y_true, bool), np.asarray(y_pred, bool)
+    tp = np.count_nonzero(y_true & y_pred)
+    fp = np.count_nonzero(~y_true & y_pred)
+    fn = np.count_nonzero(y_true & ~y_pred)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+def window_metrics(alerts, starts, ends):
+    """
+    NAB-style scoring of alert flags against windows given as inclusive row ranges.
+
+    Every step is an interval join done with ``searchsorted``/``cumsum`` over the
+    sorted alert rows, so the cost is O(rows + windows) without per-row loops.
+    """
+    n = len(alerts)
+    alert_rows = np.flatnonzero(alerts)
+
+    # Rows covered by any window: +1 at each start, -1 after each end
+    coverage = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(coverage, starts, 1)
+    np.add.at(coverage, ends + 1, -1)
+    in_window = np.cumsum(coverage[:n]) > 0
+
+    # First alert at or after each window start, if it falls inside the window
+    first = np.searchsorted(alert_rows, starts)
+    candidate = alert_rows[np.minimum(first, max(len(alert_rows) - 1, 0))] if len(alert_rows) else np.full(len(starts), -1)
+    detected = (first < len(alert_rows)) & (candidate <= ends)
+    lengths = np.maximum(ends - starts + 1, 1)
+    tp_positions = (candidate - ends) / lengths  # in [-1, 0] for detections
+    tp_score = (scaled_sigmoid(tp_positions[detected]) * A_TP).sum()
+
+    # False positives, weighted by their distance past the preceding window
+    fp_rows = alert_rows[~in_window[alert_rows]]
+    previous = np.searchsorted(ends, fp_rows) - 1
+    fp_weights = np.full(len(fp_rows), -1.0)
+    after = previous >= 0
+    fp_weights[after] = scaled_sigmoid((fp_rows[after] - ends[previous[after]]) / lengths[previous[after]])
+    fp_score = (fp_weights * abs(A_FP)).sum()
+
+    missed = len(starts) - np.count_nonzero(detected)
+    return {
+        "windows": len(starts),
+        "detected_windows": int(np.count_nonzero(detected)),
+        "missed_windows": int(missed),
+        "false_positives": len(fp_rows),
+        "window_recall": np.count_nonzero(detected) / len(starts) if len(starts) else np.nan,
+        "nab_raw": tp_score + fp_score + missed * A_FN,
+        "nab_null": len(starts) * A_FN,
+        "nab_perfect": len(starts) * float(scaled_sigmoid(np.array(-1.0))) * A_TP,
+    }
+
+def nab_normalized(raw, null, perfect):
+    """NAB score normalized so that no detections scores 0 and perfect detection 100."""
+    return 100 * (raw - null) / (perfect - null) if perfect != null else np.nan
+
+# Detectors run in worker processes; each returns one alert flag per row of ``data``
+
+_loaded = {}
+
+def _scaler(artifacts):
+    import joblib
+
+    if "scaler" not in _loaded:
+        _loaded["scaler"] = joblib.load(os.path.join(artifacts, "scaler_data", "scaler.pkl"))
+    return _loaded["scaler"]
+
+def detect_isolation_forest(data, artifacts):
+    from src.anomaly_detection import AnomalyDetector
+
+    detector = AnomalyDetector(os.path.join(tempfile.gettempdir(), f"isolation_forest_{os.getpid()}.pkl"))
+    return detector.fit_predict(data, "value")["anomaly"].to_numpy()
+
+def detect_autoencoder(data, artifacts):
+    if "autoencoder" not in _loaded:
+        from tensorflow.keras.models import load_model
+        from src.autoencoder import AutoencoderAnomalyDetector
+
+        _loaded["autoencoder"] = AutoencoderAnomalyDetector()
+        _loaded["autoencoder"].autoencoder = load_model(os.path.join(artifacts, "models", "autoencoder.h5"), compile=False)
+    data["value_normalized"] = _scaler(artifacts).transform(data[["value"]]).ravel()
+    data, _, _ = _loaded["autoencoder"].detect_anomalies(data)
+    return data["autoencoder_anomaly"].to_numpy()
+
+def detect_backend(data, artifacts):
+    """The backend's ``detect_anomalies`` (LSTM + autoencoder), imported from backend/app.py."""
+    if "backend" not in _loaded:
+        # The backend resolves its paths relative to its own folder, also when loading models,
+        # so the worker stays there (every other path it uses is absolute)
+        os.chdir(os.path.join(PROJECT_ROOT, "backend"))
+        sys.path.insert(0, os.getcwd())
+        import app as backend
+        _loaded["backend"] = backend
+    frame = data.set_index("timestamp")
+    return _loaded["backend"].detect_anomalies(frame)["maintenance_alert"].to_numpy()
+
+DETECTORS = {
+    "isolation_forest": detect_isolation_forest,
+    "autoencoder": detect_autoencoder,
+    "backend": detect_backend,
+}
+
+def _run_detector(detector, path, artifacts):
+    """Worker: reads one series and runs one detector on it; returns timestamps, alerts and timings."""
+    data = pd.read_csv(path, parse_dates=["timestamp"])
+    func = DETECTORS[detector]
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        alerts = func(data.copy(), artifacts)
+        seconds = time.perf_counter() - start
+    return data["timestamp"].to_numpy(dtype="datetime64[ns]"), np.asarray(alerts).astype(bool), seconds
+
+def evaluate(detectors, pattern=os.path.join(PROJECT_ROOT, "data", "raw", "*.csv"), labels=None, workers=None,
+             artifacts=os.path.join(PROJECT_ROOT, "notebooks")):
+    """
+    Runs every detector over every labeled series and scores it.
+
+    Detection runs in a pool of spawned worker processes (TensorFlow is not
+    fork-safe); the labels are loaded once here and all scoring happens in the
+    parent. ``detect_seconds`` includes a worker's one-time model load on the
+    first series it scores.
+    :return: ``(per_series, summary)`` DataFrames.
+    """
+    labels = labels or LabelIndex()
+    series = [(path, labels.key(path)) for path in sorted(glob.glob(pattern))]
+    series = [(path, key) for path, key in series if key is not None]
+    jobs = [(detector, path, key) for detector in detectors for path, key in series]
+
+    rows = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_run_detector, detector, path, artifacts) for detector, path, _ in jobs]
+        for (detector, path, key), future in zip(jobs, futures):
+            timestamps, alerts, seconds = future.result()
+            _, starts, ends = labels.windows(key, timestamps)
+            y_true = np.isin(timestamps, labels.labels[key])
+            rows.append({
+                "detector": detector,
+                "series": key,
+                "rows": len(alerts),
+                "alerts": int(alerts.sum()),
+                **pointwise_metrics(y_true, alerts),
+                **window_metrics(alerts, starts, ends),
+                "detect_seconds": seconds,
+            })
+    wall = time.perf_counter() - start
+
+    per_series = pd.DataFrame(rows)
+    per_series["nab_score"] = [nab_normalized(r.nab_raw, r.nab_null, r.nab_perfect) for r in per_series.itertuples()]
+    per_series["rows_per_s"] = per_series["rows"] / per_series["detect_seconds"]
+
+    summary = per_series.groupby("detector", sort=False).agg(
+        series=("series", "count"), rows=("rows", "sum"), windows=("windows", "sum"),
+        detected_windows=("detected_windows", "sum"), false_positives=("false_positives", "sum"),
+        mean_f1=("f1", "mean"), nab_raw=("nab_raw", "sum"), nab_null=("nab_null", "sum"),
+        nab_perfect=("nab_perfect", "sum"), detect_seconds=("detect_seconds", "sum"),
+    ).reset_index()
+    summary["nab_score"] = [nab_normalized(r.nab_raw, r.nab_null, r.nab_perfect) for r in summary.itertuples()]
+    summary["window_recall"] = summary["detected_windows"] / summary["windows"]
+    summary["ms_per_1k_rows"] = summary["detect_seconds"] / summary["rows"] * 1e6
+    summary.attrs["wall_seconds"] = wall
+    return per_series, summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Scores anomaly detectors against the NAB labels of data/raw.")
+    parser.add_argument("--detectors", nargs="+", choices=list(DETECTORS), default=["isolation_forest"])
+    parser.add_argument("--pattern", default="data/raw/*.csv")
+    parser.add_argument("--labels", default="data/raw/combined_labels.json")
+    parser.add_argument("--artifacts", default="notebooks",
+                        help="Folder holding models/ and scaler_data/ (the backend detector uses its own registry)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="output/evaluation", help="Folder for per_series.csv and summary.csv")
+    args = parser.parse_args()
+
+    per_series, summary = evaluate(args.detectors, os.path.abspath(args.pattern), LabelIndex(args.labels), args.workers,
+                                   os.path.abspath(args.artifacts))
+    columns = ["detector", "series", "rows", "alerts", "f1", "detected_windows", "windows", "false_positives",
+               "nab_score", "detect_seconds"]
+    print(per_series[columns].to_string(index=False, float_format="%.3f"))
+    print()
+    print(summary[["detector", "series", "rows", "mean_f1", "window_recall", "false_positives", "nab_score",
+                   "detect_seconds", "ms_per_1k_rows"]].to_string(index=False, float_format="%.3f"))
+    print(f"Wall time: {summary.attrs['wall_seconds']:.1f}s")
+
+    os.makedirs(args.output, exist_ok=True)
+    per_series.to_csv(os.path.join(args.output, "per_series.csv"), index=False)
+    summary.to_csv(os.path.join(args.output, "summary.csv"), index=False)
+    print(f"✅ Evaluation report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ from scipy.fftpack import fft
 from sklearn.preprocessing import MinMaxScaler, LabelEncoder, OneHotEncoder
 from sklearn.ensemble import IsolationForest
 
+from src.rolling_features import RollingFeatureEngine
+from src.spectral_features import SpectralFeatureEngine
+
 class FeatureEngineering:
     def __init__(self, data):
         """
@@ -40,6 +43,13 @@ class FeatureEngineering:
         self.data[f"{column}_rolling_max"] = self.data[column].rolling(window=window, min_periods=1).max()
         self.data[f"{column}_rolling_min"] = self.data[column].rolling(window=window, min_periods=1).min()
 
+    def add_fused_rolling_features(self, column, stat_window=10, rolling_window=5):
+        """
+        Add the statistical and rolling window features in one fused pass.
+        Same columns as add_statistical_features + add_rolling_features.
+        """
+        RollingFeatureEngine(column, stat_window, rolling_window).transform(self.data)
+
     def add_fourier_features(self, column):
         """
         Perform Fourier Transform and extract real & imaginary components.
@@ -48,6 +58,13 @@ class FeatureEngineering:
         self.data[f"{column}_fft_real"] = np.real(fft_values)
         self.data[f"{column}_fft_imag"] = np.imag(fft_values)
 
+    def add_spectral_features(self, column, window=64, hop=1, n_bands=4):
+        """
+        Add short-time spectral features: Hann-windowed FFT band energies of the
+        window ending at each row, computed every ``hop`` rows.
+        """
+        SpectralFeatureEngine(column, window, hop, n_bands).transform(self.data)
+
     def add_lag_features(self, column, lags=3):
         """
         Create lag features to capture past values.
@@ -71,7 +88,7 @@ class FeatureEngineering:
         """
         iso_forest = IsolationForest(n_estimators=100, contamination=0.0015, random_state=42)
         self.data["anomaly_score"] = iso_forest.fit_predict(self.data[[column]])
-        self.data["anomaly"] = self.data["anomaly_score"].apply(lambda x: 1 if x == -1 else 0)
+        self.data["anomaly"] = (self.data["anomaly_score"] == -1).astype(int)
 
     def add_categorical_encoding(self, column):
         """
@@ -92,14 +109,23 @@ class FeatureEngineering:
         """
         self.data["spike"] = (self.data[column].diff().abs() > threshold).astype(int)
 
-    def apply_all_features(self, column, datetime_column=None):
+    def apply_all_features(self, column, datetime_column=None, fused_rolling=False, spectral=False):
         """
         Apply all feature engineering techniques to the dataset.
+        :param fused_rolling: Opt in to computing the rolling features in one fused pass instead of seven
+                              pandas passes; skew/kurtosis differ from pandas on near-flat windows.
+        :param spectral: Use windowed STFT band energies instead of the whole-series FFT coefficients.
         """
         # self.normalize_column(column)
-        self.add_statistical_features(column)
-        self.add_rolling_features(column)
-        self.add_fourier_features(column)
+        if fused_rolling:
+            self.add_fused_rolling_features(column)
+        else:
+            self.add_statistical_features(column)
+            self.add_rolling_features(column)
+        if spectral:
+            self.add_spectral_features(column)
+        else:
+            self.add_fourier_features(column)
         self.add_lag_features(column, lags=3)
         # self.add_anomaly_scores(column)
         if datetime_column:
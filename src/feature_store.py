@@ -0,0 +1,195 @@
+"""
+Handles an append-only, memory-mapped store of engineered features per series.
+
+Usage:
+    store = FeatureStore("data/features", spectral=True)
+    store.append("ec2_request_latency", new_rows)          # only the tail is recomputed
+    features = store.read("ec2_request_latency", start="2014-03-01", end="2014-03-02")
+"""
+
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import FeatureEngineering
+from src.result_cache import content_key
+
+# Bump when a feature's definition changes, so old entries are not mixed with new rows
+FEATURE_VERSION = 1
+
+# Window sizes and lags used by FeatureEngineering.apply_all_features
+STAT_WINDOW, ROLLING_WINDOW, LAGS, SPECTRAL_WINDOW = 10, 5, 3, 64
+
+MANIFEST = "manifest.json"
+
+class FeatureStore:
+    """
+    Features of ``apply_all_features`` for many series, one directory per series
+    and feature configuration: ``<root>/<series>/<config hash>/``.
+
+    Each column is a raw little-endian binary file that only ever grows, plus a
+    manifest with the dtypes and the committed row count. Appending recomputes
+    the new rows together with ``lookback`` rows of stored context (the largest
+    rolling window / lag / STFT window), appends the new rows to every column
+    and then commits the manifest; bytes past the committed count (from a crash
+    mid-append) are truncated on the next append. Whole-series FFT columns
+    (``spectral=False``) depend on every row, so they are recomputed and
+    replaced on each append; the causal STFT mode avoids that. Reads
+    memory-map the columns and slice a time range with a binary search.
+    """
+
+    def __init__(self, root="../data/features", column="value", datetime_column="timestamp", fused_rolling=False,
+                 spectral=False):
+        self.root = root
+        self.config = {
+            "column": column,
+            "datetime_column": datetime_column,
+            "fused_rolling": fused_rolling,
+            "spectral": spectral,
+            "feature_version": FEATURE_VERSION,
+        }
+        self.version = content_key(json.dumps(self.config, sort_keys=True))[:16]
+        self.lookback = max(STAT_WINDOW, ROLLING_WINDOW, LAGS + 1, SPECTRAL_WINDOW if spectral else 0)
+        self.global_columns = [] if spectral else [f"{column}_fft_real", f"{column}_fft_imag"]
+        self._lock = threading.Lock()
+
+    def _directory(self, series):
+        return os.path.join(self.root, series, self.version)
+
+    def _manifest(self, series):
+        path = os.path.join(self._directory(series), MANIFEST)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _commit(self, series, manifest):
+        path = os.path.join(self._directory(series), MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _column(self, series, manifest, name, start=0, stop=None):
+        """Memory-mapped rows ``start:stop`` of a committed column."""
+        dtype = np.dtype(manifest["columns"][name])
+        stop = manifest["rows"] if stop is None else stop
+        if stop <= start:
+            return np.empty(0, dtype=dtype)
+        path = os.path.join(self._directory(series), f"{name}.bin")
+        return np.memmap(path, dtype=dtype, mode="r", offset=start * dtype.itemsize, shape=(stop - start,))
+
+    def _features(self, data):
+        return FeatureEngineering(data).apply_all_features(
+            self.config["column"], self.config["datetime_column"], self.config["fused_rolling"], self.config["spectral"])
+
+    def rows(self, series):
+        manifest = self._manifest(series)
+        return manifest["rows"] if manifest else 0
+
+    def append(self, series, data):
+        """
+        Appends new readings of ``series`` and materializes their features.
+        ``data`` is not modified; its timestamps must all be later than the stored ones.
+        :return: Number of rows appended.
+        """
+        if len(data) == 0:
+            return 0
+        datetime_column = self.config["datetime_column"]
+        data = data.reset_index(drop=True)
+        data[datetime_column] = pd.to_datetime(data[datetime_column])
+        if not data[datetime_column].is_monotonic_increasing:
+            raise ValueError(f"Rows of {series!r} must be sorted by {datetime_column!r}")
+
+        with self._lock:
+            manifest = self._manifest(series)
+            if manifest is None:
+                return self._create(series, data)
+
+            inputs = manifest["inputs"]
+            if sorted(data.columns) != sorted(inputs):
+                raise ValueError(f"Expected columns {inputs} for {series!r}, got {list(data.columns)}")
+            last = self._column(series, manifest, datetime_column, manifest["rows"] - 1)[0]
+            if data[datetime_column].iloc[0] <= last:
+                raise ValueError(f"Appended rows of {series!r} must start after {pd.Timestamp(last)}")
+
+            # Recompute the new rows with enough stored history for every window and lag
+            n = manifest["rows"]
+            context_start = max(n - self.lookback, 0)
+            context = pd.DataFrame({name: self._column(series, manifest, name, context_start) for name in inputs})
+            features = self._features(pd.concat([context, data[inputs]], ignore_index=True))
+            tail = features.iloc[n - context_start:]
+
+            directory = self._directory(series)
+            for name, dtype in manifest["columns"].items():
+                if name in self.global_columns:
+                    continue
+                path = os.path.join(directory, f"{name}.bin")
+                with open(path, "r+b") as f:
+                    f.truncate(n * np.dtype(dtype).itemsize)  # drop bytes of an uncommitted append
+                    f.seek(0, os.SEEK_END)
+                    f.write(np.ascontiguousarray(tail[name].to_numpy(dtype=dtype)).tobytes())
+            if self.global_columns:
+                values = np.concatenate([self._column(series, manifest, self.config["column"]),
+                                         data[self.config["column"]].to_numpy(dtype=manifest["columns"][self.config["column"]])])
+                self._write_global(series, manifest, values)
+
+            manifest["rows"] = n + len(data)
+            self._commit(series, manifest)
+        return len(data)
+
+    def _create(self, series, data):
+        features = self._features(data.copy())
+        unsupported = [name for name in features.columns if features[name].dtype.kind not in "biufM"]
+        if unsupported:
+            raise ValueError(f"Columns {unsupported} cannot be stored (numeric and datetime only)")
+
+        directory = self._directory(series)
+        os.makedirs(directory, exist_ok=True)
+        manifest = {"config": self.config, "inputs": list(data.columns), "rows": 0,
+                    "columns": {name: features[name].dtype.str for name in features.columns}}
+        for name in features.columns:
+            with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+                f.write(np.ascontiguousarray(features[name].to_numpy()).tobytes())
+        manifest["rows"] = len(features)
+        self._commit(series, manifest)
+        return len(features)
+
+    def _write_global(self, series, manifest, values):
+        """Recomputes the whole-series columns and swaps the files in atomically."""
+        engineering = FeatureEngineering(pd.DataFrame({self.config["column"]: values}))
+        engineering.add_fourier_features(self.config["column"])
+        recomputed = engineering.data
+        for name in self.global_columns:
+            path = os.path.join(self._directory(series), f"{name}.bin")
+            with open(path + ".tmp", "wb") as f:
+                f.write(np.ascontiguousarray(recomputed[name].to_numpy(dtype=manifest["columns"][name])).tobytes())
+            os.replace(path + ".tmp", path)
+
+    def read(self, series, start=None, end=None, columns=None):
+        """
+        Feature rows of ``series`` with ``start <= timestamp <= end``.
+        Columns are read-only views of the memory-mapped files, not copies.
+        """
+        manifest = self._manifest(series)
+        if manifest is None:
+            raise LookupError(f"No features stored for {series!r} (config {self.version})")
+        timestamps = self._column(series, manifest, self.config["datetime_column"])
+        first = np.searchsorted(timestamps, np.datetime64(pd.Timestamp(start), "ns")) if start is not None else 0
+        stop = (np.searchsorted(timestamps, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+                if end is not None else manifest["rows"])
+        names = columns or list(manifest["columns"])
+        return pd.DataFrame({name: self._column(series, manifest, name, first, stop) for name in names}, copy=False)
+
+    def versions(self, series):
+        """Configuration hashes stored for ``series`` with their configs and row counts."""
+        directory = os.path.join(self.root, series)
+        entries = {}
+        for version in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            path = os.path.join(directory, version, MANIFEST)
+            if os.path.exists(path):
+                with open(path) as f:
+                    manifest = json.load(f)
+                entries[version] = {"config": manifest["config"], "rows": manifest["rows"]}
+        return entries
@@ -0,0 +1,167 @@
+"""
+Handles micro-batched model inference shared across concurrent requests.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+# Upper bounds of the batch-size and queue-depth histogram buckets
+HISTOGRAM_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536]
+
+_STOP = object()
+
+class Histogram:
+    """Per-bucket (non-cumulative) counts for a non-negative integer metric."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0
+        self.observations = 0
+
+    def observe(self, value):
+        self.counts[int(np.searchsorted(self.buckets, value))] += 1
+        self.total += value
+        self.observations += 1
+
+    def to_dict(self):
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.observations,
+            "sum": self.total,
+        }
+
+class _Request:
+    __slots__ = ("X", "future", "enqueued")
+
+    def __init__(self, X):
+        self.X = X
+        self.future = Future()
+        self.enqueued = time.monotonic()
+
+class InferenceScheduler:
+    """
+    Coalesces ``predict`` calls from concurrent requests into large micro-batches.
+
+    A dedicated worker thread owns the model: it takes the first queued request,
+    keeps collecting more until ``max_batch_size`` rows are pending or
+    ``max_wait_ms`` has passed, runs one ``model.predict`` over the concatenated
+    rows and hands each request its slice of the output through a future.
+    ``predict`` has the same signature as the wrapped model, so a scheduler can
+    be passed anywhere a model is expected. Once closed, late submissions run
+    inline on the caller's thread instead of queueing behind a stopped worker.
+    """
+
+    def __init__(self, model, max_batch_size=8192, max_wait_ms=5.0, name="model", **predict_kwargs):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.predict_kwargs = predict_kwargs
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batch_sizes = Histogram()
+        self.queue_depths = Histogram()
+        self.requests = 0
+        self.batches = 0
+        self.wait_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=f"{name}-inference", daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Queues ``X`` for inference and returns a future for its predictions."""
+        request = _Request(np.asarray(X))
+        with self._lock:
+            if not self._closed:
+                self._queue.put(request)
+                return request.future
+        self._run_batch([request])
+        return request.future
+
+    def predict(self, X, **_):
+        """Blocking drop-in replacement for ``model.predict``."""
+        return self.submit(X).result()
+
+    def _collect(self):
+        """Blocks for the next request, then gathers more until the batch is full or the wait expires."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        pending, rows = [first], len(first.X)
+        deadline = time.monotonic() + self.max_wait
+
+        while rows < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is _STOP:
+                self._queue.put(_STOP)
+                break
+            pending.append(request)
+            rows += len(request.X)
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            if pending is None:
+                return
+            self._run_batch(pending)
+
+    def _run_batch(self, pending):
+        started = time.monotonic()
+        # Requests left waiting as this batch is dispatched, before predict lets more pile up
+        depth = self._queue.qsize()
+        lengths = [len(request.X) for request in pending]
+        try:
+            X = np.concatenate([request.X for request in pending]) if len(pending) > 1 else pending[0].X
+            y = self.model.predict(X, **self.predict_kwargs)
+        except Exception as e:
+            for request in pending:
+                request.future.set_exception(e)
+            return
+
+        for request, part in zip(pending, np.split(y, np.cumsum(lengths)[:-1])):
+            request.future.set_result(part)
+
+        with self._lock:
+            self.requests += len(pending)
+            self.batches += 1
+            self.batch_sizes.observe(sum(lengths))
+            self.queue_depths.observe(depth)
+            self.wait_seconds += sum(started - request.enqueued for request in pending)
+
+    def stats(self):
+        """Returns queue depth and batch-size histograms for tuning."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_wait_ms": 1000 * self.wait_seconds / self.requests if self.requests else 0.0,
+                "batch_size_rows": self.batch_sizes.to_dict(),
+                "queue_depth_at_dispatch": self.queue_depths.to_dict(),
+            }
+
+    def close(self):
+        """Stops the worker thread once the queued requests have been served."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
@@ -0,0 +1,237 @@
+"""
+Handles per-stage latency, throughput and memory metrics, exported in Prometheus text format.
+
+Usage:
+    from src.instrumentation import stage
+
+    with stage("lstm_predict", rows=len(X)):
+        y_pred = model.predict(X)
+"""
+
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Upper bounds (seconds / bytes) of the Prometheus histogram buckets
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+MEMORY_BUCKETS = [2 ** p for p in range(16, 34, 2)]  # 64 KiB .. 4 GiB
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def resident_memory():
+    """Current resident set size in bytes (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return 0
+
+def peak_resident_memory():
+    """Process-wide peak resident set size in bytes (None where ``resource`` is unavailable)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class PrometheusHistogram:
+    """Cumulative-bucket histogram as Prometheus expects it."""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[int(np.searchsorted(self.buckets, value))] += 1
+        self.total += value
+
+    def lines(self, name, labels):
+        cumulative = np.cumsum(self.counts)
+        for bound, count in zip(self.buckets + ["+Inf"], cumulative):
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        yield f"{name}_sum{{{labels}}} {self.total}"
+        yield f"{name}_count{{{labels}}} {cumulative[-1]}"
+
+class StageMetrics:
+    """
+    Thread-safe per-stage duration and memory histograms plus row and error counters.
+    ``memory`` holds traced peaks (profiling mode), ``rss_growth`` the resident
+    set growth from stage start to end otherwise.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations = {}
+        self.memory = {}
+        self.rss_growth = {}
+        self.rows = {}
+        self.errors = {}
+
+    def observe(self, name, seconds, rows=None, memory_bytes=None, failed=False, rss_growth=None):
+        with self._lock:
+            self.durations.setdefault(name, PrometheusHistogram(LATENCY_BUCKETS)).observe(seconds)
+            if memory_bytes is not None:
+                self.memory.setdefault(name, PrometheusHistogram(MEMORY_BUCKETS)).observe(max(memory_bytes, 0))
+            if rss_growth is not None:
+                self.rss_growth.setdefault(name, PrometheusHistogram(MEMORY_BUCKETS)).observe(max(rss_growth, 0))
+            if rows is not None:
+                self.rows[name] = self.rows.get(name, 0) + rows
+            if failed:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def prometheus(self, prefix="pm"):
+        """Renders every metric in the Prometheus text exposition format (version 0.0.4)."""
+        out = []
+        with self._lock:
+            out += [f"# HELP {prefix}_stage_duration_seconds Wall time per pipeline stage.",
+                    f"# TYPE {prefix}_stage_duration_seconds histogram"]
+            for name, histogram in sorted(self.durations.items()):
+                out += histogram.lines(f"{prefix}_stage_duration_seconds", f'stage="{name}"')
+            out += [f"# HELP {prefix}_stage_peak_memory_bytes Peak traced allocations per stage above its starting level (profiling mode).",
+                    f"# TYPE {prefix}_stage_peak_memory_bytes histogram"]
+            for name, histogram in sorted(self.memory.items()):
+                out += histogram.lines(f"{prefix}_stage_peak_memory_bytes", f'stage="{name}"')
+            out += [f"# HELP {prefix}_stage_rss_growth_bytes Resident set size at stage end minus start (untraced runs).",
+                    f"# TYPE {prefix}_stage_rss_growth_bytes histogram"]
+            for name, histogram in sorted(self.rss_growth.items()):
+                out += histogram.lines(f"{prefix}_stage_rss_growth_bytes", f'stage="{name}"')
+            out += [f"# HELP {prefix}_stage_rows_total Rows processed per stage.",
+                    f"# TYPE {prefix}_stage_rows_total counter"]
+            out += [f'{prefix}_stage_rows_total{{stage="{name}"}} {count}' for name, count in sorted(self.rows.items())]
+            out += [f"# HELP {prefix}_stage_errors_total Stages that raised.",
+                    f"# TYPE {prefix}_stage_errors_total counter"]
+            out += [f'{prefix}_stage_errors_total{{stage="{name}"}} {count}' for name, count in sorted(self.errors.items())]
+        out += [f"# HELP {prefix}_process_resident_memory_bytes Resident set size.",
+                f"# TYPE {prefix}_process_resident_memory_bytes gauge",
+                f"{prefix}_process_resident_memory_bytes {resident_memory()}"]
+        peak = peak_resident_memory()
+        if peak is not None:
+            out += [f"# HELP {prefix}_process_peak_resident_memory_bytes Peak resident set size.",
+                    f"# TYPE {prefix}_process_peak_resident_memory_bytes gauge",
+                    f"{prefix}_process_peak_resident_memory_bytes {peak}"]
+        return "\n".join(out) + "\n"
+
+metrics = StageMetrics()
+
+# Stages of the current request (or training run) when a trace is active
+_trace = contextvars.ContextVar("stage_trace", default=None)
+
+# Highest traced memory seen so far by the innermost running stage; tracemalloc
+# has a single peak, so a nested stage folds the outer peak in here before resetting it
+_stage_peak = contextvars.ContextVar("stage_peak", default=None)
+
+def start_trace():
+    """Starts collecting ``(stage, seconds, rows)`` records in this context; returns (records, token)."""
+    records = []
+    return records, _trace.set(records)
+
+def stop_trace(token):
+    _trace.reset(token)
+
+@contextmanager
+def trace():
+    """Collects the stage records of the enclosed code into a list."""
+    records, token = start_trace()
+    try:
+        yield records
+    finally:
+        stop_trace(token)
+
+@contextmanager
+def stage(name, rows=None, log=False):
+    """
+    Times the enclosed block as pipeline stage ``name``.
+
+    While tracemalloc is tracing (profiling mode) the stage records its peak
+    traced memory above the level it started at, nested stages included;
+    otherwise only the resident set growth from start to end is known, and is
+    recorded as a separate metric. Both are process-wide, so concurrent
+    requests blur them. ``log`` also prints the timing, for the training classes.
+    """
+    traced = tracemalloc.is_tracing()
+    if traced:
+        baseline, outer_peak = tracemalloc.get_traced_memory()
+        parent = _stage_peak.get()
+        if parent is not None:
+            parent[0] = max(parent[0], outer_peak)
+        tracemalloc.reset_peak()
+        own = [baseline]
+        peak_token = _stage_peak.set(own)
+    else:
+        baseline = resident_memory()
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        if traced:
+            _stage_peak.reset(peak_token)
+            peak = max(own[0], tracemalloc.get_traced_memory()[1])
+            if parent is not None:
+                parent[0] = max(parent[0], peak)
+            metrics.observe(name, seconds, rows, peak - baseline, failed)
+        else:
+            metrics.observe(name, seconds, rows, failed=failed, rss_growth=resident_memory() - baseline)
+        records = _trace.get()
+        if records is not None:
+            records.append((name, seconds, rows))
+        if log:
+            print(f"⏱ {name}: {seconds:.2f}s" + (f", {rows} rows ({rows / seconds:,.0f} rows/s)" if rows and seconds else ""))
+
+def server_timing(records):
+    """``Server-Timing`` header value for a trace (durations in ms)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds, _ in records)
+
+class Profiler:
+    """
+    Opt-in cProfile + tracemalloc session for one request or run.
+    ``save`` writes the pstats dump and a text summary of the top functions.
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._started_tracemalloc = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        # Stages reset the tracemalloc peak; they report theirs back through this
+        self._peak = [tracemalloc.get_traced_memory()[1]]
+        self._peak_token = _stage_peak.set(self._peak)
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._profile.disable()
+        _stage_peak.reset(self._peak_token)
+        self.peak_bytes = max(self._peak[0], tracemalloc.get_traced_memory()[1])
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def summary(self, limit=40):
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(limit)
+        return f"Peak traced memory: {self.peak_bytes / 1e6:.1f} MB\n" + stream.getvalue()
+
+    def save(self, directory, name):
+        os.makedirs(directory, exist_ok=True)
+        self._profile.dump_stats(os.path.join(directory, f"{name}.prof"))
+        with open(os.path.join(directory, f"{name}.txt"), "w") as f:
+            f.write(self.summary())
+        return os.path.join(directory, f"{name}.txt")
@@ -0,0 +1,193 @@
+"""
+Handles a memory-lean float32 run of the LSTM & autoencoder detectors over one contiguous buffer.
+
+Usage:
+    pipeline = LeanAnomalyPipeline(bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps)
+    result = pipeline.run(data["value"].to_numpy())
+    data = result.to_frame(data)     # the only place a DataFrame is built
+"""
+
+import numpy as np
+
+from src.instrumentation import stage
+from src.quantile_sketch import TDigest
+from src.windowing import create_windows
+
+FLAGS = ("predicted_failure", "autoencoder_anomaly")
+
+def affine_coefficients(scaler):
+    """
+    ``(scale, offset)`` with ``scaler.transform(x) == x * scale + offset`` for a
+    one-feature MinMaxScaler or StandardScaler; None for any other scaler.
+    """
+    if getattr(scaler, "n_features_in_", None) != 1:
+        return None
+    if hasattr(scaler, "data_min_") and not getattr(scaler, "clip", False):
+        return float(scaler.scale_[0]), float(scaler.min_[0])
+    if hasattr(scaler, "with_mean") and hasattr(scaler, "n_samples_seen_"):
+        scale = float(scaler.scale_[0]) if scaler.with_std else 1.0
+        mean = float(scaler.mean_[0]) if scaler.with_mean else 0.0
+        return 1.0 / scale, -mean / scale
+    return None
+
+class LeanResult:
+    """
+    Scores of a lean run: float32 normalized values plus one packed bitmap per flag
+    (1 bit per row). ``maintenance_alert`` is the bitwise OR of the two bitmaps.
+    """
+
+    def __init__(self, normalized, bitmaps, thresholds):
+        self.normalized = normalized
+        self.bitmaps = bitmaps
+        self.thresholds = thresholds
+        self.rows = len(normalized)
+
+    @property
+    def maintenance_bitmap(self):
+        return np.bitwise_or(*(self.bitmaps[name] for name in FLAGS))
+
+    def flags(self, name):
+        """Unpacks one flag (or ``maintenance_alert``) to a uint8 array of 0/1 per row."""
+        bitmap = self.maintenance_bitmap if name == "maintenance_alert" else self.bitmaps[name]
+        return np.unpackbits(bitmap, count=self.rows)
+
+    def alert_count(self):
+        return int(np.unpackbits(self.maintenance_bitmap, count=self.rows).sum(dtype=np.int64))
+
+    def nbytes(self):
+        return self.normalized.nbytes + sum(bitmap.nbytes for bitmap in self.bitmaps.values())
+
+    def to_frame(self, data):
+        """
+        Adds the ``detect_anomalies`` output columns to ``data`` (modified in place):
+        ``value_normalized`` as float32 and the three flags as uint8.
+        """
+        with stage("lean_frame", self.rows):
+            data["value_normalized"] = self.normalized
+            for name in FLAGS + ("maintenance_alert",):
+                data[name] = self.flags(name)
+        return data
+
+class LeanAnomalyPipeline:
+    """
+    Memory-lean counterpart of ``detect_anomalies``, with the same percentiles and flag rules.
+
+    The raw values are normalized once into a contiguous float32 buffer; the LSTM
+    windows are strided views over it, and both models run ``block_size`` rows at a
+    time, so the only full-length temporaries are the normalized values and the
+    float32 LSTM forecasts and reconstruction errors (the errors are skipped
+    entirely when an ``mse_baseline`` digest fixes the autoencoder threshold up
+    front). The squared error is computed in place in each prediction block, and
+    flags are written straight into packed bitmaps. Working memory is about 12
+    bytes per row plus the blocks, against ~100 for ``detect_anomalies`` with
+    10-step windows. Thresholds are exact percentiles of the float32 buffers;
+    with ``exact_thresholds=False`` they come from t-digests updated block by
+    block instead (no forecast buffer), so rows within the digest's rank error
+    of a threshold can be flagged differently than by ``detect_anomalies``.
+    """
+
+    def __init__(self, lstm_model, autoencoder, scaler, time_steps, block_size=65_536,
+                 lstm_percentile=95, autoencoder_percentile=99.85, exact_thresholds=True, mse_baseline=None):
+        self.lstm_model = lstm_model
+        self.autoencoder = autoencoder
+        self.scaler = scaler
+        self.time_steps = time_steps
+        # Blocks start on byte boundaries of the bitmaps
+        self.block_size = max(block_size // 8 * 8, 8)
+        self.lstm_percentile = lstm_percentile
+        self.autoencoder_percentile = autoencoder_percentile
+        self.exact_thresholds = exact_thresholds
+        self.mse_baseline = mse_baseline
+        self._affine = affine_coefficients(scaler)
+
+    def _blocks(self, rows):
+        return ((start, min(start + self.block_size, rows)) for start in range(0, rows, self.block_size))
+
+    def normalize(self, values):
+        """Scaler transform of ``values`` into a new float32 buffer, block by block."""
+        normalized = np.empty(len(values), dtype=np.float32)
+        for start, stop in self._blocks(len(values)):
+            out = normalized[start:stop]
+            if self._affine is None:
+                out[:] = self.scaler.transform(np.asarray(values[start:stop]).reshape(-1, 1)).ravel()
+            else:
+                np.multiply(values[start:stop], self._affine[0], out=out, casting="unsafe")
+                out += self._affine[1]
+        return normalized
+
+    def _inverse_transform(self, y):
+        """In-place inverse of the scaler transform on a float32 block."""
+        if self._affine is None:
+            return self.scaler.inverse_transform(y.reshape(-1, 1)).ravel()
+        y -= self._affine[1]
+        y /= self._affine[0]
+        return y
+
+    def lstm_threshold(self, normalized):
+        """Percentile of the rescaled one-step LSTM forecasts, predicted a block of windows at a time."""
+        X, _ = create_windows(normalized, self.time_steps)
+        forecasts = np.empty(len(X), dtype=np.float32) if self.exact_thresholds else None
+        digest = TDigest()
+        for start, stop in self._blocks(len(X)):
+            y_pred = np.asarray(self.lstm_model.predict(X[start:stop].reshape((-1, self.time_steps, 1)), verbose=0),
+                                dtype=np.float32).ravel()
+            y_pred = self._inverse_transform(y_pred)
+            if forecasts is None:
+                digest.update(y_pred)
+            else:
+                forecasts[start:stop] = y_pred
+        if forecasts is None:
+            return digest.percentile(self.lstm_percentile)
+        # The buffer is scratch, so the percentile may partition it in place
+        return np.percentile(forecasts, self.lstm_percentile, overwrite_input=True)
+
+    def reconstruction_error(self, block):
+        """Per-row autoencoder MSE of a normalized block, squared in place in the prediction buffer."""
+        X_auto = block.reshape(-1, 1)
+        error = np.asarray(self.autoencoder.predict(X_auto, verbose=0), dtype=np.float32)
+        if not error.flags.writeable:
+            error = error.copy()
+        np.subtract(error, X_auto, out=error)
+        np.square(error, out=error)
+        return error.mean(axis=1, dtype=np.float32)
+
+    def run(self, values):
+        """
+        Scores a 1-D array of raw values.
+        :return: :class:`LeanResult`.
+        """
+        values = np.asarray(values).ravel()
+        rows = len(values)
+        bitmaps = {name: np.zeros((rows + 7) // 8, dtype=np.uint8) for name in FLAGS}
+
+        with stage("scaler_transform", rows):
+            normalized = self.normalize(values)
+
+        with stage("lstm_predict", rows):
+            lstm_threshold = self.lstm_threshold(normalized)
+            for start, stop in self._blocks(rows):
+                bitmaps["predicted_failure"][start // 8:(stop + 7) // 8] = np.packbits(normalized[start:stop] > lstm_threshold)
+
+        with stage("autoencoder_predict", rows):
+            if self.mse_baseline is not None:
+                # Known threshold: flag each block as it is scored, no full-length error buffer
+                autoencoder_threshold = self.mse_baseline.percentile(self.autoencoder_percentile)
+                for start, stop in self._blocks(rows):
+                    mse = self.reconstruction_error(normalized[start:stop])
+                    bitmaps["autoencoder_anomaly"][start // 8:(stop + 7) // 8] = np.packbits(mse > autoencoder_threshold)
+            else:
+                mse = np.empty(rows, dtype=np.float32)
+                digest = TDigest()
+                for start, stop in self._blocks(rows):
+                    mse[start:stop] = self.reconstruction_error(normalized[start:stop])
+                    if not self.exact_thresholds:
+                        digest.update(mse[start:stop])
+                if self.exact_thresholds:
+                    autoencoder_threshold = np.percentile(mse, self.autoencoder_percentile)
+                else:
+                    autoencoder_threshold = digest.percentile(self.autoencoder_percentile)
+                for start, stop in self._blocks(rows):
+                    bitmaps["autoencoder_anomaly"][start // 8:(stop + 7) // 8] = np.packbits(mse[start:stop] > autoencoder_threshold)
+                del mse
+
+        return LeanResult(normalized, bitmaps, {"lstm": lstm_threshold, "autoencoder": autoencoder_threshold})
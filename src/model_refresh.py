@@ -0,0 +1,337 @@
+"""
+Handles drift-triggered background retraining of the Isolation Forest and autoencoder.
+
+Usage:
+    refresher = ModelRefresher(AutoencoderRefresh(registry, "default"))
+    refresher.observe(values)   # cheap drift statistics; retrains in a worker process on drift
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.model_registry import ARTIFACTS, next_version
+
+# Floor for empty bins, so PSI stays finite
+PSI_EPSILON = 1e-4
+
+# Artifacts a retrained autoencoder replaces; the rest are copied from the serving version
+AUTOENCODER_ARTIFACTS = ("autoencoder", "autoencoder_numpy", "mse_sketch")
+
+class BinnedDistribution:
+    """
+    Reference histogram on the decile (``bins``-quantile) edges of a reference
+    sample, plus running counts of recent values over the same bins.
+    The outer bins are open-ended, so out-of-range values still count.
+    """
+
+    def __init__(self, reference, bins=10):
+        reference = _finite(reference)
+        self.edges = np.unique(np.quantile(reference, np.linspace(0, 1, bins + 1)[1:-1])) if len(reference) else np.empty(0)
+        self.reference = _fractions(self._counts(reference))
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+    def _counts(self, values):
+        return np.bincount(np.searchsorted(self.edges, values, side="right"), minlength=len(self.edges) + 1)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        self.counts += self._counts(_finite(values))
+
+    def reset(self):
+        self.counts[:] = 0
+
+    def psi(self):
+        """Population stability index of the recent values against the reference."""
+        if self.count == 0:
+            return 0.0
+        current = _fractions(self.counts)
+        return float(np.sum((current - self.reference) * np.log(current / self.reference)))
+
+    def ks(self):
+        """Kolmogorov-Smirnov distance between the binned CDFs."""
+        if self.count == 0:
+            return 0.0
+        return float(np.max(np.abs(np.cumsum(_fractions(self.counts)) - np.cumsum(self.reference))))
+
+def _finite(values):
+    values = np.asarray(values, dtype="float64").ravel()
+    return values[np.isfinite(values)]
+
+def _fractions(counts):
+    return np.maximum(counts / max(counts.sum(), 1), PSI_EPSILON)
+
+class SlidingWindow:
+    """Ring buffer of the last ``capacity`` values, the retraining sample."""
+
+    def __init__(self, capacity):
+        self.buffer = np.empty(capacity, dtype="float64")
+        self.size = 0
+        self.position = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype="float64").ravel()[-len(self.buffer):]
+        first = min(len(values), len(self.buffer) - self.position)
+        self.buffer[self.position:self.position + first] = values[:first]
+        self.buffer[:len(values) - first] = values[first:]
+        self.position = (self.position + len(values)) % len(self.buffer)
+        self.size = min(self.size + len(values), len(self.buffer))
+
+    def values(self):
+        """Copy of the window, oldest first."""
+        if self.size < len(self.buffer):
+            return self.buffer[:self.size].copy()
+        return np.concatenate([self.buffer[self.position:], self.buffer[:self.position]])
+
+def _run_timed(func, *args):
+    """Runs a retraining job in the worker; returns its result and the worker CPU seconds (all threads)."""
+    start = time.process_time()
+    # Keep training logs and progress bars out of the serving process output
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args)
+    return result, time.process_time() - start
+
+def _retrain_isolation_forest(values, model_path, contamination, random_state, max_samples, n_jobs):
+    from src.anomaly_detection import AnomalyDetector
+
+    frame = pd.DataFrame({"value": values})
+    detector = AnomalyDetector(model_path, contamination, random_state, max_samples=max_samples)
+    detector.fit(frame, "value", n_jobs=n_jobs)
+    return -detector.score(frame, "value")
+
+def _retrain_autoencoder(values, directory, epochs, batch_size, patience):
+    from src.autoencoder import AutoencoderAnomalyDetector
+
+    scaler = joblib.load(os.path.join(directory, ARTIFACTS["scaler"]))
+    X = scaler.transform(values.reshape(-1, 1))
+    detector = AutoencoderAnomalyDetector()
+    detector.train(pd.DataFrame({"value_normalized": X.ravel()}),
+                   os.path.join(directory, ARTIFACTS["autoencoder"]),
+                   os.path.join(directory, ARTIFACTS["mse_sketch"]),
+                   os.path.join(directory, ARTIFACTS["autoencoder_numpy"]),
+                   epochs=epochs, batch_size=batch_size, patience=patience)
+    return np.mean(np.power(X - detector.autoencoder.predict(X, verbose=0), 2), axis=1)
+
+class RefreshTarget:
+    """Base class for models the refresher can retrain and swap."""
+
+    def errors(self, values):
+        """Anomaly scores of the serving model for raw values (higher is more anomalous)."""
+        raise NotImplementedError("Subclasses must implement errors method")
+
+    def retrain_job(self, values):
+        """``(function, args)`` that retrains on ``values`` in the worker process."""
+        raise NotImplementedError("Subclasses must implement retrain_job method")
+
+    def install(self, result):
+        """Swaps the retrained model in; returns its scores on the training sample."""
+        raise NotImplementedError("Subclasses must implement install method")
+
+    def discard(self):
+        """Removes what a failed retraining job left behind."""
+
+class IsolationForestRefresh(RefreshTarget):
+    """
+    Retrains an ``AnomalyDetector``'s forest on ``n_jobs`` threads with at most
+    ``max_samples`` rows per tree, then replaces its model file and model.
+    """
+
+    def __init__(self, detector, max_samples=256, n_jobs=-1):
+        self.detector = detector
+        self.max_samples = max_samples
+        self.n_jobs = n_jobs
+
+    def errors(self, values):
+        return -self.detector.score(pd.DataFrame({"value": values}), "value")
+
+    def retrain_job(self, values):
+        directory = os.path.dirname(os.path.abspath(self.detector.model_path))
+        os.makedirs(directory, exist_ok=True)
+        handle, staging = tempfile.mkstemp(prefix=".refresh-", suffix=".pkl", dir=directory)
+        os.close(handle)
+        self._staging = staging
+        return _retrain_isolation_forest, (values, staging, self.detector.contamination, self.detector.random_state,
+                                           self.max_samples, self.n_jobs)
+
+    def install(self, result):
+        os.replace(self._staging, self.detector.model_path)
+        # One attribute assignment, so concurrent scoring sees either the old or the new forest
+        self.detector.model = joblib.load(self.detector.model_path)
+        return result
+
+    def discard(self):
+        if os.path.exists(self._staging):
+            os.remove(self._staging)
+
+class AutoencoderRefresh(RefreshTarget):
+    """
+    Retrains the autoencoder of registry model ``name`` and publishes it as the next
+    version, together with the serving version's LSTM, scaler and time steps.
+    The registry then switches over atomically (see ``ModelRegistry.get``).
+    """
+
+    def __init__(self, registry, name="default", epochs=20, batch_size=32, patience=3):
+        self.registry = registry
+        self.name = name
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.patience = patience
+        self.version = None
+
+    def bundle(self):
+        return self.registry.get(self.name, self.version)
+
+    def errors(self, values):
+        bundle = self.bundle()
+        X = bundle.scaler.transform(np.asarray(values, dtype="float64").reshape(-1, 1))
+        return np.mean(np.power(X - bundle.autoencoder.predict(X), 2), axis=1)
+
+    def retrain_job(self, values):
+        bundle = self.bundle()
+        os.makedirs(self.registry.root, exist_ok=True)
+        self._staging = tempfile.mkdtemp(prefix=".refresh-", dir=self.registry.root)
+        for artifact, file_name in ARTIFACTS.items():
+            source = bundle.paths[artifact]
+            if artifact in AUTOENCODER_ARTIFACTS or not os.path.exists(source):
+                continue
+            target = os.path.join(self._staging, file_name)
+            shutil.copytree(source, target) if os.path.isdir(source) else shutil.copy2(source, target)
+        return _retrain_autoencoder, (values, self._staging, self.epochs, self.batch_size, self.patience)
+
+    def install(self, result):
+        version = next_version(self.registry.versions(self.name))
+        self.registry.publish(self.name, version, self._staging)
+        shutil.rmtree(self._staging, ignore_errors=True)
+        self.version = version
+        return result
+
+    def discard(self):
+        shutil.rmtree(self._staging, ignore_errors=True)
+
+class ModelRefresher:
+    """
+    Watches the input values and the serving model's anomaly scores for drift and
+    retrains in the background when it passes a threshold.
+
+    Every ``window`` observed rows, the binned distributions of both are compared
+    with their references by PSI (and KS when ``ks_threshold`` is set). On drift
+    the last ``sample_size`` rows are handed to a spawned worker process that
+    retrains the ``target``, so serving threads only pay for the histogram
+    updates and the scores. The finished model is installed on the next
+    ``observe`` or ``poll``, and the references are reset to its training
+    sample. At most one retrain runs at a time, and at least ``cooldown`` rows
+    separate two of them. ``checks`` and ``retrains`` keep the last ``history``
+    records each (all of them with ``history=None``).
+    """
+
+    def __init__(self, target, window=2000, sample_size=20_000, bins=10, psi_threshold=0.25, ks_threshold=None,
+                 cooldown=0, history=1000):
+        self.target = target
+        self.window = window
+        self.bins = bins
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.cooldown = cooldown
+        self.sample = SlidingWindow(sample_size)
+
+        self.input = None
+        self.error = None
+        self.rows_seen = 0
+        self.checks = deque(maxlen=history)
+        self.retrains = deque(maxlen=history)
+        self._pool = None
+        self._future = None
+        self._pending = None
+        self._last_retrain_rows = None
+
+    def start(self, values, retrain=False):
+        """
+        Sets the references from the serving model's training ``values``.
+        With ``retrain`` the target is first (re)trained on them, blocking.
+        """
+        values = np.asarray(values, dtype="float64").ravel()
+        self.sample.extend(values)
+        if retrain:
+            self._submit(values, "initial")
+            self.poll(wait=True)
+        else:
+            self._set_reference(values, self.target.errors(values))
+        return self
+
+    def _set_reference(self, values, errors):
+        self.input = BinnedDistribution(values, self.bins)
+        self.error = BinnedDistribution(errors, self.bins)
+
+    def observe(self, values):
+        """Adds newly scored raw values; returns True when this call started a retrain."""
+        self.poll()
+        values = np.asarray(values, dtype="float64").ravel()
+        if self.input is None:
+            self.start(values)
+            return False
+        self.sample.extend(values)
+        self.rows_seen += len(values)
+        self.input.update(values)
+        self.error.update(self.target.errors(values))
+        return self.input.count >= self.window and self._check()
+
+    def _check(self):
+        stats = {"rows": self.rows_seen, "input_psi": self.input.psi(), "error_psi": self.error.psi(),
+                 "input_ks": self.input.ks(), "error_ks": self.error.ks()}
+        drifted = max(stats["input_psi"], stats["error_psi"]) > self.psi_threshold or (
+            self.ks_threshold is not None and max(stats["input_ks"], stats["error_ks"]) > self.ks_threshold)
+        cooled = self._last_retrain_rows is None or self.rows_seen - self._last_retrain_rows >= self.cooldown
+        stats["retrain"] = bool(drifted and cooled and self._future is None)
+        self.checks.append(stats)
+        self.input.reset()
+        self.error.reset()
+        if stats["retrain"]:
+            self._submit(self.sample.values(), "drift")
+        return stats["retrain"]
+
+    def _submit(self, values, reason):
+        if self._pool is None:
+            # TensorFlow is not fork-safe, so the worker is spawned fresh
+            self._pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        func, args = self.target.retrain_job(values)
+        self._pending = (values, reason, self.rows_seen, time.perf_counter())
+        self._last_retrain_rows = self.rows_seen
+        self._future = self._pool.submit(_run_timed, func, *args)
+
+    def poll(self, wait=False):
+        """Installs a finished retrain (waiting for it with ``wait``); returns True if one was installed."""
+        if self._future is None or not (wait or self._future.done()):
+            return False
+        future, (values, reason, rows, started) = self._future, self._pending
+        self._future = self._pending = None
+        try:
+            result, cpu_seconds = future.result()
+            errors = self.target.install(result)
+        except Exception as e:
+            self.target.discard()
+            print(f"❌ Retraining at row {rows} failed, keeping the serving model: {e}")
+            return False
+        self._set_reference(values, errors)
+        self.retrains.append({"reason": reason, "rows": rows, "sample_rows": len(values), "cpu_seconds": cpu_seconds,
+                              "wall_seconds": time.perf_counter() - started})
+        print(f"✅ Retrained on {len(values)} rows at row {rows} ({cpu_seconds:.1f}s CPU)")
+        return True
+
+    def close(self):
+        """Waits for a running retrain, installs it and stops the worker."""
+        self.poll(wait=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
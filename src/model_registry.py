@@ -0,0 +1,318 @@
+"""
+Handles versioned model artifacts with lazy loading, LRU caching and hot reload.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import joblib
+
+from src.inference_scheduler import InferenceScheduler
+from src.numpy_inference import NumpyModel
+from src.quantile_sketch import TDigest
+from src.result_cache import content_key
+
+# File names inside a registry version directory: <root>/<name>/<version>/
+ARTIFACTS = {
+    "lstm_model": "lstm_model.h5",
+    "autoencoder": "autoencoder.h5",
+    "lstm_numpy": "lstm_numpy",
+    "autoencoder_numpy": "autoencoder_numpy",
+    "scaler": "scaler.pkl",
+    "time_steps": "time_steps.pkl",
+    "mse_sketch": "autoencoder_mse_sketch.pkl",
+}
+
+# Anchored to this file, so the defaults hold whatever the working directory
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+NOTEBOOKS_DIR = os.path.join(PROJECT_ROOT, "notebooks")
+REGISTRY_ROOT = os.path.join(NOTEBOOKS_DIR, "registry")
+
+def legacy_artifacts(notebooks_dir=NOTEBOOKS_DIR):
+    """Where the notebooks and training classes write artifacts today."""
+    return {
+        "lstm_model": os.path.join(notebooks_dir, "models", "lstm_model.h5"),
+        "autoencoder": os.path.join(notebooks_dir, "models", "autoencoder.h5"),
+        "lstm_numpy": os.path.join(notebooks_dir, "models", "lstm_numpy"),
+        "autoencoder_numpy": os.path.join(notebooks_dir, "models", "autoencoder_numpy"),
+        "scaler": os.path.join(notebooks_dir, "scaler_data", "scaler.pkl"),
+        "time_steps": os.path.join(notebooks_dir, "models", "time_steps.pkl"),
+        "mse_sketch": os.path.join(notebooks_dir, "scaler_data", "autoencoder_mse_sketch.pkl"),
+    }
+
+LEGACY_ARTIFACTS = legacy_artifacts()
+LEGACY_VERSION = "legacy"
+
+# Micro-batching settings for the per-bundle inference schedulers
+LSTM_SCHEDULER = {"max_batch_size": 8192, "max_wait_ms": 5, "batch_size": 1024, "verbose": 0}
+AUTOENCODER_SCHEDULER = {"max_batch_size": 65536, "max_wait_ms": 5, "batch_size": 8192, "verbose": 0}
+
+def version_key(version):
+    """Natural sort key so that version "10" is newer than version "9"."""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", version) if part)
+
+# Model names and versions come from query arguments and become path components
+IDENTIFIER = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]*")
+
+def next_version(versions):
+    """
+    Version after the newest of ``versions``: its last number incremented
+    ("9" -> "10", "v1.9" -> "v1.10"), or "1" when there are none.
+    """
+    if not versions:
+        return "1"
+    latest = max(versions, key=version_key)
+    parts = re.split(r"(\d+)", latest)
+    for i in reversed(range(len(parts))):
+        if parts[i].isdigit():
+            parts[i] = str(int(parts[i]) + 1).zfill(len(parts[i]))
+            return "".join(parts)
+    return f"{latest}.1"
+
+def disk_size(path):
+    """Size in bytes of a file or of every file under a directory."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def artifact_fingerprint(paths):
+    """Changes whenever any artifact file is rewritten (path, size and mtime of every file)."""
+    stamps = []
+    for artifact in sorted(paths):
+        path = paths[artifact]
+        files = [os.path.join(d, f) for d, _, names in os.walk(path) for f in names] if os.path.isdir(path) else [path]
+        for file_path in sorted(files):
+            if os.path.exists(file_path):
+                stat = os.stat(file_path)
+                stamps.append(f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return content_key(*stamps)
+
+class ModelBundle:
+    """One loaded version of the LSTM, autoencoder, scaler and time-step artifacts."""
+
+    def __init__(self, name, version, paths, backend="keras"):
+        self.name = name
+        self.version = version
+        self.paths = paths
+        self.backend = backend
+        # Taken before loading, so a file rewritten mid-load shows up as stale
+        self.fingerprint = artifact_fingerprint(paths)
+        self._checked_at = time.monotonic()
+
+        if backend == "numpy":
+            lstm_model = NumpyModel.load(paths["lstm_numpy"])
+            autoencoder = NumpyModel.load(paths["autoencoder_numpy"])
+            model_files = [paths["lstm_numpy"], paths["autoencoder_numpy"]]
+        else:
+            from tensorflow.keras.models import load_model
+
+            lstm_model = load_model(paths["lstm_model"], compile=False)
+            lstm_model.compile(optimizer="adam", loss="mse")
+            autoencoder = load_model(paths["autoencoder"], compile=False)
+            autoencoder.compile(optimizer="adam", loss="mse")
+            model_files = [paths["lstm_model"], paths["autoencoder"]]
+
+        self.scaler = joblib.load(paths["scaler"])
+        self.time_steps = joblib.load(paths["time_steps"])
+        self.mse_baseline = TDigest.load(paths["mse_sketch"]) if os.path.exists(paths["mse_sketch"]) else None
+
+        # Coalesce concurrent requests into micro-batches, one worker thread per model
+        self.lstm = InferenceScheduler(lstm_model, name=f"{name}:{version}:lstm", **LSTM_SCHEDULER)
+        self.autoencoder = InferenceScheduler(autoencoder, name=f"{name}:{version}:autoencoder", **AUTOENCODER_SCHEDULER)
+
+        # On-disk artifact size is the memory estimate charged against the cache budget
+        self.size_bytes = sum(disk_size(path) for path in model_files + [paths["scaler"], paths["time_steps"]])
+
+    def is_stale(self, interval):
+        """Whether an artifact changed on disk since loading; re-checked at most every ``interval`` seconds."""
+        if time.monotonic() - self._checked_at < interval:
+            return False
+        self._checked_at = time.monotonic()
+        return artifact_fingerprint(self.paths) != self.fingerprint
+
+    def close(self):
+        """Stops the schedulers; requests still holding this bundle fall back to inline predict."""
+        self.lstm.close()
+        self.autoencoder.close()
+
+class ModelRegistry:
+    """
+    Resolves model bundles by name and version and caches them in an LRU.
+
+    Bundles are loaded on first use. ``get(name)`` without a version returns the
+    newest version on disk, re-scanning at most every ``poll_interval`` seconds;
+    a newer version is fully loaded before it replaces the old one, so the switch
+    is atomic and requests that already hold a bundle keep using it. A bundle
+    whose artifacts are rewritten in place (e.g. retraining into the legacy
+    layout) is reloaded on the same schedule. Loaded
+    bundles are evicted least-recently-used first once their estimated size
+    exceeds ``memory_budget_mb``.
+    """
+
+    def __init__(self, root, backend="keras", memory_budget_mb=1024, poll_interval=5.0,
+                 legacy_artifacts=LEGACY_ARTIFACTS):
+        self.root = root
+        self.backend = backend
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.poll_interval = poll_interval
+        self.legacy_artifacts = legacy_artifacts
+
+        self._bundles = OrderedDict()
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def _directory(self, name, version=None):
+        """
+        Registry directory of ``name`` (or of one of its versions). Rejects
+        anything but plain identifiers (no separators, no leading dot) and any
+        path that would resolve outside the registry root.
+        """
+        parts = [name] if version is None else [name, version]
+        for part in parts:
+            if not isinstance(part, str) or not IDENTIFIER.fullmatch(part):
+                raise LookupError(f"Invalid model name or version {part!r}")
+        root = os.path.realpath(self.root)
+        directory = os.path.realpath(os.path.join(root, *parts))
+        if os.path.commonpath([root, directory]) != root:
+            raise LookupError(f"Model {name!r} version {version!r} resolves outside the registry")
+        return directory
+
+    def versions(self, name):
+        """Published versions of ``name``, oldest first."""
+        directory = self._directory(name)
+        if not os.path.isdir(directory):
+            return []
+        versions = [v for v in os.listdir(directory)
+                    if not v.startswith(".") and os.path.isdir(os.path.join(directory, v))]
+        return sorted(versions, key=version_key)
+
+    def _paths(self, name, version):
+        if version == LEGACY_VERSION:
+            return dict(self.legacy_artifacts)
+        directory = self._directory(name, version)
+        return {artifact: os.path.join(directory, file_name) for artifact, file_name in ARTIFACTS.items()}
+
+    def latest_version(self, name):
+        """Newest published version, falling back to the legacy layout when none exist."""
+        with self._lock:
+            cached = self._latest.get(name)
+        if cached and time.monotonic() - cached[1] < self.poll_interval:
+            return cached[0]
+
+        versions = self.versions(name)
+        if versions:
+            return versions[-1]
+        if self.legacy_artifacts and os.path.exists(self.legacy_artifacts["time_steps"]):
+            return LEGACY_VERSION
+        raise LookupError(f"No published versions of model {name!r} under {self.root}")
+
+    def get(self, name="default", version=None):
+        """Returns the loaded bundle for ``name`` at ``version`` (latest when omitted)."""
+        if version is not None:
+            directory = self._directory(name) if version == LEGACY_VERSION else self._directory(name, version)
+            if version != LEGACY_VERSION and not os.path.isdir(directory):
+                raise LookupError(f"Model {name!r} has no version {version!r}")
+            return self._load(name, version)
+
+        version = self.latest_version(name)
+        with self._lock:
+            current = self._latest.get(name)
+            current_bundle = self._bundles.get((name, current[0])) if current else None
+
+        # While another request loads a newer version, keep serving the current one
+        bundle = self._load(name, version, blocking=current_bundle is None)
+        if bundle is None:
+            return current_bundle
+
+        # Only switch over once the new version has finished loading
+        with self._lock:
+            self._latest[name] = (version, time.monotonic())
+        return bundle
+
+    def _load(self, name, version, blocking=True):
+        """Returns the cached bundle, loading it first if needed; None if busy and not ``blocking``."""
+        key = (name, version)
+        with self._lock:
+            cached = self._bundles.get(key)
+        if cached is not None and cached.is_stale(self.poll_interval):
+            print(f"Artifacts of model {name!r} version {version!r} changed on disk, reloading")
+            with self._lock:
+                if self._bundles.get(key) is cached:
+                    del self._bundles[key]
+            cached.close()
+
+        with self._lock:
+            if key in self._bundles:
+                self._bundles.move_to_end(key)
+                return self._bundles[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other versions keep serving meanwhile
+        if not load_lock.acquire(blocking=blocking):
+            return None
+        try:
+            with self._lock:
+                if key in self._bundles:
+                    return self._bundles[key]
+            bundle = ModelBundle(name, version, self._paths(name, version), backend=self.backend)
+            print(f"Loaded model {name!r} version {version!r} ({bundle.size_bytes / 1e6:.1f} MB)")
+
+            with self._lock:
+                self._bundles[key] = bundle
+                self.loads += 1
+                evicted = self._evict(keep=key)
+        finally:
+            with self._lock:
+                self._load_locks.pop(key, None)
+            load_lock.release()
+
+        for old in evicted:
+            old.close()
+        return bundle
+
+    def _evict(self, keep):
+        """Drops least-recently-used bundles until the budget is met. Caller holds the lock."""
+        evicted = []
+        while sum(b.size_bytes for b in self._bundles.values()) > self.memory_budget and len(self._bundles) > 1:
+            key = next(k for k in self._bundles if k != keep)
+            evicted.append(self._bundles.pop(key))
+            self.evictions += 1
+        return evicted
+
+    def loaded(self):
+        """Bundles currently held in the cache, least recently used first."""
+        with self._lock:
+            return list(self._bundles.values())
+
+    def publish(self, name, version, source_dir):
+        """
+        Copies a directory of artifacts into the registry as a new version.
+        The copy is staged in a hidden directory and renamed into place, so readers
+        never observe a half-written version.
+        """
+        target = self._directory(name, version)
+        if os.path.exists(target):
+            raise FileExistsError(f"Model {name!r} version {version!r} already exists")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        staging = tempfile.mkdtemp(prefix=f".{version}-", dir=os.path.dirname(target))
+        shutil.copytree(source_dir, staging, dirs_exist_ok=True)
+        os.rename(staging, target)
+        print(f"✅ Published model {name!r} version {version!r} to {target}")
+        return target
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": [{"name": b.name, "version": b.version, "size_bytes": b.size_bytes} for b in self._bundles.values()],
+                "memory_budget_bytes": self.memory_budget,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
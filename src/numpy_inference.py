@@ -0,0 +1,119 @@
+"""
+Handles exporting trained Keras models and serving them with pure NumPy.
+"""
+
+import json
+import os
+import numpy as np
+
+SPEC_FILE = "spec.json"
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 0.5 * (1 + np.tanh(x / 2)),
+    "tanh": np.tanh,
+    "hard_sigmoid": lambda x: np.clip(x / 6 + 0.5, 0, 1),
+}
+
+# Layers that are identities at inference time
+PASSTHROUGH_LAYERS = {"InputLayer", "Dropout"}
+
+def export_keras_model(model, export_dir):
+    """
+    Exports the Dense/LSTM layers of a trained Keras model as ``.npy`` weight files.
+
+    The directory holds one file per weight plus ``spec.json`` describing the layer
+    stack, so :class:`NumpyModel` can rebuild the forward pass without TensorFlow.
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    layers = []
+    for index, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        if kind in PASSTHROUGH_LAYERS:
+            continue
+        if kind not in NumpyModel.LAYERS:
+            raise ValueError(f"Cannot export layer {layer.name!r} of type {kind}")
+
+        config = layer.get_config()
+        spec = {
+            "type": kind,
+            "activation": config.get("activation", "linear"),
+            "recurrent_activation": config.get("recurrent_activation", "sigmoid"),
+            "return_sequences": config.get("return_sequences", False),
+            "weights": [],
+        }
+        for name, weight in zip(["kernel", "recurrent_kernel", "bias"] if kind == "LSTM" else ["kernel", "bias"],
+                                layer.get_weights()):
+            file_name = f"{index:02d}_{layer.name}_{name}.npy"
+            np.save(os.path.join(export_dir, file_name), weight.astype("float32"))
+            spec["weights"].append(file_name)
+        layers.append(spec)
+
+    with open(os.path.join(export_dir, SPEC_FILE), "w") as f:
+        json.dump({"layers": layers}, f, indent=2)
+    print(f"✅ NumPy inference weights exported to {export_dir}")
+
+class NumpyModel:
+    """Pure-NumPy forward pass over weights written by ``export_keras_model``."""
+
+    LAYERS = {"Dense", "LSTM"}
+
+    def __init__(self, layers):
+        self.layers = layers
+
+    @classmethod
+    def load(cls, export_dir):
+        """Loads an exported model, memory-mapping every weight file."""
+        with open(os.path.join(export_dir, SPEC_FILE)) as f:
+            spec = json.load(f)
+        layers = []
+        for layer in spec["layers"]:
+            weights = [np.load(os.path.join(export_dir, name), mmap_mode="r") for name in layer["weights"]]
+            layers.append({**layer, "weights": weights})
+        return cls(layers)
+
+    def predict(self, X, batch_size=8192, **_):
+        """Mirrors ``keras.Model.predict``; batches bound the size of the temporaries."""
+        X = np.asarray(X, dtype="float32")
+        outputs = [self._forward(X[start:start + batch_size]) for start in range(0, len(X), batch_size)]
+        return np.concatenate(outputs) if outputs else self._forward(X)
+
+    def _forward(self, x):
+        for layer in self.layers:
+            if layer["type"] == "Dense":
+                x = self._dense(x, layer)
+            else:
+                x = self._lstm(x, layer)
+        return x
+
+    @staticmethod
+    def _dense(x, layer):
+        kernel, bias = layer["weights"]
+        return ACTIVATIONS[layer["activation"]](x @ kernel + bias)
+
+    @staticmethod
+    def _lstm(x, layer):
+        """Keras LSTM cell with gates in i, f, c, o order."""
+        kernel, recurrent_kernel, bias = layer["weights"]
+        activation = ACTIVATIONS[layer["activation"]]
+        recurrent_activation = ACTIVATIONS[layer["recurrent_activation"]]
+
+        n, steps, _ = x.shape
+        units = recurrent_kernel.shape[0]
+        h = np.zeros((n, units), dtype="float32")
+        c = np.zeros((n, units), dtype="float32")
+
+        # Input projections for every time step in one matmul
+        projected = x @ kernel + bias
+        sequence = np.empty((n, steps, units), dtype="float32") if layer["return_sequences"] else None
+
+        for t in range(steps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i, f, g, o = np.split(z, 4, axis=1)
+            c = recurrent_activation(f) * c + recurrent_activation(i) * activation(g)
+            h = recurrent_activation(o) * activation(c)
+            if sequence is not None:
+                sequence[:, t] = h
+
+        return sequence if sequence is not None else h
@@ -0,0 +1,142 @@
+"""
+Handles background rendering of anomaly plots into a content-addressed cache.
+"""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.instrumentation import stage
+
+def render_anomaly_plot(data, filename):
+    """
+    Plots sensor readings with maintenance alerts highlighted.
+    Uses a standalone Figure rather than pyplot, so it is safe off the main thread.
+    """
+    fig = Figure(figsize=(12, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(data.index, data["value"], label="Sensor Readings", color="blue")
+
+    # Highlight Maintenance Alerts
+    alerts = data["maintenance_alert"] == 1
+    ax.scatter(data.index[alerts], data["value"][alerts], color="red",
+               label="Maintenance Alert (Autoencoder & LSTM)", marker="x")
+
+    ax.legend()
+    ax.set_title("Anomaly Detection with Autoencoder & LSTM")
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel("Sensor Readings")
+    fig.savefig(filename, format="png")
+
+class PlotCache:
+    """
+    Renders plots on a background thread into ``<output_dir>/<key>.png``.
+
+    The key is derived from the content that determines the plot, so a repeated
+    request finds the finished file and nothing is re-rendered; concurrent
+    requests never share an output path. Files are written to a temporary name
+    and renamed into place, so a reader never sees a partial PNG. The directory
+    is bounded by total file size, evicting least-recently-used plots first.
+    """
+
+    def __init__(self, output_dir, max_workers=1, disk_budget_mb=512):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.disk_budget = disk_budget_mb * 1024 * 1024
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="plot-renderer")
+        self._jobs = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.hits = 0
+        self.failures = 0
+
+    def path(self, key):
+        return os.path.join(self.output_dir, f"{key}.png")
+
+    def status(self, key):
+        """"ready", "pending", "failed" or None for an unknown key."""
+        if self._touch(key):
+            return "ready"
+        with self._lock:
+            if key in self._jobs:
+                return "pending"
+            return "failed" if key in self._failed else None
+
+    def _touch(self, key):
+        """True if the plot exists; refreshes its mtime so disk eviction is least-recently-used."""
+        try:
+            os.utime(self.path(key))
+        except OSError:
+            return False
+        return True
+
+    def submit(self, key, data):
+        """
+        Starts rendering ``data`` unless the plot already exists or is being rendered.
+        :return: Future resolving to the PNG path.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self.hits += 1
+                return job
+            if self._touch(key):
+                self.hits += 1
+                job = Future()
+                job.set_result(self.path(key))
+                return job
+            # Copy only what the plot needs so the request can keep mutating its frame
+            self._failed.discard(key)
+            job = self._executor.submit(self._render, key, data[["value", "maintenance_alert"]].copy())
+            self._jobs[key] = job
+            return job
+
+    def _render(self, key, data):
+        handle, tmp_path = tempfile.mkstemp(suffix=".png.tmp", dir=self.output_dir)
+        os.close(handle)
+        try:
+            with stage("plot_render", len(data)):
+                render_anomaly_plot(data, tmp_path)
+            os.replace(tmp_path, self.path(key))
+            with self._lock:
+                self.renders += 1
+        except BaseException:
+            os.remove(tmp_path)
+            with self._lock:
+                self.failures += 1
+                self._failed.add(key)
+            raise
+        finally:
+            # The file on disk is the cache from here on; a failed key renders again on the next submit
+            with self._lock:
+                self._jobs.pop(key, None)
+        self._prune_disk()
+        return self.path(key)
+
+    def _prune_disk(self):
+        entries = []
+        for name in os.listdir(self.output_dir):
+            if name.endswith(".png"):
+                try:
+                    stat = os.stat(os.path.join(self.output_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            return {"renders": self.renders, "hits": self.hits, "failures": self.failures, "pending": len(self._jobs)}
@@ -0,0 +1,147 @@
+"""
+Handles caching of scored uploads keyed by content hash and model version.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+def stream_digest(stream, chunk_size=1 << 20):
+    """SHA-256 hex digest of a binary stream, rewound afterwards so it can still be saved."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+def content_key(*parts):
+    """Stable cache key from the input digest and everything else that changes the output."""
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+class ResultCache:
+    """
+    Scored frames by key, in an in-memory LRU backed by one ``.npz`` file per key.
+
+    Memory is bounded by the frames' in-memory size and disk by file size; both
+    evict least-recently-used first. Disk entries survive restarts, so a repeated
+    upload skips parsing and inference even after a redeploy. Keys must change
+    whenever the result would (see ``content_key``), so entries never need
+    rewriting; stale ones simply age out. Frames with object columns (strings,
+    mixed types) are only cached in memory, since reading them back from disk
+    would need pickle.
+    """
+
+    def __init__(self, directory, memory_budget_mb=256, disk_budget_mb=2048):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.disk_budget = disk_budget_mb * 1024 * 1024
+
+        self._frames = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """Returns a copy of the cached frame, or None."""
+        with self._lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                self.memory_hits += 1
+                return self._frames[key].copy()
+
+        frame = self._read(key)
+        with self._lock:
+            if frame is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, frame)
+        return frame.copy()
+
+    def put(self, key, frame):
+        """Stores ``frame`` in memory and, unless it has object columns, on disk."""
+        written = self._write(key, frame)
+        with self._lock:
+            self._remember(key, frame.copy())
+        if written:
+            self._prune_disk()
+
+    def _remember(self, key, frame):
+        """Adds to the LRU and evicts down to the memory budget. Caller holds the lock."""
+        self._frames[key] = frame
+        self._frames.move_to_end(key)
+        self._sizes[key] = int(frame.memory_usage(index=True, deep=True).sum())
+        while sum(self._sizes.values()) > self.memory_budget and len(self._frames) > 1:
+            evicted, _ = self._frames.popitem(last=False)
+            del self._sizes[evicted]
+
+    def _write(self, key, frame):
+        """Writes ``frame`` to its ``.npz`` file; returns False without writing when a column holds objects."""
+        arrays = {f"column:{name}": frame[name].to_numpy() for name in frame.columns}
+        arrays[f"index:{frame.index.name or ''}"] = frame.index.to_numpy()
+        if any(array.dtype.hasobject for array in arrays.values()):
+            return False
+        # Write under a temporary name and rename, so readers never see a partial file
+        handle, tmp_path = tempfile.mkstemp(suffix=".npz.tmp", dir=self.directory)
+        try:
+            with os.fdopen(handle, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return True
+
+    def _read(self, key):
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                columns = {name.split(":", 1)[1]: arrays[name] for name in arrays.files if name.startswith("column:")}
+                index_name = next(name for name in arrays.files if name.startswith("index:"))
+                index = pd.Index(arrays[index_name], name=index_name.split(":", 1)[1] or None)
+            # Touch the file so disk eviction is least-recently-used too; a
+            # concurrent prune may have removed it since, which is just a miss
+            os.utime(path)
+        except (ValueError, OSError):
+            return None
+        return pd.DataFrame(columns, index=index)
+
+    def _prune_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries_in_memory": len(self._frames),
+                "memory_bytes": sum(self._sizes.values()),
+                "memory_budget_bytes": self.memory_budget,
+            }
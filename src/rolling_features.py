@@ -0,0 +1,234 @@
+"""
+Handles fused batch and O(1) streaming computation of rolling-window features.
+"""
+
+from collections import deque
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Variance at or below this is treated as zero, as pandas does for skew/kurt
+VARIANCE_EPSILON = 1e-14
+
+def _finish_moments(nobs, mean, m2, m3, m4, constant):
+    """
+    Turns per-window central moments into pandas' rolling std/skew/kurt.
+    ``m2``..``m4`` are biased central moments (sum of powered deviations / nobs);
+    ``nobs`` may be a scalar when every window is full.
+    """
+    n = np.asarray(nobs, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.sqrt(np.maximum(m2, 0) * (n / (n - 1)))
+        skew = m3 / (m2 * np.sqrt(m2))
+        skew *= np.sqrt(n * (n - 1)) / (n - 2)
+        kurt = m4 / (m2 * m2)
+        kurt *= (n * n - 1) / ((n - 2) * (n - 3))
+        kurt -= 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+
+    flat = m2 <= VARIANCE_EPSILON
+    skew[flat] = np.nan
+    kurt[flat] = np.nan
+    std[constant] = 0.0
+    skew[constant] = 0.0
+    kurt[constant] = -3.0
+    std[np.broadcast_to(n < 2, std.shape)] = np.nan
+    skew[np.broadcast_to(n < 3, skew.shape)] = np.nan
+    kurt[np.broadcast_to(n < 4, kurt.shape)] = np.nan
+    mean = np.where(n > 0, mean, np.nan)
+    return mean, std, skew, kurt
+
+def _masked_stats(values, window, moments):
+    """General path: windows as strided views with NaN padding/masking."""
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = sliding_window_view(padded, window)
+    valid = ~np.isnan(windows)
+    nobs = valid.sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, windows, 0).sum(axis=1) / nobs
+    maximum = np.where(valid, windows, -np.inf).max(axis=1)
+    minimum = np.where(valid, windows, np.inf).min(axis=1)
+    empty = nobs == 0
+    maximum[empty] = np.nan
+    minimum[empty] = np.nan
+    if not moments:
+        return nobs, np.where(empty, np.nan, mean), maximum, minimum, None
+
+    deviations = np.where(valid, windows - mean[:, None], 0)
+    squared = deviations * deviations
+    with np.errstate(invalid="ignore", divide="ignore"):
+        central = (squared.sum(axis=1) / nobs, (squared * deviations).sum(axis=1) / nobs, (squared * squared).sum(axis=1) / nobs)
+    return nobs, mean, maximum, minimum, central
+
+def _full_window_stats(values, window, moments):
+    """Fast path for NaN-free full windows: ``window`` shifted views accumulated in place."""
+    count = len(values) - window + 1
+    shifted = [values[k:k + count] for k in range(window)]
+
+    total = shifted[0].copy()
+    maximum = shifted[0].copy()
+    minimum = shifted[0].copy()
+    for view in shifted[1:]:
+        total += view
+        np.maximum(maximum, view, out=maximum)
+        np.minimum(minimum, view, out=minimum)
+    mean = total / window
+    nobs = window
+    if not moments:
+        return nobs, mean, maximum, minimum, None
+
+    m2, m3, m4 = np.zeros(count), np.zeros(count), np.zeros(count)
+    deviation, power = np.empty(count), np.empty(count)
+    for view in shifted:
+        np.subtract(view, mean, out=deviation)
+        np.multiply(deviation, deviation, out=power)
+        m2 += power
+        np.multiply(power, deviation, out=deviation)
+        m3 += deviation
+        np.multiply(power, power, out=power)
+        m4 += power
+    return nobs, mean, maximum, minimum, (m2 / window, m3 / window, m4 / window)
+
+def _collect(nobs, mean, maximum, minimum, central):
+    """Assembles the result dict of ``rolling_stats`` from raw window statistics."""
+    stats = {"mean": mean, "max": maximum, "min": minimum}
+    if central is not None:
+        stats["mean"], stats["std"], stats["skew"], stats["kurt"] = _finish_moments(nobs, mean, *central, maximum == minimum)
+    return stats
+
+def rolling_stats(values, window, moments=True):
+    """
+    Computes rolling mean/max/min (and std/skew/kurt) in one fused pass.
+
+    Matches ``Series.rolling(window, min_periods=1)``: partial windows at the start
+    are used as-is and NaNs are skipped. Moments are exact two-pass central
+    moments of each window rather than running sums, so near-flat windows do not
+    suffer the cancellation pandas' add/remove updates can show.
+    :return: Dict of arrays keyed by ``mean``, ``max``, ``min`` and, with ``moments``, ``std``, ``skew``, ``kurt``.
+    """
+    values = np.asarray(values, dtype="float64")
+    if len(values) >= window and not np.isnan(values).any():
+        # Only the first window - 1 rows see partial windows; the rest take the fast path
+        head = _collect(*_masked_stats(values[:window - 1], window, moments))
+        body = _collect(*_full_window_stats(values, window, moments))
+        return {key: np.concatenate([head[key], body[key]]) for key in body}
+    return _collect(*_masked_stats(values, window, moments))
+
+class RollingWindowStats:
+    """
+    Streaming rolling statistics over the last ``window`` values.
+
+    Max and min come from monotonic deques in O(1) per value. Mean and the
+    2nd-4th central moments are recomputed two-pass from the window on every
+    push: the windows are short, and add/remove moment updates lose all
+    precision on near-flat windows (e.g. one 0.102 among 0.1s), where this
+    matches ``rolling_stats`` exactly.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = self.m3 = self.m4 = 0.0
+        self._max = deque()
+        self._min = deque()
+        self._index = 0
+
+    def _moments(self):
+        """Two-pass mean and summed central moments of the non-NaN values in the window."""
+        present = [v for v in self.values if v == v]
+        self.n = len(present)
+        self.mean = sum(present) / self.n if self.n else 0.0
+        m2 = m3 = m4 = 0.0
+        for v in present:
+            deviation = v - self.mean
+            power = deviation * deviation
+            m2 += power
+            m3 += power * deviation
+            m4 += power * power
+        self.m2, self.m3, self.m4 = m2, m3, m4
+
+    def push(self, value):
+        """Adds one value and returns the statistics of the current window."""
+        value = float(value)
+        self.values.append(value)
+
+        index, self._index = self._index, self._index + 1
+        if value == value:
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((index, value))
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((index, value))
+        for extremes in (self._max, self._min):
+            while extremes and extremes[0][0] <= index - self.window:
+                extremes.popleft()
+
+        self._moments()
+        return self.current()
+
+    def current(self):
+        """Statistics of the current window, with the same conventions as ``rolling_stats``."""
+        n, nan = self.n, float("nan")
+        mean = std = skew = kurt = nan
+        if n:
+            mean = self.mean
+            m2, m3, m4 = self.m2 / n, self.m3 / n, self.m4 / n
+            constant = self._max[0][1] == self._min[0][1]
+            if n >= 2:
+                std = 0.0 if constant else math.sqrt(max(m2, 0.0) * n / (n - 1))
+            if n >= 3:
+                skew = 0.0 if constant else nan if m2 <= VARIANCE_EPSILON else math.sqrt(n * (n - 1)) * m3 / ((n - 2) * m2 ** 1.5)
+            if n >= 4:
+                kurt = -3.0 if constant else nan if m2 <= VARIANCE_EPSILON else \
+                    ((n * n - 1) * m4 / (m2 * m2) - 3 * (n - 1) ** 2) / ((n - 2) * (n - 3))
+        return {
+            "mean": mean,
+            "std": std,
+            "skew": skew,
+            "kurt": kurt,
+            "max": self._max[0][1] if self._max else nan,
+            "min": self._min[0][1] if self._min else nan,
+        }
+
+class RollingFeatureEngine:
+    """
+    Produces the rolling columns of ``FeatureEngineering`` in batch or one sample at a time.
+
+    Column names match ``add_statistical_features`` (``stat_window``) and
+    ``add_rolling_features`` (``rolling_window``).
+    """
+
+    def __init__(self, column, stat_window=10, rolling_window=5):
+        self.column = column
+        self.stat_window = stat_window
+        self.rolling_window = rolling_window
+        self._stat_state = RollingWindowStats(stat_window)
+        self._rolling_state = RollingWindowStats(rolling_window)
+
+    def _row(self, stats, rolling):
+        c = self.column
+        return {
+            f"{c}_mean": stats["mean"],
+            f"{c}_std_dev": stats["std"],
+            f"{c}_skewness": stats["skew"],
+            f"{c}_kurtosis": stats["kurt"],
+            f"{c}_rolling_mean": rolling["mean"],
+            f"{c}_rolling_max": rolling["max"],
+            f"{c}_rolling_min": rolling["min"],
+        }
+
+    def transform(self, data):
+        """Adds all seven rolling columns to ``data`` in one fused pass per window size."""
+        values = data[self.column].to_numpy(dtype="float64")
+        stats = rolling_stats(values, self.stat_window)
+        rolling = rolling_stats(values, self.rolling_window, moments=False)
+        for name, column in self._row(stats, rolling).items():
+            data[name] = column
+        return data
+
+    def push(self, value):
+        """Consumes one new sample and returns its feature row."""
+        return self._row(self._stat_state.push(value), self._rolling_state.push(value))
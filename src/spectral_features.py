@@ -0,0 +1,134 @@
+"""
+Handles short-time spectral features over sliding windows, in batch or one sample at a time.
+"""
+
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def band_edges(window, n_bands):
+    """Splits the non-DC rfft bins 1..window//2 into ``n_bands`` contiguous bands."""
+    bins = np.arange(1, window // 2 + 1)
+    return [(int(band[0]), int(band[-1]) + 1) for band in np.array_split(bins, n_bands) if len(band)]
+
+def band_matrix(window, n_bands):
+    """(bins, bands) matrix that sums rfft power per band, normalized by the window length."""
+    edges = band_edges(window, n_bands)
+    matrix = np.zeros((window // 2 + 1, len(edges)))
+    for band, (lo, hi) in enumerate(edges):
+        matrix[lo:hi, band] = 1.0 / window
+    return matrix
+
+def stft_band_energies(values, window=64, hop=1, n_bands=4, batch_size=8192):
+    """
+    Computes Hann-windowed STFT band energies for every row of a series.
+
+    Row ``t`` describes the window ending at ``t`` (inclusive), so the features are
+    causal. With ``hop > 1`` spectra are only computed every ``hop`` rows and held
+    in between; the first ``window - 1`` rows and windows containing NaN are NaN.
+    :return: Array of shape (len(values), n_bands).
+    """
+    values = np.asarray(values, dtype="float64")
+    bands = band_matrix(window, n_bands)
+    energies = np.full((len(values), bands.shape[1]), np.nan)
+    if len(values) < window:
+        return energies
+
+    taper = np.hanning(window + 1)[:-1]  # periodic Hann, matches the sliding DFT below
+    windows = sliding_window_view(values, window)[::hop]
+    ends = np.arange(len(windows)) * hop + window - 1
+
+    # Real FFTs batched across windows, in chunks to bound the tapered copy
+    for start in range(0, len(windows), batch_size):
+        spectrum = np.fft.rfft(windows[start:start + batch_size] * taper, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        energies[ends[start:start + batch_size]] = power @ bands
+
+    if hop > 1:
+        # Hold each spectrum until the next hop
+        held = np.arange(len(values) - window + 1) // hop * hop + window - 1
+        energies[window - 1:] = energies[held]
+    return energies
+
+class SlidingDFT:
+    """
+    Streaming STFT band energies over the last ``window`` values.
+
+    Each push rotates every rfft bin in O(bins) with the sliding-DFT recurrence
+    X_k <- (X_k - x_old + x_new) * exp(2j*pi*k/N); the Hann taper is applied in the
+    frequency domain as a three-tap kernel over neighbouring bins. The bins are
+    recomputed from the buffer every ``resync_every`` pushes so the rounding error
+    of the twiddle products cannot accumulate.
+    """
+
+    def __init__(self, window=64, hop=1, n_bands=4, resync_every=4096):
+        self.window = window
+        self.hop = hop
+        self.bands = band_matrix(window, n_bands)
+        self.resync_every = resync_every
+        self.values = deque([0.0] * window, maxlen=window)
+        self.bins = np.zeros(window // 2 + 1, dtype="complex128")
+        self.twiddle = np.exp(2j * np.pi * np.arange(window // 2 + 1) / window)
+        self.pushes = 0
+        self._missing = deque([False] * window, maxlen=window)
+        self._missing_count = 0
+        self._last = np.full(self.bands.shape[1], np.nan)
+
+    def _resync(self):
+        self.bins = np.fft.rfft(np.fromiter(self.values, dtype="float64", count=self.window))
+
+    def _hann_power(self):
+        """Power of the Hann-tapered spectrum from the untapered bins."""
+        # Neighbours past either end mirror as conjugates: X[-1] = X[1]*, X[m+1] = X[N-m-1]*
+        mirror = self.bins[-2:-1] if self.window % 2 == 0 else self.bins[-1:]
+        full = np.concatenate([np.conj(self.bins[1:2]), self.bins, np.conj(mirror)])
+        tapered = 0.5 * full[1:-1] - 0.25 * (full[:-2] + full[2:])
+        return tapered.real ** 2 + tapered.imag ** 2
+
+    def push(self, value):
+        """Adds one value and returns the band energies of the current window."""
+        value = float(value)
+        # NaNs enter the buffer as zeros and blank the output until they leave the window
+        missing = value != value
+        self._missing_count += missing - self._missing[0]
+        self._missing.append(missing)
+        incoming = 0.0 if missing else value
+
+        expired = self.values[0]
+        self.values.append(incoming)
+        self.bins += incoming - expired
+        self.bins *= self.twiddle
+        self.pushes += 1
+        if self.pushes % self.resync_every == 0:
+            self._resync()
+
+        if self.pushes >= self.window and (self.pushes - self.window) % self.hop == 0:
+            if self._missing_count:
+                self._last = np.full(self.bands.shape[1], np.nan)
+            else:
+                self._last = self._hann_power() @ self.bands
+        return self._last
+
+class SpectralFeatureEngine:
+    """
+    Produces ``{column}_stft_band_<i>`` columns in batch or one sample at a time.
+    """
+
+    def __init__(self, column, window=64, hop=1, n_bands=4):
+        self.column = column
+        self.window = window
+        self.hop = hop
+        self.n_bands = n_bands
+        self.names = [f"{column}_stft_band_{i}" for i in range(len(band_edges(window, n_bands)))]
+        self._state = SlidingDFT(window, hop, n_bands)
+
+    def transform(self, data):
+        """Adds the band-energy columns to ``data`` with batched real FFTs."""
+        energies = stft_band_energies(data[self.column].to_numpy(dtype="float64"), self.window, self.hop, self.n_bands)
+        for i, name in enumerate(self.names):
+            data[name] = energies[:, i]
+        return data
+
+    def push(self, value):
+        """Consumes one new sample and returns its feature row."""
+        return dict(zip(self.names, self._state.push(value).tolist()))
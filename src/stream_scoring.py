@@ -0,0 +1,276 @@
+"""
+Handles point-by-point anomaly scoring of many concurrent streams with compact per-stream state.
+"""
+
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+def _submit(model, X):
+    """Starts ``model.predict(X)``; returns a callable that waits for the result."""
+    if hasattr(model, "submit"):
+        return model.submit(X).result
+    predictions = model.predict(X)
+    return lambda: predictions
+
+class RingHistograms:
+    """
+    One fixed-bin histogram per stream, for running percentile thresholds.
+
+    Counts are uint16; a stream's row is halved once any bin saturates, which
+    keeps memory at ``2 * bins`` bytes per stream and slowly favours recent data.
+    """
+
+    def __init__(self, edges, capacity):
+        self.edges = edges
+        self.counts = np.zeros((capacity, len(edges) - 1), dtype=np.uint16)
+
+    def grow(self, capacity):
+        grown = np.zeros((capacity, self.counts.shape[1]), dtype=self.counts.dtype)
+        grown[:len(self.counts)] = self.counts
+        self.counts = grown
+
+    def clear(self, slots):
+        self.counts[slots] = 0
+
+    def add(self, slots, values):
+        bins = np.clip(np.searchsorted(self.edges, values, side="right") - 1, 0, self.counts.shape[1] - 1)
+        self.counts[slots, bins] += 1
+        saturated = slots[self.counts[slots].max(axis=1) == np.iinfo(np.uint16).max]
+        self.counts[saturated] >>= 1
+
+    def percentile(self, slots, percentile):
+        """Per-slot percentile, interpolated linearly inside the bin; NaN for empty histograms."""
+        counts = self.counts[slots].astype(np.float64)
+        cumulative = np.cumsum(counts, axis=1)
+        total = cumulative[:, -1]
+        target = total * percentile / 100
+        bins = np.minimum((cumulative < target[:, None]).sum(axis=1), counts.shape[1] - 1)
+        rows = np.arange(len(slots))
+        below = cumulative[rows, bins] - counts[rows, bins]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.clip((target - below) / counts[rows, bins], 0, 1)
+        result = self.edges[bins] + fraction * (self.edges[bins + 1] - self.edges[bins])
+        return np.where(total > 0, result, np.nan)
+
+class StreamScorer:
+    """
+    Scores readings from many streams as they arrive, mirroring ``detect_anomalies``.
+
+    Per stream it keeps, in array-backed ring buffers indexed by a slot number:
+    the last ``time_steps`` normalized values (the LSTM window), the last
+    ``rolling_window`` raw values (rolling mean/std), and histograms of LSTM
+    predictions and autoencoder MSE from which the 95th / 99.85th percentile
+    thresholds are read. That is ~``4 * (time_steps + rolling_window) + 4 * bins``
+    bytes per stream, so 100k streams fit in a few tens of MB.
+
+    Until a stream has ``warmup`` points its MSE threshold comes from
+    ``mse_baseline`` (the training sketch) when given, otherwise no autoencoder
+    alerts are raised. Readings are scored in rounds holding at most one point per
+    stream, so each round is one vectorized LSTM and autoencoder call and a
+    stream's points are still applied in order.
+
+    Streams not seen for ``idle_ttl`` seconds are dropped, and beyond
+    ``max_streams`` the least recently seen ones are; their slots are reused,
+    and a dropped stream that comes back starts from an empty state.
+
+    Concurrent ``score`` calls only hold the lock to read and write the
+    per-stream arrays; model inference runs outside it, so calls for different
+    streams overlap and their predictions can be batched together by an
+    ``InferenceScheduler``. A call waits while another one is scoring any of its
+    streams, which keeps each stream's points in order.
+    """
+
+    def __init__(self, lstm_model, autoencoder, scaler, time_steps, mse_baseline=None, lstm_percentile=95,
+                 autoencoder_percentile=99.85, rolling_window=10, warmup=500, capacity=1024, bins=128,
+                 idle_ttl=None, max_streams=None):
+        self.lstm_model = lstm_model
+        self.autoencoder = autoencoder
+        self.scaler = scaler
+        self.time_steps = time_steps
+        self.lstm_percentile = lstm_percentile
+        self.autoencoder_percentile = autoencoder_percentile
+        self.rolling_window = rolling_window
+        self.warmup = warmup
+        self.baseline_threshold = mse_baseline.percentile(autoencoder_percentile) if mse_baseline is not None else np.nan
+        self.idle_ttl = idle_ttl
+        self.max_streams = max_streams
+
+        self.slots = {}
+        self.stream_ids = np.empty(capacity, dtype=object)
+        self.last_seen = np.zeros(capacity)
+        self._free = []
+        self._next_slot = 0
+        self._last_sweep = time.monotonic()
+        self.evictions = 0
+        self.history = np.zeros((capacity, time_steps), dtype=np.float32)
+        self.recent = np.zeros((capacity, rolling_window), dtype=np.float32)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        # LSTM predictions live in normalized units, MSE spans many decades
+        self.predictions = RingHistograms(np.linspace(-0.5, 1.5, bins + 1), capacity)
+        self.errors = RingHistograms(np.r_[0.0, np.logspace(-12, 1, bins)], capacity)
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        # Streams currently being scored by some call, and their slots
+        self._busy = {}
+
+    def __len__(self):
+        return len(self.slots)
+
+    def nbytes(self):
+        """Memory held by the per-stream arrays."""
+        return sum(a.nbytes for a in (self.history, self.recent, self.count, self.last_seen, self.predictions.counts,
+                                      self.errors.counts))
+
+    def _slot_for(self, stream_ids):
+        slots = np.empty(len(stream_ids), dtype=np.int64)
+        new = []
+        for i, stream_id in enumerate(stream_ids):
+            slot = self.slots.get(stream_id)
+            if slot is None:
+                if self._free:
+                    slot = self._free.pop()
+                else:
+                    slot, self._next_slot = self._next_slot, self._next_slot + 1
+                    if slot >= len(self.count):
+                        self._grow(2 * len(self.count))
+                self.slots[stream_id] = slot
+                self.stream_ids[slot] = stream_id
+                new.append(slot)
+            slots[i] = slot
+        if new:
+            self._reset(np.asarray(new))
+        self.last_seen[slots] = time.monotonic()
+        return slots
+
+    def _reset(self, slots):
+        """Clears reused slots, so a new stream never inherits an evicted stream's state."""
+        self.history[slots] = 0
+        self.recent[slots] = 0
+        self.count[slots] = 0
+        self.predictions.clear(slots)
+        self.errors.clear(slots)
+
+    def _evict(self, keep):
+        """Drops idle streams and, beyond ``max_streams``, the least recently seen ones (never ``keep``)."""
+        now = time.monotonic()
+        active = np.fromiter(self.slots.values(), dtype=np.int64, count=len(self.slots))
+        evict = np.empty(0, dtype=np.int64)
+        # Idle streams are swept at most ten times per TTL
+        if self.idle_ttl is not None and now - self._last_sweep >= self.idle_ttl / 10:
+            self._last_sweep = now
+            evict = np.setdiff1d(active[self.last_seen[active] < now - self.idle_ttl], keep)
+        excess = len(active) - len(evict) - (self.max_streams if self.max_streams is not None else len(active))
+        if excess > 0:
+            candidates = np.setdiff1d(active, np.concatenate([evict, keep]))
+            oldest = candidates[np.argsort(self.last_seen[candidates], kind="stable")]
+            evict = np.concatenate([evict, oldest[:excess]])
+        for slot in evict:
+            del self.slots[self.stream_ids[slot]]
+            self.stream_ids[slot] = None
+        self._free.extend(evict.tolist())
+        self.evictions += len(evict)
+
+    def _grow(self, capacity):
+        self.stream_ids = np.concatenate([self.stream_ids, np.empty(capacity - len(self.stream_ids), dtype=object)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros(capacity - len(self.last_seen))])
+        for name in ("history", "recent", "count"):
+            old = getattr(self, name)
+            grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+        self.predictions.grow(capacity)
+        self.errors.grow(capacity)
+
+    def score(self, stream_ids, values, timestamps=None):
+        """
+        Scores a batch of readings (any mix of streams, in arrival order).
+        :return: DataFrame with one decision row per reading, in input order.
+        """
+        stream_ids = np.asarray(stream_ids, dtype=object)
+        values = np.asarray(values, dtype=np.float64)
+        # Round r holds each stream's r-th reading of this batch
+        rounds = pd.Series(stream_ids).groupby(stream_ids, sort=False).cumcount().to_numpy()
+
+        columns = {name: np.zeros(len(values)) for name in ("value_normalized", "mse", "rolling_mean", "rolling_std")}
+        flags = {name: np.zeros(len(values), dtype=int) for name in ("predicted_failure", "autoencoder_anomaly")}
+        claimed = set(stream_ids.tolist())
+        with self._released:
+            self._released.wait_for(lambda: claimed.isdisjoint(self._busy))
+            slots = self._slot_for(stream_ids)
+            self._busy.update(zip(stream_ids.tolist(), slots.tolist()))
+            self._evict(keep=np.fromiter(self._busy.values(), dtype=np.int64, count=len(self._busy)))
+        try:
+            for r in range(rounds.max() + 1 if len(values) else 0):
+                rows = np.flatnonzero(rounds == r)
+                self._score_round(slots[rows], values[rows], rows, columns, flags)
+        finally:
+            with self._released:
+                for stream_id in claimed:
+                    del self._busy[stream_id]
+                self._released.notify_all()
+
+        result = pd.DataFrame({"stream_id": stream_ids, "value": values, **columns, **flags})
+        if timestamps is not None:
+            result.insert(1, "timestamp", timestamps)
+        result["maintenance_alert"] = result["autoencoder_anomaly"] | result["predicted_failure"]
+        return result
+
+    def _score_round(self, slots, values, rows, columns, flags):
+        """Scores one reading per slot; the slots are claimed by the calling ``score``."""
+        T = self.time_steps
+        normalized = self.scaler.transform(values.reshape(-1, 1)).flatten()
+        X_auto = normalized.reshape(-1, 1)
+        with self._lock:
+            positions = self.count[slots]
+            # LSTM Forecasting: the window is the previous time_steps points of the stream, oldest first
+            ready = positions >= T
+            order = (positions[ready, None] + np.arange(T)) % T
+            X = self.history[slots[ready, None], order].reshape((-1, T, 1))
+
+        # Both models are independent here: with schedulers, queue them together and wait once
+        lstm_pending = _submit(self.lstm_model, X) if ready.any() else None
+        autoencoder_pending = _submit(self.autoencoder, X_auto)
+        lstm_predictions = np.asarray(lstm_pending()).reshape(-1) if lstm_pending is not None else None
+        reconstructions = np.asarray(autoencoder_pending())
+
+        with self._lock:
+            self._apply_round(slots, values, normalized, positions, ready, lstm_predictions, reconstructions,
+                              rows, columns, flags)
+
+    def _apply_round(self, slots, values, normalized, positions, ready, lstm_predictions, reconstructions,
+                     rows, columns, flags):
+        """Updates the thresholds and ring buffers with a round's predictions. Caller holds the lock."""
+        T = self.time_steps
+        X_auto = normalized.reshape(-1, 1)
+        if lstm_predictions is not None:
+            self.predictions.add(slots[ready], lstm_predictions)
+
+        # Same rule as detect_anomalies: normalized value against the rescaled 95th percentile prediction
+        threshold = self.predictions.percentile(slots, self.lstm_percentile)
+        threshold = self.scaler.inverse_transform(threshold.reshape(-1, 1)).flatten()
+        flags["predicted_failure"][rows] = normalized > threshold
+
+        # Autoencoder reconstruction error against the stream's own running threshold
+        mse = np.mean(np.power(X_auto - reconstructions, 2), axis=1)
+        self.errors.add(slots, mse)
+        mse_threshold = self.errors.percentile(slots, self.autoencoder_percentile)
+        mse_threshold = np.where(positions + 1 >= self.warmup, mse_threshold, self.baseline_threshold)
+        flags["autoencoder_anomaly"][rows] = mse > mse_threshold
+
+        # Advance the ring buffers
+        self.history[slots, positions % T] = normalized
+        self.recent[slots, positions % self.rolling_window] = values
+        self.count[slots] = positions + 1
+
+        filled = np.minimum(positions + 1, self.rolling_window)
+        valid = np.arange(self.rolling_window) < filled[:, None]
+        window = np.where(valid, self.recent[slots], 0.0)
+        mean = window.sum(axis=1) / filled
+        variance = (np.where(valid, window - mean[:, None], 0.0) ** 2).sum(axis=1) / np.maximum(filled - 1, 1)
+
+        columns["value_normalized"][rows] = normalized
+        columns["mse"][rows] = mse
+        columns["rolling_mean"][rows] = mean
+        columns["rolling_std"][rows] = np.where(filled > 1, np.sqrt(variance), np.nan)
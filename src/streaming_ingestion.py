@@ -0,0 +1,181 @@
+"""
+Handles chunked, bounded-memory ingestion and scoring of large sensor uploads.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+import numpy as np
+import pandas as pd
+
+from src.quantile_sketch import TDigest
+from src.windowing import create_windows
+
+class ScoreSpill:
+    """
+    Append-only on-disk columns holding the per-row scores between the two passes.
+    The directory is removed by ``cleanup``, or when the spill is garbage collected
+    (e.g. a result generator that was never iterated).
+    """
+
+    COLUMNS = {
+        "timestamp": "int64",
+        "value": "float64",
+        "value_normalized": "float64",
+        "mse": "float64",
+        "lstm_prediction": "float64",
+    }
+
+    def __init__(self, spill_dir=None):
+        self.sketches = {"mse": TDigest(), "lstm_prediction": TDigest()}
+        self.directory = tempfile.mkdtemp(prefix="score_spill_", dir=spill_dir)
+        self._remove = weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+        self.lengths = dict.fromkeys(self.COLUMNS, 0)
+        self._files = {name: open(self._path(name), "ab") for name in self.COLUMNS}
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def append(self, name, values):
+        """Appends a block of values to the named column."""
+        values = np.ascontiguousarray(values, dtype=self.COLUMNS[name])
+        values.tofile(self._files[name])
+        self.lengths[name] += len(values)
+
+    def finish(self):
+        """Flushes and closes the column files so they can be memory-mapped."""
+        for f in self._files.values():
+            f.close()
+
+    def column(self, name):
+        """Returns a read-only memory map of the named column."""
+        if self.lengths[name] == 0:
+            return np.empty(0, dtype=self.COLUMNS[name])
+        return np.memmap(self._path(name), dtype=self.COLUMNS[name], mode="r", shape=(self.lengths[name],))
+
+    def cleanup(self):
+        self.finish()
+        self._remove()
+
+class ChunkedAnomalyPipeline:
+    """
+    Runs the LSTM & autoencoder detectors over a CSV stream one chunk at a time.
+
+    Pass one parses ``chunk_size`` rows at a time, carries the last ``time_steps``
+    normalized values across chunk boundaries so every LSTM window matches the
+    whole-file path, runs both models, and spills the per-row scores to disk.
+    Pass two computes the percentile thresholds and yields the flagged rows chunk
+    by chunk. With ``exact_thresholds`` the thresholds are exact ``np.percentile``
+    values over the spilled scores; otherwise they come from
+    t-digests updated during pass one, so memory stays bounded by the chunk size.
+    A persisted ``mse_baseline`` digest replaces the autoencoder threshold entirely.
+    """
+
+    def __init__(self, lstm_model, autoencoder, scaler, time_steps, chunk_size=100_000,
+                 lstm_percentile=95, autoencoder_percentile=99.85, spill_dir=None,
+                 exact_thresholds=True, mse_baseline=None):
+        self.lstm_model = lstm_model
+        self.autoencoder = autoencoder
+        self.scaler = scaler
+        self.time_steps = time_steps
+        self.chunk_size = chunk_size
+        self.lstm_percentile = lstm_percentile
+        self.autoencoder_percentile = autoencoder_percentile
+        self.spill_dir = spill_dir
+        self.exact_thresholds = exact_thresholds
+        self.mse_baseline = mse_baseline
+
+    def read_chunks(self, source):
+        """Parses a CSV path or file-like object in bounded chunks."""
+        return pd.read_csv(source, parse_dates=["timestamp"], chunksize=self.chunk_size)
+
+    def score_chunk(self, values, carry):
+        """
+        Scores one chunk of raw values.
+        :param values: 1-D array of raw sensor values for this chunk.
+        :param carry: Normalized values of the last ``time_steps`` rows seen so far.
+        :return: Tuple ``(normalized, lstm_prediction, mse, carry)``.
+        """
+        normalized = self.scaler.transform(values.reshape(-1, 1)).flatten()
+
+        # LSTM Forecasting over windows that may start in the previous chunk
+        context = np.concatenate([carry, normalized])
+        X, _ = create_windows(context, self.time_steps)
+        if len(X):
+            y_pred = self.lstm_model.predict(X.reshape((-1, self.time_steps, 1)))
+            lstm_prediction = self.scaler.inverse_transform(y_pred.reshape(-1, 1)).flatten()
+        else:
+            lstm_prediction = np.empty(0)
+
+        # Autoencoder reconstruction error
+        X_auto = normalized.reshape(-1, 1)
+        predictions = self.autoencoder.predict(X_auto)
+        mse = np.mean(np.power(X_auto - predictions, 2), axis=1)
+
+        return normalized, lstm_prediction, mse, context[-self.time_steps:]
+
+    def ingest(self, source):
+        """First pass: scores every chunk of ``source`` and spills the results to disk."""
+        spill = ScoreSpill(self.spill_dir)
+        carry = np.empty(0)
+        try:
+            for chunk in self.read_chunks(source):
+                values = chunk["value"].to_numpy(dtype="float64")
+                normalized, lstm_prediction, mse, carry = self.score_chunk(values, carry)
+
+                spill.append("timestamp", chunk["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64"))
+                spill.append("value", values)
+                spill.append("value_normalized", normalized)
+                spill.append("mse", mse)
+                if self.exact_thresholds:
+                    spill.append("lstm_prediction", lstm_prediction)
+                else:
+                    spill.sketches["mse"].update(mse)
+                    spill.sketches["lstm_prediction"].update(lstm_prediction)
+        except Exception:
+            spill.cleanup()
+            raise
+        spill.finish()
+        return spill
+
+    def thresholds(self, spill):
+        """Computes the LSTM and autoencoder thresholds from the spilled scores or sketches."""
+        if self.exact_thresholds:
+            lstm_threshold = np.percentile(spill.column("lstm_prediction"), self.lstm_percentile)
+        else:
+            lstm_threshold = spill.sketches["lstm_prediction"].percentile(self.lstm_percentile)
+
+        if self.mse_baseline is not None:
+            autoencoder_threshold = self.mse_baseline.percentile(self.autoencoder_percentile)
+        elif self.exact_thresholds:
+            autoencoder_threshold = np.percentile(spill.column("mse"), self.autoencoder_percentile)
+        else:
+            autoencoder_threshold = spill.sketches["mse"].percentile(self.autoencoder_percentile)
+        return lstm_threshold, autoencoder_threshold
+
+    def iter_results(self, spill):
+        """Second pass: yields result DataFrames of at most ``chunk_size`` rows."""
+        try:
+            lstm_threshold, autoencoder_threshold = self.thresholds(spill)
+            timestamps = spill.column("timestamp")
+            values = spill.column("value")
+            normalized = spill.column("value_normalized")
+            mse = spill.column("mse")
+
+            for start in range(0, len(values), self.chunk_size):
+                stop = start + self.chunk_size
+                chunk = pd.DataFrame({
+                    "value": np.array(values[start:stop]),
+                    "value_normalized": np.array(normalized[start:stop]),
+                }, index=pd.DatetimeIndex(np.array(timestamps[start:stop]).view("datetime64[ns]"), name="timestamp"))
+                chunk["predicted_failure"] = (chunk["value_normalized"] > lstm_threshold).astype(int)
+                chunk["autoencoder_anomaly"] = (np.array(mse[start:stop]) > autoencoder_threshold).astype(int)
+                chunk["maintenance_alert"] = chunk["autoencoder_anomaly"] | chunk["predicted_failure"]
+                yield chunk
+        finally:
+            spill.cleanup()
+
+    def run(self, source):
+        """Ingests ``source`` eagerly and returns a generator over the result chunks."""
+        return self.iter_results(self.ingest(source))
@@ -7,6 +7,10 @@ import joblib
 import tensorflow as tf
 import matplotlib.pyplot as plt
 
+from src.instrumentation import stage
+from src.train_model import HORIZONS
+from src.windowing import create_horizon_windows, create_windows
+
 class ForecastingStrategy:
     """Base class for different forecasting strategies."""
     def forecast(self, data):
@@ -35,7 +39,8 @@ class LSTMForecaster(ForecastingStrategy):
         X_test, y_test = self.create_sequences(data["value_normalized"].values)
         X_test = X_test.reshape((-1, self.time_steps, 1))
         
-        y_pred = self.model.predict(X_test)
+        with stage("lstm_forecast", len(X_test), log=True):
+            y_pred = self.model.predict(X_test)
         
         y_test_rescaled = self.scaler.inverse_transform(y_test.reshape(-1, 1))
         y_pred_rescaled = self.scaler.inverse_transform(y_pred.reshape(-1, 1))
@@ -44,11 +49,88 @@ class LSTMForecaster(ForecastingStrategy):
     
     def create_sequences(self, data):
         """Creates sequences for LSTM model."""
-        X, y = [], []
-        for i in range(len(data) - self.time_steps):
-            X.append(data[i:i + self.time_steps])
-            y.append(data[i + self.time_steps])
-        return np.array(X), np.array(y)
+        return create_windows(data, self.time_steps)
+
+def recursive_forecast(model, X, horizons, batch_size=8192):
+    """
+    Rolls a one-step model forward to every horizon, for all windows at once.
+
+    Each step is one batched ``predict`` over every window (``max(horizons)`` calls
+    in total, instead of one per window and step); the predictions are fed back
+    as the newest value of their windows.
+    :param X: Normalized windows of shape (n, time_steps, 1).
+    :return: Normalized predictions of shape (n, len(horizons)).
+    """
+    window = np.array(X, dtype=np.float32)  # rolled in place
+    predictions = np.empty((len(window), len(horizons)), dtype=np.float32)
+    columns = {horizon: k for k, horizon in enumerate(horizons)}
+    for step in range(1, max(horizons) + 1):
+        y_step = np.asarray(model.predict(window, batch_size=batch_size, verbose=0)).reshape(-1)
+        if step in columns:
+            predictions[:, columns[step]] = y_step
+        window[:, :-1] = window[:, 1:]
+        window[:, -1, 0] = y_step
+    return predictions
+
+class MultiHorizonForecaster(ForecastingStrategy):
+    """
+    Forecasts several horizons for every window.
+    "direct" runs the multi-output model of MultiHorizonTrainer once; "recursive"
+    rolls the one-step LSTM forward, batched across all windows.
+    """
+    def __init__(self, method="direct", horizons=None, model_path=None, scaler_path="../notebooks/scaler_data/scaler.pkl",
+                 config_path="../notebooks/models/multi_horizon.pkl", time_steps_path="../notebooks/models/time_steps.pkl"):
+        if method == "direct":
+            config = joblib.load(config_path)
+            self.time_steps = config["time_steps"]
+            trained = list(config["horizons"])
+            self.horizons = tuple(horizons or trained)
+            missing = set(self.horizons) - set(trained)
+            if missing:
+                raise ValueError(f"Model was trained for horizons {trained}, not {sorted(missing)}")
+            self.columns = [trained.index(h) for h in self.horizons]
+            model_path = model_path or "../notebooks/models/multi_horizon_lstm.h5"
+        elif method == "recursive":
+            self.time_steps = joblib.load(time_steps_path)
+            self.horizons = tuple(horizons or HORIZONS)
+            model_path = model_path or "../notebooks/models/lstm_model.h5"
+        else:
+            raise ValueError(f"Unknown method {method!r}, expected 'direct' or 'recursive'")
+
+        self.method = method
+        self.model = tf.keras.models.load_model(model_path, compile=False)
+        self.model.compile(optimizer="adam", loss=tf.keras.losses.MeanSquaredError())
+        self.scaler = joblib.load(scaler_path)
+
+    def forecast(self, data):
+        """
+        Predicts every horizon for each window that has all its targets.
+        :return: ``(y_test, y_pred)`` rescaled and ``y_pred`` normalized, each of shape (n, len(horizons)).
+        """
+        X_test, y_test = create_horizon_windows(data["value_normalized"].values, self.time_steps, self.horizons)
+        X_test = X_test.reshape((-1, self.time_steps, 1))
+
+        with stage(f"{self.method}_forecast", len(X_test), log=True):
+            if self.method == "direct":
+                y_pred = np.asarray(self.model.predict(X_test))[:, self.columns]
+            else:
+                y_pred = recursive_forecast(self.model, X_test, self.horizons)
+
+        y_test_rescaled = self.scaler.inverse_transform(y_test.reshape(-1, 1)).reshape(y_test.shape)
+        y_pred_rescaled = self.scaler.inverse_transform(y_pred.reshape(-1, 1)).reshape(y_pred.shape)
+
+        return y_test_rescaled, y_pred_rescaled, y_pred
+
+    def plot_forecast(self, y_test, y_pred):
+        """Plots actual vs predicted values, one panel per horizon."""
+        fig, axes = plt.subplots(len(self.horizons), 1, figsize=(12, 3 * len(self.horizons)), sharex=True, squeeze=False)
+        for k, (horizon, ax) in enumerate(zip(self.horizons, axes[:, 0])):
+            ax.plot(y_test[:, k], label="Actual EC2 Readings", color="blue")
+            ax.plot(y_pred[:, k], label="Predicted EC2 Readings", color="red")
+            ax.set_title(f"{horizon} steps ahead")
+            ax.legend()
+        plt.tight_layout()
+        plt.show()
 
 class ForecastingContext:
     """Context class for applying different forecasting strategies."""
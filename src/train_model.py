@@ -8,6 +8,14 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 import joblib
 
+from src.instrumentation import stage
+from src.numpy_inference import export_keras_model
+from src.training_callbacks import early_stopping
+from src.windowing import create_horizon_windows, create_windows
+
+# Forecast horizons in steps of the 5-minute readings: 1h, 6h and 24h ahead
+HORIZONS = (12, 72, 288)
+
 class LSTMTrainer:
     """LSTM model trainer using Strategy Pattern"""
 
@@ -17,14 +25,25 @@ class LSTMTrainer:
 
     def create_sequences(self, data):
         """Creates sequences for LSTM input"""
-        X, y = [], []
-        for i in range(len(data) - self.time_steps):
-            X.append(data[i:i + self.time_steps])
-            y.append(data[i + self.time_steps])
-        return np.array(X), np.array(y)
-
-    def train(self, data_train, data_test, save_model_path="../notebooks/models/lstm_model.h5"):
-        """Trains LSTM model on time-series data"""
+        return create_windows(data, self.time_steps)
+
+    def build_model(self):
+        """Builds and compiles the LSTM model"""
+        model = Sequential([
+            LSTM(50, activation="relu", return_sequences=True, input_shape=(self.time_steps, 1)),
+            Dropout(0.2),
+            LSTM(50, activation="relu"),
+            Dense(1)
+        ])
+        model.compile(optimizer="adam", loss="mse")
+        return model
+
+    def train(self, data_train, data_test, save_model_path="../notebooks/models/lstm_model.h5",
+              export_dir="../notebooks/models/lstm_numpy", epochs=20, batch_size=16, patience=None):
+        """
+        Trains LSTM model on time-series data
+        :param patience: Stop after this many epochs without a lower validation loss (None trains all epochs).
+        """
         X_train, y_train = self.create_sequences(data_train["value_normalized"].values)
         X_test, y_test = self.create_sequences(data_test["value_normalized"].values)
 
@@ -36,23 +55,62 @@ class LSTMTrainer:
         print(f"Testing Data Shape: X_test: {X_test.shape}, y_test: {y_test.shape}")
 
         # Build LSTM Model
-        self.model = Sequential([
+        self.model = self.build_model()
+
+        with stage("lstm_fit", len(X_train), log=True):
+            self.model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, validation_data=(X_test, y_test),
+                           callbacks=early_stopping(patience))
+
+        self.save_model(save_model_path, export_dir)
+        return self.model
+
+    def save_model(self, save_model_path="../notebooks/models/lstm_model.h5", export_dir="../notebooks/models/lstm_numpy",
+                   time_steps_path="../notebooks/models/time_steps.pkl"):
+        """Saves the model, its time_steps and the NumPy serving export"""
+        with stage("lstm_save", log=True):
+            self.model.save(save_model_path)
+            print(f"Model saved at {save_model_path}")
+            joblib.dump(self.time_steps, time_steps_path)
+
+            # Export weights for the TensorFlow-free NumPy serving path
+            export_keras_model(self.model, export_dir)
+
+class MultiHorizonTrainer(LSTMTrainer):
+    """LSTM trainer with a direct multi-output head: one output per forecast horizon"""
+
+    def __init__(self, time_steps=10, horizons=HORIZONS):
+        super().__init__(time_steps)
+        self.horizons = tuple(horizons)
+
+    def create_sequences(self, data):
+        """Creates windows with one target per horizon"""
+        return create_horizon_windows(data, self.time_steps, self.horizons)
+
+    def build_model(self):
+        """Builds and compiles the LSTM model with one output per horizon"""
+        model = Sequential([
             LSTM(50, activation="relu", return_sequences=True, input_shape=(self.time_steps, 1)),
             Dropout(0.2),
             LSTM(50, activation="relu"),
-            Dense(1)
+            Dense(len(self.horizons))
         ])
+        model.compile(optimizer="adam", loss="mse")
+        return model
 
-        self.model.compile(optimizer="adam", loss="mse")
-
-        self.model.fit(X_train, y_train, epochs=20, batch_size=16, validation_data=(X_test, y_test))
+    def train(self, data_train, data_test, save_model_path="../notebooks/models/multi_horizon_lstm.h5",
+              export_dir="../notebooks/models/multi_horizon_numpy", epochs=20, batch_size=16, patience=None):
+        """Trains the multi-horizon LSTM model on time-series data"""
+        return super().train(data_train, data_test, save_model_path, export_dir, epochs, batch_size, patience)
 
-        # Save Model
-        self.model.save(save_model_path)
-        print(f"Model saved at {save_model_path}")
-        joblib.dump(self.time_steps, "../notebooks/models/time_steps.pkl")
-
-        return self.model
+    def save_model(self, save_model_path="../notebooks/models/multi_horizon_lstm.h5",
+                   export_dir="../notebooks/models/multi_horizon_numpy",
+                   config_path="../notebooks/models/multi_horizon.pkl"):
+        """Saves the model, its time_steps and horizons, and the NumPy serving export"""
+        with stage("multi_horizon_save", log=True):
+            self.model.save(save_model_path)
+            print(f"Model saved at {save_model_path}")
+            joblib.dump({"time_steps": self.time_steps, "horizons": self.horizons}, config_path)
+            export_keras_model(self.model, export_dir)
 
 # Context class to switch between different training strategies (future extensibility)
 class ModelTrainingContext:
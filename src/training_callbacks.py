@@ -0,0 +1,11 @@
+"""
+Handles Keras callbacks shared by the model trainers.
+"""
+
+import tensorflow as tf
+
+def early_stopping(patience):
+    """Callbacks that stop on a stalled validation loss and keep the best weights (none without patience)."""
+    if patience is None:
+        return []
+    return [tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=patience, restore_best_weights=True)]
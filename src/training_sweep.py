@@ -0,0 +1,250 @@
+"""
+Handles hyperparameter sweeps of the LSTM and autoencoder models over a process pool.
+
+Usage (from the project root):
+    python -m src.training_sweep --model lstm --time-steps 10 20 30 --batch-size 16 64 --workers 2
+    python -m src.training_sweep --model autoencoder --encoding-dim 8 16 32 --patience 5
+"""
+
+import argparse
+import contextlib
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+from src.windowing import create_windows
+
+# Default epochs of LSTMTrainer.train / AutoencoderAnomalyDetector.train
+EPOCHS = {"lstm": 20, "autoencoder": 50}
+
+def expand_grid(grid):
+    """All combinations of a ``{parameter: [values]}`` grid, as a list of config dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def build_window_cache(data_train, data_test, model, configs, directory):
+    """
+    Writes each distinct training dataset of the sweep once as ``.npy`` files.
+
+    For the LSTM that is one (windows, targets) pair per ``time_steps`` for both
+    splits; workers memory-map them, so every configuration sharing a window
+    length reads the same page-cached file instead of rebuilding it. The
+    autoencoder trains on single values, so it shares one file, split 80/20 like
+    ``validation_split=0.2``.
+    :return: ``{time_steps: {"train": (X_path, y_path), "val": (X_path, y_path)}}``
+    """
+    os.makedirs(directory, exist_ok=True)
+    train = data_train["value_normalized"].to_numpy(dtype=np.float32)
+    cache = {}
+    if model == "autoencoder":
+        path = os.path.join(directory, "values.npy")
+        np.save(path, train.reshape(-1, 1))
+        return {None: {"values": path}}
+
+    test = data_test["value_normalized"].to_numpy(dtype=np.float32)
+    for time_steps in sorted({config["time_steps"] for config in configs}):
+        cache[time_steps] = {}
+        for split, values in (("train", train), ("val", test)):
+            X, y = create_windows(values, time_steps)
+            paths = (os.path.join(directory, f"{split}_X_{time_steps}.npy"), os.path.join(directory, f"{split}_y_{time_steps}.npy"))
+            np.save(paths[0], X[..., None])
+            np.save(paths[1], y)
+            cache[time_steps][split] = paths
+    return cache
+
+def make_dataset(X, y, batch_size, shuffle=False, seed=7):
+    """
+    ``tf.data`` pipeline over (memory-mapped) arrays: shuffled index batches are
+    gathered on a background thread and prefetched while the model trains.
+    """
+    import tensorflow as tf
+
+    def gather(indices):
+        indices = np.sort(indices)  # sequential reads from the mapped file
+        return np.asarray(X[indices], dtype=np.float32), np.asarray(y[indices], dtype=np.float32)
+
+    def set_shapes(X_batch, y_batch):
+        X_batch.set_shape((None,) + X.shape[1:])
+        y_batch.set_shape((None,) + y.shape[1:])
+        return X_batch, y_batch
+
+    indices = tf.data.Dataset.range(len(X))
+    if shuffle:
+        indices = indices.shuffle(min(len(X), 1_000_000), seed=seed, reshuffle_each_iteration=True)
+    batches = indices.batch(batch_size).map(lambda i: tf.numpy_function(gather, [i], (tf.float32, tf.float32)),
+                                            num_parallel_calls=tf.data.AUTOTUNE)
+    return batches.map(set_shapes).prefetch(tf.data.AUTOTUNE)
+
+# Thread counts of the math libraries, read once when each library loads
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+@contextlib.contextmanager
+def worker_thread_limits(threads):
+    """
+    Sets ``THREAD_VARIABLES`` to ``threads`` while the pool spawns its workers, so
+    each worker starts with them already in its environment; setting them inside
+    a worker is too late, as NumPy has loaded its BLAS by the time it runs.
+    """
+    saved = {variable: os.environ.get(variable) for variable in THREAD_VARIABLES}
+    os.environ.update({variable: str(threads) for variable in THREAD_VARIABLES})
+    try:
+        yield
+    finally:
+        for variable, value in saved.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+
+def _init_worker(threads):
+    """Caps TensorFlow's thread pools in a sweep worker so parallel workers don't oversubscribe the CPUs."""
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+def _train_config(index, model, config, cache, patience, output_dir):
+    """Trains one configuration in a worker; returns its results row."""
+    from src.autoencoder import AutoencoderAnomalyDetector
+    from src.train_model import LSTMTrainer
+    from src.training_callbacks import early_stopping
+
+    if model == "lstm":
+        (X_train, y_train), (X_val, y_val) = [[np.load(path, mmap_mode="r") for path in cache[config["time_steps"]][split]]
+                                              for split in ("train", "val")]
+        keras_model = LSTMTrainer(config["time_steps"]).build_model()
+    else:
+        values = np.load(cache[None]["values"], mmap_mode="r")
+        split = int(len(values) * 0.8)
+        X_train, X_val = values[:split], values[split:]
+        y_train, y_val = X_train, X_val
+        keras_model = AutoencoderAnomalyDetector(config["encoding_dim"]).build_autoencoder(1)
+        keras_model.compile(optimizer="adam", loss="mse")
+
+    batch_size = config["batch_size"]
+    start = time.perf_counter()
+    history = keras_model.fit(make_dataset(X_train, y_train, batch_size, shuffle=True),
+                              validation_data=make_dataset(X_val, y_val, batch_size),
+                              epochs=config["epochs"], callbacks=early_stopping(patience), verbose=0)
+    val_loss = history.history["val_loss"]
+
+    model_path = os.path.join(output_dir, f"{model}_{index:03d}.h5")
+    keras_model.save(model_path)
+    return {**config, "val_loss": min(val_loss), "best_epoch": int(np.argmin(val_loss)) + 1, "epochs_run": len(val_loss),
+            "train_seconds": time.perf_counter() - start, "model_path": model_path}
+
+def run_sweep(data_train, data_test, model="lstm", grid=None, patience=3, workers=None, threads_per_worker=1,
+              output_dir="../notebooks/models/sweeps", save=True, **save_paths):
+    """
+    Trains every configuration of ``grid`` and saves the one with the lowest validation loss.
+
+    Configurations run in a pool of ``workers`` spawned processes, each limited to
+    ``threads_per_worker`` threads. Validation is ``data_test`` for the LSTM (as in
+    ``LSTMTrainer.train``) and the last 20% of ``data_train`` for the autoencoder.
+    The winner is saved through ``LSTMTrainer.save_model`` /
+    ``AutoencoderAnomalyDetector.save_model``; ``save_paths`` are passed on to it.
+    The run directory under ``output_dir`` keeps only ``results.csv`` and the
+    best model: the window cache and the other candidates are deleted.
+    :return: results DataFrame, best configuration first.
+    """
+    grid = dict(grid or ({"time_steps": [10, 20, 30], "batch_size": [16, 64]} if model == "lstm"
+                         else {"encoding_dim": [8, 16, 32], "batch_size": [32, 128]}))
+    grid.setdefault("epochs", [EPOCHS[model]])
+    configs = expand_grid(grid)
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    os.makedirs(output_dir, exist_ok=True)
+    run_dir = tempfile.mkdtemp(prefix=f"{model}-", dir=output_dir)
+    windows_dir = os.path.join(run_dir, "windows")
+    print(f"Sweeping {len(configs)} {model} configurations on {workers} worker(s) x {threads_per_worker} thread(s)")
+
+    rows = []
+    try:
+        cache = build_window_cache(data_train, data_test, model, configs, windows_dir)
+        # TensorFlow is not fork-safe, so workers are spawned fresh
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(threads_per_worker,)) as pool:
+            # Spawned workers start on submit, so this is where their environment is set
+            with worker_thread_limits(threads_per_worker):
+                futures = {pool.submit(_train_config, index, model, config, cache, patience, run_dir): config
+                           for index, config in enumerate(configs)}
+            for future in as_completed(futures):
+                row = future.result()
+                print(f"  {futures[future]}: val_loss={row['val_loss']:.6f} after {row['epochs_run']} epochs "
+                      f"({row['train_seconds']:.1f}s)")
+                rows.append(row)
+    finally:
+        # The workers have exited, so nothing maps the cached windows any more
+        shutil.rmtree(windows_dir, ignore_errors=True)
+
+    results = pd.DataFrame(rows).sort_values("val_loss", ignore_index=True)
+    # Keep only the winner; results.csv still lists every configuration
+    for path in results["model_path"].iloc[1:]:
+        os.remove(path)
+    results.loc[1:, "model_path"] = None
+    results.to_csv(os.path.join(run_dir, "results.csv"), index=False)
+    print(results.drop(columns="model_path").to_string(index=False))
+    print(f"✅ Sweep results saved to {os.path.join(run_dir, 'results.csv')}")
+    if save:
+        save_best(results.iloc[0], model, data_train, **save_paths)
+    return results
+
+def save_best(best, model, data_train, **save_paths):
+    """Loads the winning model and saves it where the trainers save theirs."""
+    from tensorflow.keras.models import load_model
+
+    keras_model = load_model(best["model_path"], compile=False)
+    if model == "lstm":
+        from src.train_model import LSTMTrainer
+
+        trainer = LSTMTrainer(int(best["time_steps"]))
+        trainer.model = keras_model
+        trainer.save_model(**save_paths)
+    else:
+        from src.autoencoder import AutoencoderAnomalyDetector
+
+        detector = AutoencoderAnomalyDetector(int(best["encoding_dim"]))
+        detector.autoencoder = keras_model
+        detector.save_model(data_train["value_normalized"].values.reshape(-1, 1), **save_paths)
+
+def main():
+    parser = argparse.ArgumentParser(description="Trains a grid of LSTM or autoencoder configurations and keeps the best.")
+    parser.add_argument("--model", choices=["lstm", "autoencoder"], default="lstm")
+    parser.add_argument("--train", default="data/processed/ec2_request_latency_system_failure_no_anomaly2_preprocessed_train.csv")
+    parser.add_argument("--test", default="data/processed/ec2_request_latency_system_failure_preprocessed_test.csv")
+    parser.add_argument("--time-steps", type=int, nargs="+", default=[10, 20, 30])
+    parser.add_argument("--encoding-dim", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=None)
+    parser.add_argument("--epochs", type=int, nargs="+", default=None)
+    parser.add_argument("--patience", type=int, default=3, help="Early-stopping patience in epochs")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--models-dir", default="notebooks/models")
+    parser.add_argument("--scaler-dir", default="notebooks/scaler_data")
+    parser.add_argument("--no-save", action="store_true", help="Only report; keep the current artifacts")
+    args = parser.parse_args()
+
+    if args.model == "lstm":
+        grid = {"time_steps": args.time_steps, "batch_size": args.batch_size or [16, 64]}
+        save_paths = {"save_model_path": os.path.join(args.models_dir, "lstm_model.h5"),
+                      "export_dir": os.path.join(args.models_dir, "lstm_numpy"),
+                      "time_steps_path": os.path.join(args.models_dir, "time_steps.pkl")}
+    else:
+        grid = {"encoding_dim": args.encoding_dim, "batch_size": args.batch_size or [32, 128]}
+        save_paths = {"save_model_path": os.path.join(args.models_dir, "autoencoder.h5"),
+                      "export_dir": os.path.join(args.models_dir, "autoencoder_numpy"),
+                      "sketch_path": os.path.join(args.scaler_dir, "autoencoder_mse_sketch.pkl")}
+    if args.epochs:
+        grid["epochs"] = args.epochs
+
+    run_sweep(pd.read_csv(args.train), pd.read_csv(args.test), args.model, grid, args.patience, args.workers,
+              args.threads_per_worker, os.path.join(args.models_dir, "sweeps"), not args.no_save, **save_paths)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Handles zero-copy sliding-window construction for LSTM sequences.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def create_windows(data, time_steps):
+    """
+    Builds LSTM input windows and their next-step targets as strided views.
+
+    Window ``i`` is ``data[i:i + time_steps]`` and its target is ``data[i + time_steps]``,
+    exactly like the old list-based ``create_sequences``, but nothing is copied:
+    both arrays are read-only views over ``data``.
+    :param data: 1-D array (or N-D array windowed along axis 0).
+    :param time_steps: Number of past values in each window.
+    :return: Tuple ``(X, y)`` with shapes ``(n, time_steps, ...)`` and ``(n, ...)``.
+    """
+    data = np.asarray(data)
+    n_windows = max(len(data) - time_steps, 0)
+
+    if n_windows == 0:
+        X = np.empty((0, time_steps) + data.shape[1:], dtype=data.dtype)
+        y = np.empty((0,) + data.shape[1:], dtype=data.dtype)
+        return X, y
+
+    # The last value never starts a window, it is only ever a target
+    X = sliding_window_view(data[:-1], time_steps, axis=0)
+    if data.ndim > 1:
+        X = np.moveaxis(X, -1, 1)
+
+    y = data[time_steps:]
+    y = y.view()
+    y.flags.writeable = False
+    return X, y
+
+def iter_window_batches(data, time_steps, batch_size=4096):
+    """
+    Yields fixed-size batches of windows for arbitrarily long series.
+
+    Each batch is a view into ``data``, so only one batch at a time needs to be
+    materialized when it is handed to ``model.predict``.
+    :return: Generator of ``(start, X_batch, y_batch)`` where ``start`` is the index of the first window.
+    """
+    X, y = create_windows(data, time_steps)
+    for start in range(0, len(X), batch_size):
+        yield start, X[start:start + batch_size], y[start:start + batch_size]
+
+def create_horizon_windows(data, time_steps, horizons):
+    """
+    Builds windows with targets several steps ahead, for multi-horizon forecasting.
+
+    Target ``k`` of window ``i`` is ``data[i + time_steps - 1 + horizons[k]]``, so
+    horizon 1 is the ``create_windows`` target. Windows that lack their furthest
+    target are dropped.
+    :param data: 1-D array.
+    :return: Tuple ``(X, Y)`` with shapes ``(n, time_steps)`` and ``(n, len(horizons))``;
+             ``X`` is a view, ``Y`` a copy.
+    """
+    data = np.asarray(data)
+    n_windows = max(len(data) - time_steps - max(horizons) + 1, 0)
+    X, _ = create_windows(data, time_steps)
+    Y = np.stack([data[time_steps - 1 + h:time_steps - 1 + h + n_windows] for h in horizons], axis=1)
+    return X[:n_windows], Y
@@ -0,0 +1,55 @@
+"""
+Peak memory of the lean pipeline stays under a fixed multiple of the input plus one block of work.
+"""
+
+import contextlib
+import io
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.suite import build_artifacts, synthetic_series
+from src.instrumentation import metrics, stage
+from src.lean_pipeline import LeanAnomalyPipeline
+from src.model_registry import ModelBundle
+
+BLOCK_SIZE = 16_384
+MAX_RATIO = 3
+
+@pytest.fixture(scope="module")
+def bundle(tmp_path_factory):
+    frame = synthetic_series(BLOCK_SIZE * 16)
+    with contextlib.redirect_stdout(io.StringIO()):
+        paths = build_artifacts(str(tmp_path_factory.mktemp("artifacts")), frame)
+    return ModelBundle("test", "1", paths, backend="numpy")
+
+def lean_peak(bundle, values):
+    """Traced peak of one lean run including its output columns, in bytes."""
+    pipeline = LeanAnomalyPipeline(bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps, BLOCK_SIZE)
+    data = pd.DataFrame({"value": values})
+    before = metrics.memory["test.lean"].total if "test.lean" in metrics.memory else 0
+    tracemalloc.start()
+    try:
+        with stage("test.lean"):
+            pipeline.run(data["value"].to_numpy()).to_frame(data)
+    finally:
+        tracemalloc.stop()
+    return metrics.memory["test.lean"].total - before
+
+def test_lean_peak_is_bounded_by_input_size(bundle):
+    values = synthetic_series(BLOCK_SIZE * 16)["value"].to_numpy()
+    lean_peak(bundle, values[:BLOCK_SIZE])  # warm-up: lazy model loading
+    overhead = lean_peak(bundle, values[:BLOCK_SIZE])
+    peak = lean_peak(bundle, values)
+    assert peak <= MAX_RATIO * values.nbytes + overhead
+
+def test_lean_flags_match_standard_rules(bundle):
+    values = synthetic_series(BLOCK_SIZE * 2)["value"].to_numpy()
+    pipeline = LeanAnomalyPipeline(bundle.lstm, bundle.autoencoder, bundle.scaler, bundle.time_steps, BLOCK_SIZE)
+    result = pipeline.run(values)
+    flags = {name: result.flags(name) for name in ("predicted_failure", "autoencoder_anomaly", "maintenance_alert")}
+    np.testing.assert_array_equal(flags["maintenance_alert"], flags["predicted_failure"] | flags["autoencoder_anomaly"])
+    normalized = bundle.scaler.transform(values.reshape(-1, 1)).ravel()
+    np.testing.assert_allclose(result.normalized, normalized, rtol=1e-5, atol=1e-6)
+    np.testing.assert_array_equal(flags["predicted_failure"], result.normalized > result.thresholds["lstm"])